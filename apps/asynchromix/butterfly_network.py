@@ -8,11 +8,11 @@ from time import time
 
 async def batch_switch(ctx, xs, ys, n):
     pp_elements = PreProcessedElements()
-    sbits = [pp_elements.get_one_minus_one_rand(ctx).v for _ in range(n//2)]
-    ns = [1 / ctx.field(2) for _ in range(n//2)]
+    sbits = pp_elements.get_one_minus_one_rands(ctx, n//2)
+    ns = [1 / ctx.field(2)] * (n//2)
 
     assert len(xs) == len(ys) == len(sbits) == n // 2
-    xs, ys, sbits = list(map(ctx.ShareArray, [xs, ys, sbits]))
+    xs, ys = list(map(ctx.ShareArray, [xs, ys]))
     ms = (await (sbits * (xs - ys)))._shares
 
     t1s = [n * (x + y + m).v for x, y, m, n in zip(xs._shares, ys._shares, ms, ns)]
@@ -56,7 +56,7 @@ async def iterated_butterfly_network(ctx, inputs, k):
 async def butterfly_network_helper(ctx, **kwargs):
     k = kwargs['k']
     pp_elements = PreProcessedElements()
-    inputs = [pp_elements.get_rand(ctx).v for _ in range(k)]
+    inputs = [r.v for r in pp_elements.get_rands(ctx, k)._shares]
     logging.info(f"[{ctx.myid}] Running permutation network.")
     shuffled = await iterated_butterfly_network(ctx, inputs, k)
     if shuffled is not None:
@@ -0,0 +1,16 @@
+from pytest import mark
+from random import randint
+from honeybadgermpc.polynomial import EvalPoint
+from honeybadgermpc.reed_solomon import VandermondeDecoder
+
+
+@mark.parametrize("batch_size", [1, 64, 1024])
+@mark.parametrize("n", [4, 16, 64])
+def test_benchmark_vandermonde_decode_batch(benchmark, n, batch_size, galois_field):
+    t = (n - 1) // 3
+    point = EvalPoint(galois_field, n)
+    decoder = VandermondeDecoder(point)
+    z = list(range(t + 1))
+    data = [[randint(0, galois_field.modulus - 1) for _ in z]
+            for _ in range(batch_size)]
+    benchmark(decoder.decode_batch, z, data)
@@ -1,20 +1,21 @@
 import asyncio
 import logging
 from pickle import dumps, loads
-from collections import defaultdict
+from collections import defaultdict, deque
 from honeybadgermpc.broadcast.commonsubset import run_common_subset
 from honeybadgermpc.utils.misc import wrap_send, subscribe_recv
 from honeybadgermpc.utils.sequencer import Sequencer
 
 
 class AvssValueProcessor(object):
-    # How long to wait before running another instance of ACS?
-    ACS_PERIOD_IN_SECONDS = 1
+    # Prefix of the session ids of the ACS instances, followed by their index.
+    ACS_SID_PREFIX = "AVSS-ACS-"
 
     # Delimiter to separate two batches in the output queue.
     BATCH_DELIMITER = None
 
-    def __init__(self, pk, sk, n, t, my_id, send, recv, get_input, chunk_size=1):
+    def __init__(self, pk, sk, n, t, my_id, send, recv, get_input, chunk_size=1,
+                 max_acs_in_flight=2, get_coin_bits=None):
         # This stores the AVSSed values which have been received from each dealer.
         self.inputs_per_dealer = [list() for _ in range(n)]
 
@@ -53,7 +54,42 @@ class AvssValueProcessor(object):
         # when they are coupled to each other. This is true for triples and powers.
         self.chunk_size = chunk_size
 
-        subscribe_recv_task, subscribe = subscribe_recv(recv)
+        # An ACS instance is started as soon as there are new counts to agree on, or
+        # as soon as t+1 other parties have started one, without waiting for the
+        # previous instances to complete. At most `max_acs_in_flight` instances run
+        # at the same time, and their outputs are processed in the order they were
+        # started.
+        self.max_acs_in_flight = max_acs_in_flight
+
+        # Set whenever there may be a reason to start an ACS instance or to process
+        # the output of one.
+        self.acs_trigger = asyncio.Event()
+
+        # Number of ACS instances which each party has started, as far as this node
+        # knows from the messages it has received.
+        self.acs_started_by = [0] * n
+
+        # Number of ACS instances which have been started by at least t+1 parties,
+        # hence by at least one honest party.
+        self.acs_requested = 0
+
+        # (sid, task) of the ACS instances which are running, in the order they
+        # were started.
+        self.acs_in_flight = deque()
+
+        # If set, called as each ACS instance is started to get the preprocessed
+        # bits of its coins, e.g. `lambda: reserve_coin_bits(pp_elements, ctx, n)`.
+        # The instances are started in the same order at every party, so the
+        # parties get shares of the same bits as long as nothing else reserves
+        # bits in between.
+        self.get_coin_bits = get_coin_bits
+
+        async def _recv():
+            j, (tag, o) = await recv()
+            self._note_acs_started(j, tag)
+            return j, (tag, o)
+
+        subscribe_recv_task, subscribe = subscribe_recv(_recv)
         self.tasks = [subscribe_recv_task]
 
         def _get_send_recv(tag):
@@ -93,16 +129,57 @@ class AvssValueProcessor(object):
                     assert not self.outputs_per_dealer[dealer_id][idx].done()
                     self.outputs_per_dealer[dealer_id][idx].set_result(avss_value)
 
+            # There are new counts to agree on
+            self.acs_trigger.set()
+
+    def _note_acs_started(self, sender, tag):
+        if type(tag) is not str or not tag.startswith(self.ACS_SID_PREFIX):
+            return
+        acs_id = tag[len(self.ACS_SID_PREFIX):]
+        if not acs_id.isdigit() or int(acs_id) < self.acs_started_by[sender]:
+            return
+        self.acs_started_by[sender] = int(acs_id) + 1
+
+        # A single party could make this node start any number of instances, so
+        # an instance is only joined once t+1 parties have started it. Some honest
+        # party has then started it too, and the others will eventually join it.
+        requested = sorted(self.acs_started_by, reverse=True)[self.t]
+        if requested > self.acs_requested:
+            self.acs_requested = requested
+            self.acs_trigger.set()
+
     async def _acs_runner(self):
         logging.debug("[%d] Starting ACS runner", self.my_id)
         acs_counter = 0
+        last_acs_input = [0]*self.n
+        in_flight = self.acs_in_flight
         while True:
-            # Sleep first, then run so that you wait until some values are received
-            await asyncio.sleep(AvssValueProcessor.ACS_PERIOD_IN_SECONDS)
-            sid = f"AVSS-ACS-{acs_counter}"
-            logging.debug("[%d] ACS Id: %s", self.my_id, sid)
-            await self._run_acs_to_process_values(sid)
-            acs_counter += 1
+            await self.acs_trigger.wait()
+            self.acs_trigger.clear()
+
+            # Process the outputs of the instances which have completed, in order.
+            while len(in_flight) > 0 and in_flight[0][1].done():
+                sid, acs_task = in_flight.popleft()
+                self._process_acs_output(acs_task.result())
+                logging.debug("[%d] All values processed [%s]", self.my_id, sid)
+
+            while len(in_flight) < self.max_acs_in_flight:
+                value_counts_per_dealer = [
+                    len(self.inputs_per_dealer[i]) for i in range(self.n)]
+                if value_counts_per_dealer == last_acs_input \
+                        and acs_counter >= self.acs_requested:
+                    break
+                sid = f"{self.ACS_SID_PREFIX}{acs_counter}"
+                logging.debug("[%d] ACS Id: %s", self.my_id, sid)
+                coin_bits = None
+                if self.get_coin_bits is not None:
+                    coin_bits = self.get_coin_bits()
+                acs_task = asyncio.create_task(
+                    self._run_acs(sid, value_counts_per_dealer, coin_bits))
+                acs_task.add_done_callback(lambda _: self.acs_trigger.set())
+                in_flight.append((sid, acs_task))
+                last_acs_input = value_counts_per_dealer
+                acs_counter += 1
 
     def _process_acs_output(self, pickled_acs_outputs):
         # Do a transpose of the AVSS counts from each party.
@@ -145,9 +222,9 @@ class AvssValueProcessor(object):
             counts_view_at_all_nodes[i].sort()  # This is the nlog(n) part.
             agreed_value_count = counts_view_at_all_nodes[i][self.n-(self.t+1)]
 
-            # This agreed count should always be more than the number
-            # of outputs which are available at any instant on any node.
-            assert len(self.outputs_per_dealer[i]) <= agreed_value_count
+            # An instance which was started while an earlier one was still running
+            # may agree on fewer values than have already been agreed. Then there is
+            # nothing new to add for this dealer.
 
             # You take the total number of values which have already been agreed upon
             # and are present in the output and compare it with the new agreed count.
@@ -217,11 +294,9 @@ class AvssValueProcessor(object):
                         self.next_idx_to_return_per_dealer[j] += 1
             self.output_queue.put_nowait(AvssValueProcessor.BATCH_DELIMITER)
 
-    async def _run_acs_to_process_values(self, sid):
-        # Get a count of all values which have been received
-        # until now from all the other participating nodes.
-        value_counts_per_dealer = [len(self.inputs_per_dealer[i]) for i in range(self.n)]
-
+    async def _run_acs(self, sid, value_counts_per_dealer, coin_bits=None):
+        # The input is the count of all values which had been received from all the
+        # other participating nodes when this instance was started.
         acs_input = dumps(value_counts_per_dealer)
         logging.debug("[%d] ACS [%s] Input:%s", self.my_id, sid, value_counts_per_dealer)
 
@@ -232,7 +307,8 @@ class AvssValueProcessor(object):
             self.pk, self.sk,
             self.n, self.t, self.my_id,
             send, recv,
-            acs_input)
+            acs_input,
+            coin_bits=coin_bits)
 
         assert type(acs_outputs) is tuple
         assert len(acs_outputs) == self.n
@@ -242,9 +318,7 @@ class AvssValueProcessor(object):
         # The output of ACS is a tuple of `n` entries.
         # Each entry denotes the count of AVSSed values which
         # that node has received from each of the other nodes.
-        self._process_acs_output(acs_outputs)
-
-        logging.debug("[%d] All values processed [%s]", self.my_id, sid)
+        return acs_outputs
 
     def __enter__(self):
         self.tasks.append(asyncio.create_task(self._recv_loop()))
@@ -254,3 +328,5 @@ class AvssValueProcessor(object):
     def __exit__(self, type, value, traceback):
         for task in self.tasks:
             task.cancel()
+        for _, acs_task in self.acs_in_flight:
+            acs_task.cancel()
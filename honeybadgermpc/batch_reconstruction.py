@@ -6,9 +6,10 @@ from asyncio import Queue
 import time
 from .reed_solomon import Algorithm, EncoderFactory, DecoderFactory, RobustDecoderFactory
 from .reed_solomon import IncrementalDecoder
+from .codec import PackedElements
 import random
 from honeybadgermpc.utils.misc import (
-    chunk_data, flatten_lists, transpose_lists, subscribe_recv)
+    chunk_data, flatten_lists, subscribe_recv)
 
 
 async def fetch_one(awaitables):
@@ -130,10 +131,10 @@ async def batch_reconstruct(secret_shares, p, t, n, myid, send, recv, config=Non
     # Step 1: Compute the polynomial P1, then send the elements
     start_time = time.time()
 
+    # Each party's evaluations are packed into one buffer, which is sent as is
     encoded = enc.encode(round1_chunks)
-    to_send = transpose_lists(encoded)
-    for dest, message in enumerate(to_send):
-        send(dest, ('R1', message))
+    for dest in range(n):
+        send(dest, ('R1', PackedElements.from_ints(chunk[dest] for chunk in encoded)))
 
     end_time = time.time()
     bench_logger.info(f"[BatchReconstruct] P1 Send: {end_time - start_time}")
@@ -159,7 +160,7 @@ async def batch_reconstruct(secret_shares, p, t, n, myid, send, recv, config=Non
     start_time = time.time()
 
     # Evaluate all chunks at x=0, then broadcast
-    message = [chunk[0] for chunk in recons_r2]
+    message = PackedElements.from_ints(chunk[0] for chunk in recons_r2)
     for dest in range(n):
         send(dest, ('R2', message))
 
@@ -0,0 +1,94 @@
+"""
+Randomized batch verification of polynomial commitment evaluations.
+
+The poly commit schemes check many evaluation proofs at once by weighting each
+verification equation with a random small exponent and multiplying the weighted
+equations together (the small exponent test of Bellare, Garay and Rabin). A
+batch containing an invalid proof passes with probability at most about
+2**-BATCH_VERIFY_BITS.
+
+BatchVerifier collects the proofs of all concurrent AVSS instances of a node, so
+that the honest case costs a constant number of pairings whatever the number of
+dealers. When a batch fails, it is bisected to find the offending dealers.
+"""
+
+import asyncio
+from random import SystemRandom
+
+BATCH_VERIFY_BITS = 128
+
+_random = SystemRandom()
+
+
+def random_batch_weights(count):
+    """Returns count random exponents of BATCH_VERIFY_BITS bits"""
+    return [_random.getrandbits(BATCH_VERIFY_BITS) for _ in range(count)]
+
+
+def find_invalid_groups(poly_commit, groups):
+    """Returns the indices of the groups of evaluation proofs which fail
+    verification.
+
+    All groups are verified with a single poly_commit.batch_verify_evals call.
+    If that fails, the groups are split in halves which are verified in turn,
+    down to the individual invalid groups.
+
+    args:
+        poly_commit: PolyCommitConst or PolyCommitLin instance
+        groups: list of lists of evaluation proofs, in the format expected by
+            poly_commit.batch_verify_evals
+    output:
+        set of indices of the invalid groups
+    """
+    invalid = set()
+
+    def bisect(indices):
+        if poly_commit.batch_verify_evals(
+                [proof for k in indices for proof in groups[k]]):
+            return
+        if len(indices) == 1:
+            invalid.add(indices[0])
+            return
+        middle = len(indices) // 2
+        bisect(indices[:middle])
+        bisect(indices[middle:])
+
+    if len(groups) > 0:
+        bisect(list(range(len(groups))))
+    return invalid
+
+
+class BatchVerifier(object):
+    """Verifies the evaluation proofs of concurrent AVSS instances together.
+
+    Groups of proofs submitted with verify during the same iteration of the
+    event loop are checked with find_invalid_groups, and each caller is told
+    whether its own group is valid.
+    """
+
+    def __init__(self, poly_commit):
+        self.poly_commit = poly_commit
+        self._pending = []
+
+    async def verify(self, proofs):
+        """Returns True if every proof of the group is valid"""
+        future = asyncio.get_event_loop().create_future()
+        if len(self._pending) == 0:
+            asyncio.get_event_loop().call_soon(self._flush)
+        self._pending.append((proofs, future))
+        return await future
+
+    def _flush(self):
+        pending, self._pending = self._pending, []
+        try:
+            invalid = find_invalid_groups(
+                self.poly_commit, [proofs for proofs, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for k, (_, future) in enumerate(pending):
+            if not future.done():
+                future.set_result(k not in invalid)
@@ -3,6 +3,8 @@ import random
 import re
 import struct
 
+from .lagrange import lagrange_coefficients
+
 # Order of BLS group
 bls12_381_r = 52435875175126190479447740508185965837690552500527637822603658699938581184513  # (# noqa: E501)
 
@@ -38,6 +40,22 @@ def dupe_pyfq12(pyfq12):
     return out
 
 
+def _scalar_values(scalars):
+    return [ZR(s).val if type(s) is int else s.val for s in scalars]
+
+
+# pypairing builds which predate the native multi-exponentiation keep working,
+# with multiexp computed as a plain product of powers
+_HAS_NATIVE_MULTIEXP = hasattr(PyG1, "multiexp") and hasattr(PyG2, "multiexp")
+
+
+def _product_of_powers(one, bases, scalars):
+    out = one
+    for base, scalar in zip(bases, scalars):
+        out *= base ** scalar
+    return out
+
+
 class G1:
     def __init__(self, other=None):
         if other is None:
@@ -184,6 +202,18 @@ class G1:
         one.pyg1.zero()
         return one
 
+    @staticmethod
+    def multiexp(bases, scalars):
+        """Returns prod(bases[i] ** scalars[i]), computed with a single native
+        multi-exponentiation. Scalars may be ZRs or ints.
+        """
+        assert len(bases) == len(scalars)
+        if not _HAS_NATIVE_MULTIEXP:
+            return _product_of_powers(G1.one(), bases, scalars)
+        out = G1()
+        out.pyg1.multiexp([base.pyg1 for base in bases], _scalar_values(scalars))
+        return out
+
     @staticmethod
     def rand(seed=None):
         out = PyG1()
@@ -346,6 +376,18 @@ class G2:
         one.pyg2.zero()
         return one
 
+    @staticmethod
+    def multiexp(bases, scalars):
+        """Returns prod(bases[i] ** scalars[i]), computed with a single native
+        multi-exponentiation. Scalars may be ZRs or ints.
+        """
+        assert len(bases) == len(scalars)
+        if not _HAS_NATIVE_MULTIEXP:
+            return _product_of_powers(G2.one(), bases, scalars)
+        out = G2()
+        out.pyg2.multiexp([base.pyg2 for base in bases], _scalar_values(scalars))
+        return out
+
     @staticmethod
     def rand(seed=None):
         out = PyG2()
@@ -727,27 +769,14 @@ class ZR:
 
 
 def lagrange_at_x(s, j, x):
-    s = sorted(s)
     assert j in s
-    l1 = [x - jj for jj in s if jj != j]
-    l2 = [j - jj for jj in s if jj != j]
-    (num, den) = (ZR(1), ZR(1))
-    for item in l1:
-        num *= item
-    for item in l2:
-        den *= item
-    return num / den
+    return lagrange_coefficients(ZR, s, x)[int(j)]
 
 
 def interpolate_g1_at_x(coords, x, order=-1):
     if order == -1:
         order = len(coords)
-    xs = []
-    sortedcoords = sorted(coords, key=lambda x: x[0])
-    for coord in sortedcoords:
-        xs.append(coord[0])
-    s = set(xs[0:order])
-    out = G1.one()
-    for i in range(order):
-        out = out * (sortedcoords[i][1] ** (lagrange_at_x(s, xs[i], x)))
-    return out
+    sortedcoords = sorted(coords, key=lambda x: x[0])[:order]
+    weights = lagrange_coefficients(ZR, [coord[0] for coord in sortedcoords], x)
+    return G1.multiexp([y_i for _, y_i in sortedcoords],
+                       [weights[int(x_i)] for x_i, _ in sortedcoords])
@@ -4,7 +4,7 @@ import math
 import asyncio
 from honeybadgermpc.exceptions import HoneyBadgerMPCError
 from honeybadgermpc.broadcast.reliablebroadcast \
-    import encode, decode, merkle_tree, get_merkle_branch, merkle_verify
+    import encode, decode_verified, merkle_tree, get_merkle_branch, merkle_verify
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.ERROR)
@@ -100,12 +100,12 @@ class AVID:
                     # decode the msg on enough response
                     decoded_output = ""
                     try:
-                        decoded_output = decode(response_threshold, self.n, result)
-                        # Rebuild the merkle tree to guarantee decoding is correct
-                        _stripes = encode(response_threshold, self.n, decoded_output)
-                        _mt = merkle_tree(_stripes)
-                        _roothash = _mt[1]
-                        if _roothash != roothash:
+                        # Check the merkle tree of the decoded value to guarantee
+                        # decoding is correct
+                        decoded_output = decode_verified(
+                            response_threshold, self.n, result, roothash)
+                        if decoded_output is None:
+                            decoded_output = ""
                             raise HoneyBadgerMPCError("Failed to verify merkle tree")
                     except Exception as e:
                         logger.error("Failed to decode message: %s", e)
@@ -21,9 +21,81 @@ def hash(x):
     return hashlib.sha256(x).digest()
 
 
-async def shared_coin(sid, pid, n, f, pk, sk, broadcast, receive):
+def verify_coin_signatures(pk, sigs):
+    """Returns, for each (sig, h) pair of sigs, whether sig is a valid signature of
+    h. They are verified together with ``pk.verify_signatures``, and one by one
+    only if that fails.
+    """
+    try:
+        pk.verify_signatures(sigs)
+        return [True] * len(sigs)
+    except AssertionError:
+        pass
+
+    results = []
+    for sig, h in sigs:
+        try:
+            results.append(pk.verify_signature(sig, h))
+        except AssertionError:
+            results.append(False)
+    return results
+
+
+def find_invalid_shares(pk, shares):
+    """Returns the indices of the invalid (sig, i, h) signature shares of shares.
+    They are verified together with ``pk.verify_shares``, and the batches which
+    fail are split in halves until the invalid shares are found.
+    """
+    if len(shares) == 0:
+        return []
+    try:
+        pk.verify_shares(shares)
+        return []
+    except AssertionError:
+        if len(shares) == 1:
+            return [0]
+
+    half = len(shares) // 2
+    return find_invalid_shares(pk, shares[:half]) + [
+        half + k for k in find_invalid_shares(pk, shares[half:])]
+
+
+class CoinSignatureVerifier(object):
+    """Verifies the combined signatures of several coins together, e.g. those of
+    all the rounds of the n coins of an ACS.
+
+    The signatures submitted during the same iteration of the event loop are
+    checked with a single ``verify_coin_signatures`` call.
+    """
+
+    def __init__(self, pk):
+        self.pk = pk
+        self._pending = []
+
+    async def verify(self, sig, h):
+        """Returns True if sig is a valid signature of h"""
+        future = asyncio.get_event_loop().create_future()
+        if len(self._pending) == 0:
+            asyncio.get_event_loop().call_soon(self._flush)
+        self._pending.append((sig, h, future))
+        return await future
+
+    def _flush(self):
+        pending, self._pending = self._pending, []
+        results = verify_coin_signatures(self.pk, [(sig, h) for sig, h, _ in pending])
+        for (_, _, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+
+async def shared_coin(sid, pid, n, f, pk, sk, broadcast, receive, verifier=None):
     """A shared coin based on threshold signatures
 
+    The first :math:`f+1` shares of a round are combined without being verified,
+    and only the combined signature is verified. If it is invalid, the invalid
+    shares are found with ``find_invalid_shares`` and dropped, and their senders
+    get their later shares verified before they are used.
+
     :param sid: a unique instance id
     :param pid: my id number
     :param N: number of parties
@@ -32,12 +104,28 @@ async def shared_coin(sid, pid, n, f, pk, sk, broadcast, receive):
     :param SK: ``boldyreva.TBLSPrivateKey``
     :param broadcast: broadcast channel
     :param receive: receive channel
+    :param verifier: optional ``CoinSignatureVerifier`` shared with other coins
     :return: a function ``getCoin()``, where ``getCoin(r)`` blocks
     """
     assert pk.k == f+1
     assert pk.l == n    # noqa: E741
     received = defaultdict(dict)
     output_queue = defaultdict(lambda: asyncio.Queue(1))
+    if verifier is None:
+        verifier = CoinSignatureVerifier(pk)
+
+    # Rounds for which the coin has been computed
+    decided = set()
+    # Parties which have sent an invalid share
+    blacklist = set()
+
+    def share_is_valid(sig, i, r, h):
+        try:
+            return pk.verify_share(sig, i, h)
+        except AssertionError:
+            logger.error(f"Signature share failed! {(sid, pid, i, r)}")
+            blacklist.add(i)
+            return False
 
     async def _recv():
         while True:     # main receive loop
@@ -50,18 +138,17 @@ async def shared_coin(sid, pid, n, f, pk, sk, broadcast, receive):
                           extra={'nodeid': pid, 'epoch': r})
             assert i in range(n)
             assert r >= 0
+            if r in decided:
+                continue
             if i in received[r]:
                 logger.error(f"redundant coin sig received {(sid, pid, i, r)}")
                 continue
 
             h = pk.hash_message(str((sid, r)))
 
-            # TODO: Accountability: Optimistically skip verifying
-            # each share, knowing evidence available later
-            try:
-                pk.verify_share(sig, i, h)
-            except AssertionError:
-                logger.error(f"Signature share failed! {(sid, pid, i, r)}")
+            # Only the shares of parties which have misbehaved before are verified
+            # on receipt.
+            if i in blacklist and not share_is_valid(sig, i, r, h):
                 continue
 
             received[r][i] = sig
@@ -77,13 +164,23 @@ async def shared_coin(sid, pid, n, f, pk, sk, broadcast, receive):
                 # Verify and get the combined signature
                 sigs = dict(list(received[r].items())[:f+1])
                 sig = pk.combine_shares(sigs)
-                assert pk.verify_signature(sig, h)
+                if not await verifier.verify(sig, h):
+                    # Some share is invalid, drop it and wait for more
+                    shares = [(sig_j, j, h) for j, sig_j in sigs.items()]
+                    for k in find_invalid_shares(pk, shares):
+                        _, j, _ = shares[k]
+                        logger.error(f"Signature share failed! {(sid, pid, j, r)}")
+                        blacklist.add(j)
+                        del received[r][j]
+                    continue
 
                 # Compute the bit from the least bit of the hash
                 bit = hash(serialize(sig))[0] % 2
                 logger.debug(
                     f'[{pid}] put bit {bit} in output queue',
                     extra={'nodeid': pid, 'epoch': r})
+                decided.add(r)
+                del received[r]
                 output_queue[r].put_nowait(bit)
 
     recv_task = asyncio.create_task(_recv())
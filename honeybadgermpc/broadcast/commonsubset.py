@@ -67,12 +67,22 @@ async def commonsubset(pid, n, f, rbc_out, aba_in, aba_out):
     return tuple(rbc_values)
 
 
-async def make_commonsubset(sid, pid, n, f, pk, sk, input_msg, send, recv, bcast):
-    from honeybadgermpc.broadcast.commoncoin import shared_coin
+async def make_commonsubset(sid, pid, n, f, pk, sk, input_msg, send, recv, bcast,
+                            coin_bits=None):
+    """Sets up the sub-protocols of an ACS instance.
+
+    :param coin_bits: optional list of ``n`` lists of preprocessed bit shares,
+        e.g. from ``reserve_coin_bits``. If given, the ``j``-th binary agreement
+        uses a ``preprocessed_coin`` opening ``coin_bits[j]``, and the threshold
+        signature coin only for the rounds beyond them. ``pk`` and ``sk`` may then
+        be None, an agreement needing more rounds than there are bits failing
+        with ``CoinUnavailableError``.
+    """
     from honeybadgermpc.broadcast.binaryagreement import binaryagreement
     from honeybadgermpc.broadcast.reliablebroadcast import reliablebroadcast
 
     coin_recvs = [asyncio.Queue() for _ in range(n)]
+    tcoin_recvs = [asyncio.Queue() for _ in range(n)]
     aba_recvs = [asyncio.Queue() for _ in range(n)]
     rbc_recvs = [asyncio.Queue() for _ in range(n)]
 
@@ -85,6 +95,8 @@ async def make_commonsubset(sid, pid, n, f, pk, sk, input_msg, send, recv, bcast
             (sender, (tag, j, msg)) = await recv()
             if tag == 'ACS_COIN':
                 coin_recvs[j].put_nowait((sender, msg))
+            elif tag == 'ACS_TCOIN':
+                tcoin_recvs[j].put_nowait((sender, msg))
             elif tag == 'ACS_RBC':
                 rbc_recvs[j].put_nowait((sender, msg))
             elif tag == 'ACS_ABA':
@@ -95,12 +107,43 @@ async def make_commonsubset(sid, pid, n, f, pk, sk, input_msg, send, recv, bcast
     recv_tasks = []
     recv_tasks.append(asyncio.create_task(_recv()))
 
+    if coin_bits is None or pk is not None:
+        from honeybadgermpc.broadcast.commoncoin import (
+            shared_coin, CoinSignatureVerifier)
+
+        # The coins of all the ABA instances verify their signatures together
+        coin_verifier = CoinSignatureVerifier(pk)
+    if coin_bits is not None:
+        from honeybadgermpc.broadcast.preprocessedcoin import preprocessed_coin
+        assert len(coin_bits) == n
+
     async def _setup(j):
         def coin_bcast(o):
             bcast(('ACS_COIN', j, o))
 
-        coin, coin_recv_task = await shared_coin(
-            sid + 'COIN' + str(j), pid, n, f, pk, sk, coin_bcast, coin_recvs[j].get)
+        def coin_send(k, o):
+            send(k, ('ACS_COIN', j, o))
+
+        def tcoin_bcast(o):
+            bcast(('ACS_TCOIN', j, o))
+
+        coin_recv_tasks = []
+        if coin_bits is None:
+            coin, coin_recv_task = await shared_coin(
+                sid + 'COIN' + str(j), pid, n, f, pk, sk, coin_bcast,
+                coin_recvs[j].get, coin_verifier)
+            coin_recv_tasks.append(coin_recv_task)
+        else:
+            fallback = None
+            if pk is not None:
+                fallback, coin_recv_task = await shared_coin(
+                    sid + 'TCOIN' + str(j), pid, n, f, pk, sk, tcoin_bcast,
+                    tcoin_recvs[j].get, coin_verifier)
+                coin_recv_tasks.append(coin_recv_task)
+            coin, coin_recv_task = await preprocessed_coin(
+                sid + 'COIN' + str(j), pid, n, f, coin_bits[j], coin_send,
+                coin_recvs[j].get, fallback)
+            coin_recv_tasks.append(coin_recv_task)
 
         def aba_bcast(o):
             bcast(('ACS_ABA', j, o))
@@ -119,19 +162,34 @@ async def make_commonsubset(sid, pid, n, f, pk, sk, input_msg, send, recv, bcast
             reliablebroadcast(sid+'RBC'+str(j), pid, n, f, j, rbc_input,
                               rbc_recvs[j].get, rbc_send))
 
-        return coin_recv_task, aba_task
+        return coin_recv_tasks, aba_task
 
     returned_tasks = await asyncio.gather(*[_setup(j) for j in range(n)])
     work_tasks = []
-    for c_task, rcv_task in returned_tasks:
-        recv_tasks.append(c_task)
+    for c_tasks, rcv_task in returned_tasks:
+        recv_tasks.extend(c_tasks)
         work_tasks.append(rcv_task)
 
     return commonsubset(pid, n, f, rbc_outputs, [_.put_nowait for _ in aba_inputs],
                         [_.get for _ in aba_outputs]), recv_tasks, work_tasks
 
 
-async def run_common_subset(sid, pbk, pvk, n, f, nodeid, send, recv, value):
+async def run_common_subset(sid, pbk, pvk, n, f, nodeid, send, recv, value,
+                            multiplexed=False, coin_bits=None):
+    """Runs an ACS instance and returns its output.
+
+    :param multiplexed: run all the sub-protocols in a single
+        ``MultiplexedCommonSubset`` loop rather than as tasks
+    :param coin_bits: optional preprocessed bits for the coins of the binary
+        agreements, see ``make_commonsubset``. Not supported when multiplexed.
+    """
+    if multiplexed:
+        assert coin_bits is None, "The multiplexed ACS only has threshold coins"
+        from honeybadgermpc.broadcast.multiplexedcommonsubset import (
+            run_multiplexed_common_subset)
+        return await run_multiplexed_common_subset(
+            sid, pbk, pvk, n, f, nodeid, send, recv, value)
+
     def mcast(o):
         for i in range(n):
             send(i, o)
@@ -139,7 +197,8 @@ async def run_common_subset(sid, pbk, pvk, n, f, nodeid, send, recv, value):
     input_q = asyncio.Queue(1)
 
     create_acs_task = asyncio.create_task(
-        make_commonsubset(sid, nodeid, n, f, pbk, pvk, input_q.get, send, recv, mcast))
+        make_commonsubset(sid, nodeid, n, f, pbk, pvk, input_q.get, send, recv, mcast,
+                          coin_bits))
 
     await input_q.put(value)
     acs, recv_tasks, work_tasks = await create_acs_task
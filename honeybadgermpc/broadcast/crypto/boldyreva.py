@@ -11,6 +11,9 @@ from base64 import encodebytes, decodebytes
 from operator import mul
 from functools import reduce
 
+from honeybadgermpc.batch_verification import random_batch_weights
+from honeybadgermpc.lagrange import lagrange_coefficients
+
 # group = PairingGroup('SS512')
 # group = PairingGroup('MNT159')
 group = PairingGroup('MNT224')
@@ -49,6 +52,11 @@ ZERO = group.random(ZR, seed=59)*0
 ONE = group.random(ZR, seed=60)*0+1
 
 
+def zr(value):
+    """Maps an int to an element of ZR"""
+    return group.init(ZR, value)
+
+
 def polynom_eval(x, coefficients):
     """Polynomial evaluation."""
     y = ZERO
@@ -99,10 +107,8 @@ class TBLSPublicKey(object):
 
         assert j in s
         assert 0 <= j < self.l
-        num = reduce(mul, [0 - jj - 1 for jj in s if jj != j], ONE)
-        den = reduce(mul, [j - jj     for jj in s if jj != j], ONE)  # noqa: E272
-        # assert num % den == 0
-        return num / den
+        # Player jj holds the evaluation at jj + 1
+        return lagrange_coefficients(zr, [jj + 1 for jj in s], 0)[j + 1]
 
     def hash_message(self, m):
         """ """
@@ -120,6 +126,30 @@ class TBLSPublicKey(object):
         assert pair(sig, g2) == pair(h, self.VK)
         return True
 
+    def verify_signatures(self, sigs):
+        """Verifies a list of (sig, h) pairs with two pairings, by checking a
+        random linear combination of them.
+        """
+        rs = [zr(r) for r in random_batch_weights(len(sigs))]
+        sig = reduce(mul, [sig ** r for (sig, _), r in zip(sigs, rs)], 1)
+        h = reduce(mul, [h ** r for (_, h), r in zip(sigs, rs)], 1)
+        assert pair(sig, g2) == pair(h, self.VK)
+        return True
+
+    def verify_shares(self, shares):
+        """Verifies a list of (sig, i, h) signature shares with one pairing, plus
+        one per distinct signer, by checking a random linear combination of them.
+        """
+        rs = [zr(r) for r in random_batch_weights(len(shares))]
+        sig = reduce(mul, [sig ** r for (sig, _, _), r in zip(shares, rs)], 1)
+        hs = {}
+        for (_, i, h), r in zip(shares, rs):
+            assert 0 <= i < self.l
+            hs[i] = hs[i] * h ** r if i in hs else h ** r
+        assert pair(sig, g2) == reduce(
+            mul, [pair(h, self.VKs[i]) for i, h in hs.items()], 1)
+        return True
+
     def combine_shares(self, sigs):
         """ """
         # sigs: a mapping from idx -> sig
@@ -0,0 +1,478 @@
+"""
+Asynchronous common subset with all of its sub-protocols multiplexed in one loop.
+
+make_commonsubset runs a reliable broadcast, a binary agreement and a common coin
+as separate tasks for each of the n proposers, with their own queues. Here the
+state of the n instances of each sub-protocol is kept in lists indexed by the
+proposer, and every received message is handled by a single loop, without any
+per instance task or queue. The messages produced while handling the received
+messages are bundled, so that each batch of received messages leads to at most one
+network message to each party instead of one per instance.
+
+The sub-protocols are the same as in reliablebroadcast, binaryagreement and
+commoncoin (optimistic coin share verification included), so both
+implementations reach the same decisions.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+
+from honeybadgermpc.broadcast.binaryagreement import set_new_estimate
+from honeybadgermpc.broadcast.commoncoin import (
+    hash, verify_coin_signatures, find_invalid_shares)
+from honeybadgermpc.broadcast.crypto.boldyreva import serialize, deserialize1
+from honeybadgermpc.broadcast.reliablebroadcast import (
+    encode, decode_verified, merkle_tree, get_merkle_branch, IncrementalMerkleVerifier)
+from honeybadgermpc.exceptions import AbandonedNodeError
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+# Uncomment this when you want logs from this file.
+# logger.setLevel(logging.NOTSET)
+
+
+class BAPhase:
+    # Waiting for the input of the binary agreement
+    INPUT = "INPUT"
+    # Waiting for a value to be added to bin_values
+    BV = "BV"
+    # Waiting for n-f AUX messages
+    AUX = "AUX"
+    # Waiting for n-f CONF messages
+    CONF = "CONF"
+    # Waiting for the common coin
+    COIN = "COIN"
+    # Terminated
+    DONE = "DONE"
+
+
+class MultiplexedCommonSubset(object):
+    def __init__(self, sid, pid, n, f, pk, sk, send, recv):
+        """
+        args:
+            sid: session id
+            pid: id of this node
+            n, f: number of nodes and number of faults tolerated, n >= 3f+1
+            pk, sk: ``boldyreva.TBLSPublicKey`` and ``boldyreva.TBLSPrivateKey``
+                with threshold f+1, for the common coins
+            send: ``send(i, o)`` sends o to node i
+            recv: ``recv()`` blocks until a message ``(sender, o)`` is received
+        """
+        assert n >= 3*f + 1
+        assert f >= 0
+        assert 0 <= pid < n
+        assert pk.k == f+1
+        assert pk.l == n    # noqa: E741
+
+        self.sid, self.pid, self.n, self.f = sid, pid, n, f
+        self.pk, self.sk = pk, sk
+        self.send, self.recv = send, recv
+
+        # Messages to be sent to each node. They are sent once all the messages
+        # which have already been received have been handled.
+        self.outbox = [list() for _ in range(n)]
+        self.flush_scheduled = False
+
+        # Reliable broadcast, state of the instance of each leader
+        self.rbc_k = n - 2*f
+        self.rbc_from_leader = [None] * n
+        self.rbc_stripes = [defaultdict(lambda: [None] * n) for _ in range(n)]
+        self.rbc_verifiers = [{} for _ in range(n)]
+        self.rbc_echo_counter = [defaultdict(int) for _ in range(n)]
+        self.rbc_echo_senders = [set() for _ in range(n)]
+        self.rbc_ready = [defaultdict(set) for _ in range(n)]
+        self.rbc_ready_senders = [set() for _ in range(n)]
+        self.rbc_ready_sent = [False] * n
+        self.rbc_values = [None] * n
+
+        # Binary agreement, state of the instance of each proposer
+        self.ba_est_values = [defaultdict(lambda: [set(), set()]) for _ in range(n)]
+        self.ba_aux_values = [defaultdict(lambda: [set(), set()]) for _ in range(n)]
+        self.ba_conf_values = [
+            defaultdict(lambda: {(0,): set(), (1,): set(), (0, 1): set()})
+            for _ in range(n)]
+        self.ba_est_sent = [defaultdict(lambda: [False, False]) for _ in range(n)]
+        self.ba_conf_sent = [
+            defaultdict(lambda: {(0,): False, (1,): False, (0, 1): False})
+            for _ in range(n)]
+        self.ba_bin_values = [defaultdict(set) for _ in range(n)]
+        self.ba_phase = [BAPhase.INPUT] * n
+        self.ba_round = [0] * n
+        self.ba_est = [None] * n
+        self.ba_values = [None] * n
+        self.ba_already_decided = [None] * n
+
+        # Common coin, state of the instance of each proposer
+        self.coin_shares = [defaultdict(dict) for _ in range(n)]
+        self.coin_share_sent = [set() for _ in range(n)]
+        self.coins = [dict() for _ in range(n)]
+        # (j, r) of the coins whose first f+1 shares are waiting to be verified
+        self.coin_pending = []
+        # Parties which have sent an invalid coin share
+        self.coin_blacklist = set()
+
+        # Common subset
+        self.aba_inputted = [False] * n
+        self.aba_values = [None] * n
+
+    async def run(self, value):
+        """Proposes value and returns the agreed tuple of n values, None for the
+        proposals which were not agreed. It returns once all the binary agreements
+        have terminated, like run_common_subset.
+        """
+        self._rbc_start(value)
+        self._flush()
+        while not self._is_done():
+            sender, msgs = await self.recv()
+            if sender not in range(self.n) or type(msgs) not in (list, tuple):
+                logger.info(f"[{self.pid}] Invalid message from {sender}")
+                continue
+            for msg in msgs:
+                try:
+                    self._handle(sender, msg)
+                except Exception as e:
+                    logger.info(f"[{self.pid}] Invalid message {msg} from {sender}: {e}")
+            self._verify_coins()
+            self._schedule_flush()
+        self._flush()
+        return tuple(self.rbc_values[j] if self.aba_values[j] else None
+                     for j in range(self.n))
+
+    def _is_done(self):
+        return all(phase == BAPhase.DONE for phase in self.ba_phase) and all(
+            self.rbc_values[j] is not None
+            for j in range(self.n) if self.aba_values[j])
+
+    def _broadcast(self, msg):
+        for outbox in self.outbox:
+            outbox.append(msg)
+
+    def _schedule_flush(self):
+        # The receive loop does not yield while there are messages waiting to be
+        # received, so all the messages produced while handling them are bundled.
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            asyncio.get_event_loop().call_soon(self._flush)
+
+    def _flush(self):
+        self.flush_scheduled = False
+        for i in range(self.n):
+            if len(self.outbox[i]) > 0:
+                self.send(i, self.outbox[i])
+                self.outbox[i] = []
+
+    def _handle(self, sender, msg):
+        tag, j = msg[0], msg[1]
+        assert j in range(self.n)
+        if tag in ('VAL', 'ECHO', 'READY'):
+            self._rbc_handle(sender, j, msg)
+        elif tag in ('EST', 'AUX', 'CONF'):
+            self._ba_handle(sender, j, msg)
+        elif tag == 'COIN':
+            self._coin_handle(sender, j, msg)
+        else:
+            raise ValueError(f"Unknown tag: {tag}")
+
+    # Reliable broadcast
+
+    def _rbc_start(self, value):
+        assert isinstance(value, (str, bytes))
+        stripes = encode(self.rbc_k, self.n, value)
+        mt = merkle_tree(stripes)
+        roothash = mt[1]
+        for i in range(self.n):
+            branch = get_merkle_branch(i, mt)
+            self.outbox[i].append(('VAL', self.pid, roothash, branch, stripes[i]))
+
+    def _rbc_handle(self, sender, j, msg):
+        if self.rbc_values[j] is not None:
+            return
+
+        if msg[0] == 'VAL':
+            _, _, roothash, branch, stripe = msg
+            if sender != j or self.rbc_from_leader[j] is not None:
+                return
+            if not self._rbc_verifier(j, roothash).verify(stripe, branch, self.pid):
+                return
+            self.rbc_from_leader[j] = roothash
+            self._broadcast(('ECHO', j, roothash, branch, stripe))
+
+        elif msg[0] == 'ECHO':
+            _, _, roothash, branch, stripe = msg
+            if sender in self.rbc_echo_senders[j]:
+                logger.info(f"[{self.pid}] Redundant ECHO")
+                return
+            if not self._rbc_verifier(j, roothash).verify(stripe, branch, sender):
+                logger.info(f"[{self.pid}] Invalid ECHO from {sender}")
+                return
+            self.rbc_stripes[j][roothash][sender] = stripe
+            self.rbc_echo_senders[j].add(sender)
+            self.rbc_echo_counter[j][roothash] += 1
+            if self.rbc_echo_counter[j][roothash] >= self.n - self.f:
+                self._rbc_send_ready(j, roothash)
+            self._rbc_try_output(j, roothash)
+
+        elif msg[0] == 'READY':
+            _, _, roothash = msg
+            if sender in self.rbc_ready_senders[j]:
+                logger.info(f"[{self.pid}] Redundant READY")
+                return
+            self.rbc_ready[j][roothash].add(sender)
+            self.rbc_ready_senders[j].add(sender)
+            # Amplify ready messages
+            if len(self.rbc_ready[j][roothash]) >= self.f + 1:
+                self._rbc_send_ready(j, roothash)
+            self._rbc_try_output(j, roothash)
+
+    def _rbc_verifier(self, j, roothash):
+        if roothash not in self.rbc_verifiers[j]:
+            self.rbc_verifiers[j][roothash] = IncrementalMerkleVerifier(
+                self.n, roothash)
+        return self.rbc_verifiers[j][roothash]
+
+    def _rbc_send_ready(self, j, roothash):
+        if not self.rbc_ready_sent[j]:
+            self.rbc_ready_sent[j] = True
+            self._broadcast(('READY', j, roothash))
+
+    def _rbc_try_output(self, j, roothash):
+        if len(self.rbc_ready[j][roothash]) < 2*self.f + 1 \
+                or self.rbc_echo_counter[j][roothash] < self.rbc_k:
+            return
+        # Check the merkle tree of the decoded value to guarantee decoding is
+        # correct, reusing the hashes of the verified stripes
+        m = decode_verified(self.rbc_k, self.n, self.rbc_stripes[j][roothash],
+                            roothash, self.rbc_verifiers[j][roothash].leaf_hashes())
+        if m is None:
+            logger.info(f"[{self.pid}] Invalid encoding from leader {j}")
+            return
+        self.rbc_values[j] = m
+        if not self.aba_inputted[j]:
+            # Provide 1 as input to the corresponding binary agreement
+            self._ba_input(j, 1)
+
+    # Binary agreement
+
+    def _ba_input(self, j, v):
+        self.aba_inputted[j] = True
+        self.ba_est[j] = v
+        self._ba_start_round(j)
+        self._ba_progress(j)
+
+    def _ba_start_round(self, j):
+        r, est = self.ba_round[j], self.ba_est[j]
+        if not self.ba_est_sent[j][r][est]:
+            self.ba_est_sent[j][r][est] = True
+            self._broadcast(('EST', j, r, est))
+        self.ba_phase[j] = BAPhase.BV
+
+    def _ba_handle(self, sender, j, msg):
+        if self.ba_phase[j] == BAPhase.DONE:
+            return
+        tag, _, r, v = msg
+        assert type(r) is int and r >= 0
+
+        if tag == 'EST':
+            assert v in (0, 1)
+            est_values = self.ba_est_values[j][r][v]
+            if sender in est_values:
+                logger.warning(f"[{self.pid}] Redundant EST received {msg} by {sender}")
+                return
+            est_values.add(sender)
+            # Relay after reaching first threshold
+            if len(est_values) >= self.f + 1 and not self.ba_est_sent[j][r][v]:
+                self.ba_est_sent[j][r][v] = True
+                self._broadcast(('EST', j, r, v))
+            # Output after reaching second threshold
+            if len(est_values) >= 2*self.f + 1:
+                self.ba_bin_values[j][r].add(v)
+
+        elif tag == 'AUX':
+            assert v in (0, 1)
+            if sender in self.ba_aux_values[j][r][v]:
+                logger.warning(f"[{self.pid}] Redundant AUX received {msg} by {sender}")
+                return
+            self.ba_aux_values[j][r][v].add(sender)
+
+        elif tag == 'CONF':
+            v = tuple(v)
+            assert v in ((0,), (1,), (0, 1))
+            if sender in self.ba_conf_values[j][r][v]:
+                logger.warning(f"[{self.pid}] Redundant CONF received {msg} by {sender}")
+                return
+            self.ba_conf_values[j][r][v].add(sender)
+
+        self._ba_progress(j)
+
+    def _ba_aux_result(self, j, r):
+        bin_values, aux_values = self.ba_bin_values[j][r], self.ba_aux_values[j][r]
+        if 1 in bin_values and len(aux_values[1]) >= self.n - self.f:
+            return set((1,))
+        if 0 in bin_values and len(aux_values[0]) >= self.n - self.f:
+            return set((0,))
+        if sum(len(aux_values[v]) for v in bin_values) >= self.n - self.f:
+            return set((0, 1))
+        return None
+
+    def _ba_conf_result(self, j, r):
+        bin_values, conf_values = self.ba_bin_values[j][r], self.ba_conf_values[j][r]
+        if 1 in bin_values and len(conf_values[(1,)]) >= self.n - self.f:
+            return set((1,))
+        if 0 in bin_values and len(conf_values[(0,)]) >= self.n - self.f:
+            return set((0,))
+        if sum(len(senders) for conf_value, senders in conf_values.items()
+               if senders and set(conf_value).issubset(bin_values)) >= self.n - self.f:
+            return set((0, 1))
+        return None
+
+    def _ba_progress(self, j):
+        """Moves the binary agreement of j through as many phases as its current
+        state allows"""
+        while True:
+            r, phase = self.ba_round[j], self.ba_phase[j]
+            if phase == BAPhase.BV:
+                if len(self.ba_bin_values[j][r]) == 0:
+                    return
+                w = next(iter(self.ba_bin_values[j][r]))
+                self._broadcast(('AUX', j, r, w))
+                self.ba_phase[j] = BAPhase.AUX
+
+            elif phase == BAPhase.AUX:
+                values = self._ba_aux_result(j, r)
+                if values is None:
+                    return
+                self.ba_values[j] = values
+                if self.ba_conf_sent[j][r][tuple(values)]:
+                    self.ba_phase[j] = BAPhase.COIN
+                else:
+                    self.ba_conf_sent[j][r][tuple(values)] = True
+                    self._broadcast(
+                        ('CONF', j, r, tuple(sorted(self.ba_bin_values[j][r]))))
+                    self.ba_phase[j] = BAPhase.CONF
+
+            elif phase == BAPhase.CONF:
+                values = self._ba_conf_result(j, r)
+                if values is None:
+                    return
+                self.ba_values[j] = values
+                self.ba_phase[j] = BAPhase.COIN
+
+            elif phase == BAPhase.COIN:
+                self._coin_send_share(j, r)
+                if r not in self.coins[j]:
+                    return
+                try:
+                    self.ba_est[j], self.ba_already_decided[j] = set_new_estimate(
+                        values=self.ba_values[j],
+                        s=self.coins[j][r],
+                        already_decided=self.ba_already_decided[j],
+                        decide=lambda v: self._ba_decided(j, v),
+                    )
+                except AbandonedNodeError:
+                    logger.debug(f"[{self.pid}] BA {j} terminated in round {r}")
+                    self.ba_phase[j] = BAPhase.DONE
+                    return
+                self.ba_round[j] += 1
+                self._ba_start_round(j)
+
+            else:
+                return
+
+    # Common coin
+
+    def _coin_hash(self, j, r):
+        return self.pk.hash_message(str((f"{self.sid}COIN{j}", r)))
+
+    def _coin_send_share(self, j, r):
+        if r not in self.coin_share_sent[j]:
+            self.coin_share_sent[j].add(r)
+            sig = self.sk.sign(self._coin_hash(j, r))
+            self._broadcast(('COIN', j, r, serialize(sig)))
+
+    def _coin_share_is_valid(self, sig, i, j, r):
+        try:
+            return self.pk.verify_share(sig, i, self._coin_hash(j, r))
+        except AssertionError:
+            logger.error(f"Signature share failed! {(self.sid, self.pid, i, j, r)}")
+            self.coin_blacklist.add(i)
+            return False
+
+    def _coin_handle(self, sender, j, msg):
+        _, _, r, sig_bytes = msg
+        assert type(r) is int and r >= 0
+        if r in self.coins[j]:
+            return
+        shares = self.coin_shares[j][r]
+        if sender in shares:
+            logger.error(
+                f"redundant coin sig received {(self.sid, self.pid, sender, j, r)}")
+            return
+        sig = deserialize1(sig_bytes)
+        # Only the shares of parties which have misbehaved before are verified on
+        # receipt, the others only if their combination turns out to be invalid.
+        if sender in self.coin_blacklist \
+                and not self._coin_share_is_valid(sig, sender, j, r):
+            return
+        shares[sender] = sig
+        if len(shares) == self.f + 1:
+            self.coin_pending.append((j, r))
+
+    def _drop_invalid_coin_shares(self, coins):
+        """Drops the invalid shares of coins, a list of ((j, r), shares) pairs, and
+        verifies again the coins which still have enough shares"""
+        batch = [(sig, i, self._coin_hash(j, r), j, r)
+                 for (j, r), s in coins for i, sig in s.items()]
+        invalid = find_invalid_shares(self.pk, [share[:3] for share in batch])
+        for k in invalid:
+            _, i, _, j, r = batch[k]
+            logger.error(f"Signature share failed! {(self.sid, self.pid, i, j, r)}")
+            self.coin_blacklist.add(i)
+            del self.coin_shares[j][r][i]
+
+        for (j, r), _ in coins:
+            if len(self.coin_shares[j][r]) >= self.f + 1:
+                self.coin_pending.append((j, r))
+
+    def _verify_coins(self):
+        """Verifies the combined signatures of all the coins which have received
+        f+1 shares during this step together"""
+        while len(self.coin_pending) > 0:
+            pending, self.coin_pending = self.coin_pending, []
+            shares = [dict(list(self.coin_shares[j][r].items())[:self.f + 1])
+                      for j, r in pending]
+            sigs = [self.pk.combine_shares(s) for s in shares]
+            results = verify_coin_signatures(
+                self.pk, [(sig, self._coin_hash(j, r))
+                          for sig, (j, r) in zip(sigs, pending)])
+
+            # The coins whose signature is invalid have some invalid shares, which
+            # are all looked for together and dropped.
+            self._drop_invalid_coin_shares(
+                [(coin, s) for coin, s, valid in zip(pending, shares, results)
+                 if not valid])
+
+            for (j, r), sig, valid in zip(pending, sigs, results):
+                if not valid:
+                    continue
+                # Compute the bit from the least bit of the hash
+                self.coins[j][r] = hash(serialize(sig))[0] % 2
+                del self.coin_shares[j][r]
+                if self.ba_phase[j] == BAPhase.COIN and self.ba_round[j] == r:
+                    self._ba_progress(j)
+
+    # Common subset
+
+    def _ba_decided(self, j, v):
+        self.aba_values[j] = v
+        if sum(1 for value in self.aba_values if value) >= self.n - self.f:
+            # Provide 0 to all other binary agreements
+            for k in range(self.n):
+                if not self.aba_inputted[k]:
+                    self._ba_input(k, 0)
+
+
+async def run_multiplexed_common_subset(sid, pk, sk, n, f, pid, send, recv, value):
+    """Same as run_common_subset, with the ACS run by a MultiplexedCommonSubset"""
+    return await MultiplexedCommonSubset(sid, pid, n, f, pk, sk, send, recv).run(value)
@@ -0,0 +1,117 @@
+"""
+A common coin which opens preprocessed secret-shared random bits.
+
+Unlike ``shared_coin``, which combines threshold signatures and needs pairings
+for every round, the coin of round r is the r-th bit of a list of shares of
+random bits, opened with ``batch_reconstruct``. The bits are taken from the
+preprocessing (``PreProcessedElements.generate_bits``), so every party must
+hold shares of the same bits, in the same order, for a given coin.
+
+Most binary agreements terminate within a few rounds, so only a few bits are
+reserved for each coin, and the rounds beyond them can be left to a fallback
+coin, e.g. a ``shared_coin``.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+
+from honeybadgermpc.batch_reconstruction import batch_reconstruct
+from honeybadgermpc.exceptions import CoinUnavailableError
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+# Uncomment this when you want logs from this file.
+# logger.setLevel(logging.NOTSET)
+
+# Number of preprocessed bits reserved for each coin by reserve_coin_bits. A
+# binary agreement needs more than r rounds with probability about 2**-r.
+DEFAULT_COIN_ROUNDS = 4
+
+
+def reserve_coin_bits(pp_elements, ctx, count, rounds=DEFAULT_COIN_ROUNDS):
+    """Reserves the preprocessed bits of count coins.
+
+    All the parties must reserve the bits of the same coins in the same order,
+    e.g. when starting each ACS instance, for their shares to be of the same bits.
+
+    args:
+        pp_elements: PreProcessedElements to take the bits from
+        ctx: Mpc context of the party
+        count: number of coins, e.g. n for the n binary agreements of an ACS
+        rounds: number of bits of each coin
+
+    output:
+        list of count lists of rounds bit shares, as field elements
+    """
+    shares = [share.v for share in pp_elements.reserve_bits(ctx, count * rounds)]
+    return [shares[k * rounds:(k + 1) * rounds] for k in range(count)]
+
+
+async def preprocessed_coin(sid, pid, n, f, bits, send, receive, fallback=None):
+    """A shared coin based on preprocessed shared random bits
+
+    The coin of round r opens ``bits[r]``, which must be a degree f share of a
+    random 0/1 bit. Shares of random -1/1 values can be used as well, -1 being
+    mapped to 0. The coins of the rounds beyond the bits are those of fallback.
+
+    :param sid: a unique instance id
+    :param pid: my id number
+    :param n: number of parties
+    :param f: fault tolerance, the bits are shared with degree :math:`f`
+    :param bits: list of the shares of the bits of the rounds
+    :param send: send channel, ``send(j, o)``
+    :param receive: receive channel
+    :param fallback: optional ``getCoin()`` of another coin, for the rounds
+        which have no bit
+    :return: a function ``getCoin()``, where ``getCoin(r)`` blocks
+    """
+    received = defaultdict(asyncio.Queue)
+    coins = {}
+
+    async def _recv():
+        while True:
+            (i, (_, r, msg)) = await receive()
+            assert i in range(n)
+            if not isinstance(r, int) or not 0 <= r < len(bits):
+                logger.error(f"coin share for invalid round {(sid, pid, i, r)}")
+                continue
+            if r in coins and coins[r].done():
+                continue
+            received[r].put_nowait((i, msg))
+
+    recv_task = asyncio.create_task(_recv())
+
+    async def _open(round):
+        def _send(j, o):
+            send(j, ('COIN', round, o))
+
+        bit = bits[round]
+        opened = await batch_reconstruct(
+            [bit], bit.modulus, f, n, pid, _send, received[round].get)
+        del received[round]
+        if opened is None:
+            raise CoinUnavailableError(f"Failed to open the coin {(sid, round)}")
+
+        value, = opened
+        logger.debug(f'[{pid}] coin {value}', extra={'nodeid': pid, 'epoch': round})
+        return 1 if value.value == 1 else 0
+
+    async def get_coin(round):
+        """Gets a coin.
+
+        :param round: the epoch/round.
+        :returns: a coin.
+
+        """
+        if round >= len(bits):
+            if fallback is not None:
+                return await fallback(round)
+            raise CoinUnavailableError(
+                f"No preprocessed bit left for the coin {(sid, round)}")
+        if round not in coins:
+            coins[round] = asyncio.create_task(_open(round))
+        return await coins[round]
+
+    return get_coin, recv_task
@@ -15,6 +15,23 @@ logger.setLevel(logging.ERROR)
 #####################
 #    zfec encode    #
 #####################
+# zfec coders only depend on (k, n), so they are built once and shared
+_encoders = {}
+_decoders = {}
+
+
+def _encoder(k, n):
+    if (k, n) not in _encoders:
+        _encoders[(k, n)] = zfec.Encoder(k, n)
+    return _encoders[(k, n)]
+
+
+def _decoder(k, n):
+    if (k, n) not in _decoders:
+        _decoders[(k, n)] = zfec.Decoder(k, n)
+    return _decoders[(k, n)]
+
+
 def encode(k, n, m):
     """Erasure encodes string ``m`` into ``n`` blocks, such that any ``k``
     can reconstruct.
@@ -28,23 +45,19 @@ def encode(k, n, m):
         m = m.encode()
     except AttributeError:
         pass
-    encoder = zfec.Encoder(k, n)
     assert k <= 256  # TODO: Record this assumption!
     # pad m to a multiple of K bytes
     padlen = k - (len(m) % k)
     m += padlen * chr(k-padlen).encode()
     step = len(m)//k
     blocks = [m[i*step: (i+1)*step] for i in range(k)]
-    stripes = encoder.encode(blocks)
+    stripes = _encoder(k, n).encode(blocks)
     return stripes
 
 
-def decode(k, n, stripes):
-    """Decodes an erasure-encoded string from a subset of stripes
-    :param list stripes: a container of :math:`n` elements,
-        each of which is either a string or ``None``
-        at least :math:`k` elements are strings
-        all string elements are the same length
+def _decode_blocks(k, n, stripes):
+    """Returns the ``k`` primary blocks decoded from the first ``k`` stripes
+    which are not ``None``, and the indices of these stripes.
     """
     assert len(stripes) == n
     blocks = []
@@ -58,12 +71,59 @@ def decode(k, n, stripes):
             break
     else:
         raise ValueError("Too few to recover")
-    decoder = zfec.Decoder(k, n)
-    rec = decoder.decode(blocks, blocknums)
-    m = b''.join(rec)
+    return _decoder(k, n).decode(blocks, blocknums), blocknums
+
+
+def _unpad(k, blocks):
+    m = b''.join(blocks)
     padlen = k - m[-1]
-    m = m[:-padlen]
-    return m
+    return m[:-padlen]
+
+
+def decode(k, n, stripes):
+    """Decodes an erasure-encoded string from a subset of stripes
+    :param list stripes: a container of :math:`n` elements,
+        each of which is either a string or ``None``
+        at least :math:`k` elements are strings
+        all string elements are the same length
+    """
+    blocks, _ = _decode_blocks(k, n, stripes)
+    return _unpad(k, blocks)
+
+
+def decode_verified(k, n, stripes, roothash, leaf_hashes=None):
+    """Decodes an erasure-encoded string from a subset of stripes, and checks
+    that encoding it again gives the merkle tree of root ``roothash``, so that
+    all the parties decoding from stripes of that tree get the same string.
+
+    Only the stripes which are not used for decoding are encoded again. The
+    leaves of the stripes used for decoding are taken from ``leaf_hashes``
+    when known, and are not hashed again. This is only correct if all the
+    stripes have been verified, e.g. with the ``IncrementalMerkleVerifier``
+    providing ``leaf_hashes``.
+
+    :param list stripes: as in :func:`decode`
+    :param bytes roothash: expected merkle root
+    :param list leaf_hashes: optional list of :math:`n` leaf hashes, ``None``
+        for the unknown ones
+    :return bytes: the decoded string, or ``None`` if its encoding does not
+        match ``roothash``
+    """
+    blocks, blocknums = _decode_blocks(k, n, stripes)
+    used = set(blocknums)
+    others = tuple(i for i in range(n) if i not in used)
+    leaves = [None] * n
+    for i, stripe in zip(others, _encoder(k, n).encode(tuple(blocks), others)):
+        leaves[i] = stripe
+    leaves = hash_leaves(leaves)
+    for i in blocknums:
+        if leaf_hashes is not None and leaf_hashes[i] is not None:
+            leaves[i] = leaf_hashes[i]
+        else:
+            leaves[i] = hash(stripes[i])
+    if merkle_tree_from_hashes(leaves)[1] != roothash:
+        return None
+    return _unpad(k, blocks)
 
 
 #####################
@@ -78,24 +138,44 @@ def hash(x):
     return hashlib.sha256(x).digest()
 
 
+def hash_leaves(str_list):
+    """Hashes a list of leaves at once, ``None`` entries are kept as is"""
+    sha256 = hashlib.sha256
+    return [None if x is None else sha256(
+        x if isinstance(x, bytes) else x.encode()).digest() for x in str_list]
+
+
 def ceil(x): return int(math.ceil(x))
 
 
+def merkle_tree_from_hashes(leaves):
+    """Builds a merkle tree from the hashes of its :math:`n` leaves, a level
+    at a time.
+    :return list: Merkle tree, as returned by :func:`merkle_tree`
+    """
+    n = len(leaves)
+    assert n >= 1
+    bottomrow = 2 ** ceil(math.log(n, 2))
+    sha256 = hashlib.sha256
+    level = list(leaves) + [b''] * (bottomrow - n)
+    levels = [level]
+    while len(level) > 1:
+        level = [sha256(left + right).digest()
+                 for left, right in zip(level[::2], level[1::2])]
+        levels.append(level)
+    mt = [b'']
+    for level in reversed(levels):
+        mt += level
+    return mt
+
+
 def merkle_tree(str_list):
     """Builds a merkle tree from a list of :math:`n` strings (:math:`n`
     at least 1)
     :return list: Merkle tree, a list of ``2*ceil(n)`` strings. The root
          digest is at ``tree[1]``, ``tree[0]`` is blank.
     """
-    n = len(str_list)
-    assert n >= 1
-    bottomrow = 2 ** ceil(math.log(n, 2))
-    mt = [b''] * (2 * bottomrow)
-    for i in range(n):
-        mt[bottomrow + i] = hash(str_list[i])
-    for i in range(bottomrow - 1, 0, -1):
-        mt[i] = hash(mt[i*2] + mt[i*2+1])
-    return mt
+    return merkle_tree_from_hashes(hash_leaves(str_list))
 
 
 def get_merkle_branch(index, mt):
@@ -130,6 +210,48 @@ def merkle_verify(n, val, root_hash, branch, index):
     return True
 
 
+class IncrementalMerkleVerifier(object):
+    """Verifies branch proofs of the leaves of one merkle tree.
+
+    The nodes of the tree proven by the branches verified so far are kept, so
+    that a new branch is only hashed up to the first known node, and the
+    hashes of the verified leaves can be reused by :func:`decode_verified`.
+    """
+
+    def __init__(self, n, root_hash):
+        self.n = n
+        self.bottomrow = 2 ** ceil(math.log(n, 2))
+        self.nodes = {1: root_hash}
+
+    def verify(self, val, branch, index):
+        """Returns True if ``branch`` proves that ``val`` is the leaf
+        ``index`` of the tree, as :func:`merkle_verify`
+        """
+        if not 0 <= index < self.n or not isinstance(val, (str, bytes)) \
+                or len(branch) != ceil(math.log(self.n, 2)):
+            return False
+        t = self.bottomrow + index
+        tmp = hash(val)
+        proven = {t: tmp}
+        for br in branch:
+            if t in self.nodes:
+                break
+            proven[t ^ 1] = br
+            tmp = hash(br + tmp if t & 1 else tmp + br)
+            t >>= 1
+            proven[t] = tmp
+        if self.nodes.get(t) != tmp:
+            logger.info(f"Verification of leaf {index} failed")
+            return False
+        self.nodes.update(proven)
+        return True
+
+    def leaf_hashes(self):
+        """Returns the list of the hashes of the :math:`n` leaves, ``None``
+        for the leaves which are not proven by the branches verified so far"""
+        return [self.nodes.get(self.bottomrow + i) for i in range(self.n)]
+
+
 async def reliablebroadcast(sid, pid, n, f, leader, input, receive, send):
     """Reliable broadcast
     :param int pid: ``0 <= pid < N``
@@ -205,20 +327,26 @@ async def reliablebroadcast(sid, pid, n, f, leader, input, receive, send):
 
     from_leader = None
     stripes = defaultdict(lambda: [None for _ in range(n)])
+    verifiers = {}  # IncrementalMerkleVerifier of each roothash
     echo_counter = defaultdict(lambda: 0)
     echo_senders = set()  # Peers that have sent us ECHO messages
     ready = defaultdict(set)
     ready_sent = False
     ready_senders = set()  # Peers that have sent us READY messages
 
+    def verifier(roothash):
+        if roothash not in verifiers:
+            verifiers[roothash] = IncrementalMerkleVerifier(n, roothash)
+        return verifiers[roothash]
+
     def decode_output(roothash):
-        # Rebuild the merkle tree to guarantee decoding is correct
-        m = decode(k, n, stripes[roothash])
-        _stripes = encode(k, n, m)
-        _mt = merkle_tree(_stripes)
-        _roothash = _mt[1]
+        # Check the merkle tree of the decoded value to guarantee decoding is
+        # correct. The stripes have been verified, so only the missing ones are
+        # encoded and hashed.
+        m = decode_verified(k, n, stripes[roothash], roothash,
+                            verifiers[roothash].leaf_hashes())
         # TODO: Accountability: If this fails, incriminate leader
-        assert _roothash == roothash
+        assert m is not None
         return m
 
     while True:  # main receive loop
@@ -229,10 +357,8 @@ async def reliablebroadcast(sid, pid, n, f, leader, input, receive, send):
             if sender != leader:
                 logger.info(f"[{pid}] VAL message from other than leader: {sender}")
                 continue
-            try:
-                assert merkle_verify(n, stripe, roothash, branch, pid)
-            except Exception as e:
-                logger.info(f"[{pid}]Failed to validate VAL message: {e}")
+            if not verifier(roothash).verify(stripe, branch, pid):
+                logger.info(f"[{pid}]Failed to validate VAL message")
                 continue
 
             # Update
@@ -247,14 +373,12 @@ async def reliablebroadcast(sid, pid, n, f, leader, input, receive, send):
                 logger.info("[{pid}] Redundant ECHO")
                 continue
 
-            # We can optimistically skip the merkleVerify for "ECHO", because the
-            # entire merkle tree is checked later anyway.
-
-            # try:
-            #     assert merkleVerify(N, stripe, roothash, branch, sender)
-            # except AssertionError as e:
-                # logger.debug(f"Failed to validate ECHO message: {e}")
-            #     continue
+            # Only the branch of the stripe is checked. The branches verified
+            # before are remembered, and the hash of the stripe is reused when
+            # checking the decoded value.
+            if not verifier(roothash).verify(stripe, branch, sender):
+                logger.info(f"[{pid}] Failed to validate ECHO message from {sender}")
+                continue
 
             # Update
             stripes[roothash][sender] = stripe
@@ -0,0 +1,260 @@
+"""
+Wire codecs used by ``NodeCommunicator`` to serialize messages.
+
+Every encoded message starts with a single byte naming the codec that produced
+it, so a receiver can always decode what it is sent, whichever codec the sender
+picked for that particular message.
+"""
+
+import struct
+from pickle import dumps, loads
+
+from honeybadgermpc.field import GF, GFElement
+
+
+class PackedElements(object):
+    """A read-only sequence of ints in [0, 2**256), stored back to back as 32 byte
+    little endian words in a single buffer.
+
+    Large protocol payloads are built as packed buffers once and then handed to
+    the transport as is. On the receiving side the buffer is a view over the
+    received frame, so elements are only turned into ints when they are read.
+    """
+    ELEMENT_SIZE = 32
+
+    def __init__(self, buffer):
+        assert len(buffer) % PackedElements.ELEMENT_SIZE == 0
+        self.buffer = buffer
+
+    @classmethod
+    def from_ints(cls, values):
+        return cls(b"".join(v.to_bytes(PackedElements.ELEMENT_SIZE, "little")
+                            for v in values))
+
+    def __len__(self):
+        return len(self.buffer) // PackedElements.ELEMENT_SIZE
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PackedElements index out of range")
+
+        offset = index * PackedElements.ELEMENT_SIZE
+        return int.from_bytes(
+            self.buffer[offset:offset + PackedElements.ELEMENT_SIZE], "little")
+
+    def __iter__(self):
+        size = PackedElements.ELEMENT_SIZE
+        buf = memoryview(self.buffer)
+        for offset in range(0, len(buf), size):
+            yield int.from_bytes(buf[offset:offset + size], "little")
+
+    def __eq__(self, other):
+        if isinstance(other, PackedElements):
+            return self.buffer == other.buffer
+        return list(self) == other
+
+    def __repr__(self):
+        return f"PackedElements({list(self)})"
+
+    def __reduce__(self):
+        return (PackedElements, (bytes(self.buffer),))
+
+
+class PickleCodec(object):
+    """Serializes any picklable message"""
+    name = "pickle"
+    codec_id = 0
+
+    def encode(self, msg):
+        return bytes([self.codec_id]) + dumps(msg)
+
+    def decode(self, raw_msg):
+        if raw_msg[0] != self.codec_id:
+            return get_codec(codec_name(raw_msg)).decode(raw_msg)
+        return loads(memoryview(raw_msg)[1:])
+
+
+class FieldElementCodec(object):
+    """Packs the hot message shapes of the MPC protocols into fixed-width words:
+
+        (tag, (subtag, shareid, [values]))
+
+    where tag and subtag are strings, shareid is an int or a list of ints, and
+    values are either all ints in [0, 2**256), all GFElements of the same field,
+    or PackedElements. These are the messages sent by batch and single share
+    reconstruction when running under a ProcessProgramRunner. Values and share
+    ids are written as 32 byte and 8 byte little endian words respectively.
+    PackedElements are written without conversion, and decoded as PackedElements
+    viewing the received buffer.
+
+    Anything else is delegated to the fallback codec (pickle by default).
+    """
+    name = "field_elements"
+    codec_id = 1
+
+    ELEMENT_SIZE = 32
+    SHAREID_SIZE = 8
+    # codec id, flags, len(tag), len(subtag), number of share ids, number of values
+    HEADER = struct.Struct("<BBHHII")
+
+    # Flags
+    SHAREID_LIST = 1
+    FIELD_ELEMENTS = 2
+    PACKED_ELEMENTS = 4
+
+    def __init__(self, fallback=None):
+        self.fallback = PickleCodec() if fallback is None else fallback
+
+    def _pack(self, msg):
+        """Returns the encoded message, or None if msg is not of a supported shape"""
+        if type(msg) is not tuple or len(msg) != 2 or type(msg[0]) is not str:
+            return None
+
+        tag, inner = msg
+        if type(inner) is not tuple or len(inner) != 3 or type(inner[0]) is not str:
+            return None
+
+        subtag, shareid, values = inner
+        flags = 0
+        if type(values) is PackedElements:
+            flags |= FieldElementCodec.PACKED_ELEMENTS
+        elif type(values) is not list or len(values) == 0:
+            return None
+
+        if type(shareid) is int:
+            shareids = [shareid]
+        elif type(shareid) is list and all(type(s) is int for s in shareid):
+            flags |= FieldElementCodec.SHAREID_LIST
+            shareids = shareid
+        else:
+            return None
+
+        modulus = b""
+        if flags & FieldElementCodec.PACKED_ELEMENTS:
+            pass
+        elif type(values[0]) is GFElement:
+            field = values[0].field
+            if not all(type(v) is GFElement and v.field is field for v in values):
+                return None
+            if field.modulus.bit_length() > 8 * FieldElementCodec.ELEMENT_SIZE:
+                return None
+
+            flags |= FieldElementCodec.FIELD_ELEMENTS
+            modulus = field.modulus.to_bytes(FieldElementCodec.ELEMENT_SIZE, "little")
+            values = [v.value for v in values]
+        elif not all(type(v) is int and 0 <= v and v.bit_length() <= 256
+                     for v in values):
+            return None
+
+        tag, subtag = tag.encode(), subtag.encode()
+        try:
+            packed_shareids = b"".join(
+                s.to_bytes(FieldElementCodec.SHAREID_SIZE, "little", signed=True)
+                for s in shareids)
+        except OverflowError:
+            return None
+
+        if flags & FieldElementCodec.PACKED_ELEMENTS:
+            packed_values = values.buffer
+        else:
+            packed_values = b"".join(
+                v.to_bytes(FieldElementCodec.ELEMENT_SIZE, "little") for v in values)
+
+        return b"".join([
+            FieldElementCodec.HEADER.pack(
+                self.codec_id, flags, len(tag), len(subtag), len(shareids),
+                len(values)),
+            tag,
+            subtag,
+            packed_shareids,
+            modulus,
+            packed_values])
+
+    def encode(self, msg):
+        raw_msg = self._pack(msg)
+        if raw_msg is None:
+            return self.fallback.encode(msg)
+        return raw_msg
+
+    def decode(self, raw_msg):
+        if raw_msg[0] != self.codec_id:
+            return self.fallback.decode(raw_msg)
+
+        buf = memoryview(raw_msg)
+        _, flags, tag_len, subtag_len, num_shareids, num_values = \
+            FieldElementCodec.HEADER.unpack_from(buf)
+
+        offset = FieldElementCodec.HEADER.size
+        tag = str(buf[offset:offset + tag_len], "utf-8")
+        offset += tag_len
+        subtag = str(buf[offset:offset + subtag_len], "utf-8")
+        offset += subtag_len
+
+        size = FieldElementCodec.SHAREID_SIZE
+        shareids = [
+            int.from_bytes(buf[i:i + size], "little", signed=True)
+            for i in range(offset, offset + num_shareids * size, size)]
+        offset += num_shareids * size
+        shareid = shareids if flags & FieldElementCodec.SHAREID_LIST else shareids[0]
+
+        size = FieldElementCodec.ELEMENT_SIZE
+        field = None
+        if flags & FieldElementCodec.FIELD_ELEMENTS:
+            field = GF(int.from_bytes(buf[offset:offset + size], "little"))
+            offset += size
+
+        if flags & FieldElementCodec.PACKED_ELEMENTS:
+            return (tag, (subtag, shareid,
+                          PackedElements(buf[offset:offset + num_values * size])))
+
+        values = [int.from_bytes(buf[i:i + size], "little")
+                  for i in range(offset, offset + num_values * size, size)]
+        if field is not None:
+            values = [GFElement(v, field) for v in values]
+
+        return (tag, (subtag, shareid, values))
+
+
+CODECS = (PickleCodec, FieldElementCodec)
+
+
+def get_codec(name):
+    """Returns a new instance of the codec with the given name"""
+    codecs = {c.name: c for c in CODECS}
+    if name not in codecs:
+        raise ValueError(f"Unknown codec {name}. Supported codecs are {list(codecs)}")
+    return codecs[name]()
+
+
+def codec_name(raw_msg):
+    """Returns the name of the codec which produced an encoded message"""
+    codec_id = raw_msg[0]
+    if codec_id >= len(CODECS):
+        raise ValueError(f"Unknown codec id {codec_id}")
+    return CODECS[codec_id].name
+
+
+FRAME_LENGTH = struct.Struct("<I")
+
+
+def pack_frame(raw_msgs):
+    """Packs encoded messages into a single frame, each prefixed by its length"""
+    return b"".join(
+        part for raw_msg in raw_msgs
+        for part in (FRAME_LENGTH.pack(len(raw_msg)), raw_msg))
+
+
+def unpack_frame(frame):
+    """Yields the encoded messages packed into a frame by pack_frame"""
+    buf = memoryview(frame)
+    offset = 0
+    while offset < len(buf):
+        (length,) = FRAME_LENGTH.unpack_from(buf, offset)
+        offset += FRAME_LENGTH.size
+        yield buf[offset:offset + length]
+        offset += length
@@ -11,14 +11,55 @@ Sample config can be found at: conf/sample.ini
 """
 
 from argparse import ArgumentParser
+from tempfile import gettempdir
 import json
 from honeybadgermpc.reed_solomon import Algorithm as RSAlgorithm
 
 
 class NodeDetails(object):
-    def __init__(self, ip, port):
+    """Network details of a party.
+
+    Peers are given in the config as "ip:port" to be reached over TCP, or as
+    "ipc://ip:port" for parties running on the same host, which are then reached
+    through a ZMQ ipc:// (unix domain) socket named after the port.
+    """
+    TCP = "tcp"
+    IPC = "ipc"
+
+    def __init__(self, ip, port, transport=TCP):
+        assert transport in (NodeDetails.TCP, NodeDetails.IPC), \
+            f"transport must be {NodeDetails.TCP} or {NodeDetails.IPC}"
         self.ip = ip
         self.port = port
+        self.transport = transport
+
+    @classmethod
+    def from_config(cls, addrinfo):
+        transport = NodeDetails.TCP
+        if addrinfo.startswith("ipc://"):
+            transport = NodeDetails.IPC
+            addrinfo = addrinfo[len("ipc://"):]
+
+        ip, port = addrinfo.split(':')
+        return cls(ip, int(port), transport)
+
+    def ipc_endpoint(self):
+        return f"ipc://{gettempdir()}/hbmpc-{self.port}.ipc"
+
+    def connect_endpoint(self):
+        """Endpoint other parties connect to in order to send to this party"""
+        if self.transport == NodeDetails.IPC:
+            return self.ipc_endpoint()
+        return f"tcp://{self.ip}:{self.port}"
+
+    def bind_endpoints(self):
+        """Endpoints this party listens on. Parties reached over ipc also listen on
+        TCP so that remote peers can still connect to them.
+        """
+        endpoints = [f"tcp://*:{self.port}"]
+        if self.transport == NodeDetails.IPC:
+            endpoints.append(self.ipc_endpoint())
+        return endpoints
 
 
 class ConfigVars(object):
@@ -26,13 +67,17 @@ class ConfigVars(object):
 
 
 class ReconstructionConfig(object):
-    def __init__(self, induce_faults, decoding_algorithm):
+    def __init__(self, induce_faults, decoding_algorithm, batch_opens=True):
         self.induce_faults = induce_faults
         self.decoding_algorithm = decoding_algorithm
 
+        # Coalesce single share opens issued in the same event loop tick
+        self.batch_opens = batch_opens
+
     @classmethod
     def default(cls):
-        return cls(induce_faults=False, decoding_algorithm=RSAlgorithm.GAO)
+        return cls(induce_faults=False, decoding_algorithm=RSAlgorithm.GAO,
+                   batch_opens=True)
 
     @classmethod
     def from_json(cls, json_config):
@@ -47,6 +92,39 @@ class ReconstructionConfig(object):
                 f"decoding_algorithm must be in {decoding_algorithms}"
             res.decoding_algorithm = json_config['decoding_algorithm']
 
+        if 'batch_opens' in json_config:
+            res.batch_opens = json_config['batch_opens']
+
+        return res
+
+
+class CoalescingConfig(object):
+    """Flush policy for the per-peer message coalescing in NodeCommunicator.
+
+    Messages to a peer are packed into one frame until the frame holds at least
+    max_bytes, or until max_delay seconds have passed since the first message
+    of the frame was taken from the queue. With max_delay = 0 only messages
+    which are already queued are packed together, adding no latency.
+    """
+
+    def __init__(self, max_bytes, max_delay):
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+
+    @classmethod
+    def default(cls):
+        return cls(max_bytes=64 * 1024, max_delay=0)
+
+    @classmethod
+    def from_json(cls, json_config):
+        res = cls.default()
+        if 'max_bytes' in json_config:
+            res.max_bytes = json_config['max_bytes']
+        if 'max_delay' in json_config:
+            res.max_delay = json_config['max_delay']
+
+        assert res.max_bytes > 0, "max_bytes must be positive"
+        assert res.max_delay >= 0, "max_delay must not be negative"
         return res
 
 
@@ -58,6 +136,8 @@ class HbmpcConfig(object):
     skip_preprocessing = False
     extras = None
     reconstruction = None
+    codec = None
+    coalescing = None
 
     @staticmethod
     def load_config():
@@ -78,7 +158,8 @@ class HbmpcConfig(object):
             dest='config_file_path',
             help='Path from where to load the HBMPC config file.')
 
-        args = parser.parse_args()
+        # Other arguments are left for the entry point that is being run
+        args, _ = parser.parse_known_args()
 
         if args.is_dist:
             config = json.load(open(args.config_file_path))
@@ -87,8 +168,7 @@ class HbmpcConfig(object):
             HbmpcConfig.t = config["t"]
             HbmpcConfig.my_id = config["my_id"]
             HbmpcConfig.peers = {
-                peerid: NodeDetails(
-                    addrinfo.split(':')[0], int(addrinfo.split(':')[1]))
+                peerid: NodeDetails.from_config(addrinfo)
                 for peerid, addrinfo in enumerate(config["peers"])
             }
 
@@ -96,6 +176,8 @@ class HbmpcConfig(object):
                 HbmpcConfig.skip_preprocessing = config["skip_preprocessing"]
             if "extra" in config:
                 HbmpcConfig.extras = config["extra"]
+            if "codec" in config:
+                HbmpcConfig.codec = config["codec"]
 
             reconstruction_data = {}
             if "reconstruction" in config:
@@ -104,6 +186,9 @@ class HbmpcConfig(object):
             HbmpcConfig.reconstruction = ReconstructionConfig.from_json(
                 reconstruction_data)
 
+            HbmpcConfig.coalescing = CoalescingConfig.from_json(
+                config.get("coalescing", {}))
+
             # Ensure the required values are set before this method terminates
             assert HbmpcConfig.my_id is not None, "Node Id: missing"
             assert HbmpcConfig.N is not None, "N: missing"
@@ -16,3 +16,7 @@ class RedundantMessageError(BroadcastError):
 
 class AbandonedNodeError(HoneyBadgerMPCError):
     """Raised when a node does not have enough peer to carry on a distirbuted task."""
+
+
+class CoinUnavailableError(BroadcastError):
+    """Raised when a common coin cannot be produced for a round."""
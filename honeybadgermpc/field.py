@@ -21,6 +21,7 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with VIFF. If not, see <http://www.gnu.org/licenses/>.
 from gmpy2 import is_prime, mpz
+from operator import mul
 from random import Random
 
 
@@ -30,6 +31,7 @@ class FieldsNotIdentical(Exception):
 
 class FieldElement(object):
     """Common base class for elements."""
+    __slots__ = ()
 
     def __int__(self):
         return self.value
@@ -57,6 +59,10 @@ class GF(object):
     def __call__(self, value):
         return GFElement(value, self)
 
+    def vector(self, values):
+        """Returns a GFVector holding values, which may be ints or GFElements"""
+        return GFVector(values, self)
+
     def __reduce__(self):
         return (GF, (self.modulus,))
 
@@ -65,38 +71,40 @@ class GF(object):
 
 
 class GFElement(FieldElement):
+    __slots__ = ("modulus", "field", "value")
 
     def __init__(self, value, gf):
         self.modulus = gf.modulus
         self.field = gf
         self.value = value % self.modulus
 
+    def __reduce__(self):
+        return (GFElement, (self.value, self.field))
+
     def __add__(self, other):
         """Addition."""
-        if not isinstance(other, (GFElement, int)):
-            return NotImplemented
-        try:
+        if isinstance(other, GFElement):
             # We can do a quick test using 'is' here since
             # there will only be one class representing this
             # field.
             if self.field is not other.field:
                 raise FieldsNotIdentical
             return GFElement(self.value + other.value, self.field)
-        except AttributeError:
+        if isinstance(other, int):
             return GFElement(self.value + other, self.field)
+        return NotImplemented
 
     __radd__ = __add__
 
     def __sub__(self, other):
         """Subtraction."""
-        if not isinstance(other, (GFElement, int)):
-            return NotImplemented
-        try:
+        if isinstance(other, GFElement):
             if self.field is not other.field:
                 raise FieldsNotIdentical
             return GFElement(self.value - other.value, self.field)
-        except AttributeError:
+        if isinstance(other, int):
             return GFElement(self.value - other, self.field)
+        return NotImplemented
 
     def __rsub__(self, other):
         """Subtraction (reflected argument version)."""
@@ -104,14 +112,13 @@ class GFElement(FieldElement):
 
     def __mul__(self, other):
         """Multiplication."""
-        if not isinstance(other, (GFElement, int)):
-            return NotImplemented
-        try:
+        if isinstance(other, GFElement):
             if self.field is not other.field:
                 raise FieldsNotIdentical
             return GFElement(self.value * other.value, self.field)
-        except AttributeError:
+        if isinstance(other, int):
             return GFElement(self.value * other, self.field)
+        return NotImplemented
 
     __rmul__ = __mul__
 
@@ -132,21 +139,7 @@ class GFElement(FieldElement):
         if self.value == 0:
             raise ZeroDivisionError("Cannot invert zero")
 
-        def extended_gcd(a, b):
-            """The extended Euclidean algorithm."""
-            x = 0
-            lastx = 1
-            y = 1
-            lasty = 0
-            while b != 0:
-                quotient = a // b
-                a, b = b, a % b
-                x, lastx = lastx - quotient*x, x
-                y, lasty = lasty - quotient*y, y
-            return (lastx, lasty, a)
-
-        inverse = extended_gcd(self.value, self.modulus)[0]
-        return GFElement(inverse, self.field)
+        return GFElement(pow(self.value, -1, self.modulus), self.field)
 
     def __div__(self, other):
         """Division."""
@@ -289,6 +282,204 @@ class GFElement(FieldElement):
         return self.value != 0
 
 
+class GFVector(object):
+    """A vector of elements of a single field.
+
+    The elements are stored as a plain list of reduced ints and all operations
+    work on the whole vector at once, so no GFElement is created per element.
+    Binary operations take either another GFVector of the same field and length,
+    which is applied elementwise, or a scalar (GFElement or int), which is
+    applied to every element.
+    """
+    __slots__ = ("field", "values")
+
+    def __init__(self, values, gf):
+        modulus = gf.modulus
+        self.field = gf
+        self.values = [
+            (v.value if isinstance(v, GFElement) else v) % modulus for v in values]
+
+    @classmethod
+    def _from_reduced(cls, values, gf):
+        """Fast path for values which are already ints in [0, modulus)"""
+        vector = cls.__new__(cls)
+        vector.field = gf
+        vector.values = values
+        return vector
+
+    def __reduce__(self):
+        return (GFVector, (self.values, self.field))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return GFVector._from_reduced(self.values[index], self.field)
+        return GFElement(self.values[index], self.field)
+
+    def __iter__(self):
+        field = self.field
+        return (GFElement(v, field) for v in self.values)
+
+    def _other_values(self, other):
+        """Returns the values of other to combine elementwise with self, or an int
+        if other is a scalar
+        """
+        if isinstance(other, GFVector):
+            if self.field is not other.field:
+                raise FieldsNotIdentical
+            if len(self.values) != len(other.values):
+                raise ValueError(
+                    f"GFVectors of different lengths: {len(self)} != {len(other)}")
+            return other.values
+        if isinstance(other, GFElement):
+            if self.field is not other.field:
+                raise FieldsNotIdentical
+            return other.value
+        if isinstance(other, int):
+            return other
+        return None
+
+    def __add__(self, other):
+        b = self._other_values(other)
+        if b is None:
+            return NotImplemented
+
+        p = self.field.modulus
+        if isinstance(b, int):
+            values = [(a + b) % p for a in self.values]
+        else:
+            values = [(x + y) % p for x, y in zip(self.values, b)]
+        return GFVector._from_reduced(values, self.field)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        b = self._other_values(other)
+        if b is None:
+            return NotImplemented
+
+        p = self.field.modulus
+        if isinstance(b, int):
+            values = [(a - b) % p for a in self.values]
+        else:
+            values = [(x - y) % p for x, y in zip(self.values, b)]
+        return GFVector._from_reduced(values, self.field)
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        b = self._other_values(other)
+        if b is None:
+            return NotImplemented
+
+        if isinstance(b, int):
+            return self.scale(b)
+
+        p = self.field.modulus
+        values = [x * y % p for x, y in zip(self.values, b)]
+        return GFVector._from_reduced(values, self.field)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        p = self.field.modulus
+        return GFVector._from_reduced([-a % p for a in self.values], self.field)
+
+    def scale(self, c):
+        """Multiplies every element by the scalar c"""
+        p = self.field.modulus
+        c = (c.value if isinstance(c, GFElement) else c) % p
+        return GFVector._from_reduced([a * c % p for a in self.values], self.field)
+
+    def inverse(self):
+        """Elementwise inverse. Raises ZeroDivisionError if any element is zero."""
+        return GFVector._from_reduced(
+            batch_invert_values(self.values, self.field.modulus), self.field)
+
+    __invert__ = inverse
+
+    def dot(self, other):
+        """Inner product with another GFVector, returned as a GFElement"""
+        b = self._other_values(other)
+        if not isinstance(b, list):
+            raise TypeError("dot is only defined between GFVectors")
+        return GFElement(sum(map(mul, self.values, b)), self.field)
+
+    def __eq__(self, other):
+        if isinstance(other, GFVector):
+            return self.field is other.field and self.values == other.values
+        return NotImplemented
+
+    def __repr__(self):
+        return "GFVector(%r)" % self.values
+
+
+def batch_invert_values(values, modulus):
+    """Inverts ints modulo a prime with Montgomery's trick: a single modular
+    inversion of the product of all values, and 3(k-1) multiplications.
+
+    Raises ZeroDivisionError if any value is zero modulo the modulus.
+    """
+    k = len(values)
+    if k == 0:
+        return []
+
+    # prefixes[i] = values[0] * ... * values[i-1]
+    prefixes = [1] * k
+    acc = 1
+    for i, v in enumerate(values):
+        if v % modulus == 0:
+            raise ZeroDivisionError("Cannot invert zero")
+        prefixes[i] = acc
+        acc = acc * v % modulus
+
+    inverse = pow(acc, -1, modulus)
+    inverses = [0] * k
+    for i in range(k - 1, -1, -1):
+        # inverse = 1 / (values[0] * ... * values[i])
+        inverses[i] = inverse * prefixes[i] % modulus
+        inverse = inverse * values[i] % modulus
+
+    return inverses
+
+
+def batch_invert(elements):
+    """Inverts a list of field elements with a single inversion.
+
+    Works for any elements supporting * and 1 / x, with a fast path for
+    GFElements of the same field. Zero cannot be inverted; for GFElements this
+    raises a ZeroDivisionError.
+    """
+    elements = list(elements)
+    if len(elements) == 0:
+        return []
+
+    field = getattr(elements[0], "field", None)
+    if type(field) is GF and all(type(e) is GFElement for e in elements):
+        if any(e.field is not field for e in elements):
+            raise FieldsNotIdentical
+        inverses = batch_invert_values([e.value for e in elements], field.modulus)
+        return [GFElement(v, field) for v in inverses]
+
+    prefixes = [None] * len(elements)
+    acc = elements[0]
+    for i in range(1, len(elements)):
+        prefixes[i] = acc
+        acc = acc * elements[i]
+
+    inverse = 1 / acc
+    inverses = [None] * len(elements)
+    for i in range(len(elements) - 1, 0, -1):
+        inverses[i] = inverse * prefixes[i]
+        inverse = inverse * elements[i]
+    inverses[0] = inverse
+
+    return inverses
+
+
 def fake_gf(modulus):
     """Construct a fake field.
 
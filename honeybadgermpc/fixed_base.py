@@ -0,0 +1,30 @@
+"""
+Fixed-base precomputation tables for CRS points.
+
+Every AVSS instance in a process exponentiates the same few CRS points (the
+generator raised to the ephemeral keys, and the points of the verification
+equations), so their window tables are built once per process and shared by all
+of them. Products of powers of many points go through multiexp instead, which
+does not use these tables.
+"""
+
+from pickle import dumps, loads
+
+_preprocessed = {}
+
+
+def preprocessed(element, level=4):
+    """Returns a copy of element (a G1, G2 or GT) carrying a fixed-base table of
+    the given level. Every caller asking for the same element and level gets the
+    same object, which must therefore not be modified in place.
+    """
+    key = (level, dumps(element))
+    if key not in _preprocessed:
+        copy = loads(key[1])
+        copy.preprocess(level)
+        _preprocessed[key] = copy
+    return _preprocessed[key]
+
+
+def clear_tables():
+    _preprocessed.clear()
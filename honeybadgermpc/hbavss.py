@@ -1,8 +1,11 @@
 import logging
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pickle import dumps, loads
+from honeybadgermpc.batch_verification import BatchVerifier, find_invalid_groups
 from honeybadgermpc.betterpairing import ZR, interpolate_g1_at_x, G1
-from honeybadgermpc.polynomial import polynomials_over
+from honeybadgermpc.polynomial import vectorized_polynomials_over
 from honeybadgermpc.poly_commit_const import PolyCommitConst
 from honeybadgermpc.poly_commit_lin import PolyCommitLin
 from honeybadgermpc.symmetric_crypto import SymmetricCrypto
@@ -32,9 +35,11 @@ class HbAvssLight():
     def __init__(self, public_keys, private_key, crs, n, t, my_id, send, recv):
         self.public_keys, self.private_key = public_keys, private_key
         self.n, self.t, self.my_id = n, t, my_id
-        self.g = crs[0]
         self.poly_commit = PolyCommitLin(crs)
         self.poly_commit.preprocess(5)
+        self.g = self.poly_commit.g
+        # Verifies the shares of all the dealers handled concurrently together
+        self.batch_verifier = BatchVerifier(self.poly_commit)
 
         # Create a mechanism to split the `recv` channels based on `tag`
         self.subscribe_recv_task, self.subscribe_recv = subscribe_recv(recv)
@@ -49,7 +54,7 @@ class HbAvssLight():
         self.output_queue = asyncio.Queue()
 
         self.field = ZR
-        self.poly = polynomials_over(self.field)
+        self.poly = vectorized_polynomials_over(self.field)
 
     def __enter__(self):
         return self
@@ -89,8 +94,8 @@ class HbAvssLight():
         try:
             shares, witnesses = SymmetricCrypto.decrypt(
                 str(shared_key).encode(), encrypted_blobs[self.my_id])
-            if self.poly_commit.batch_verify_eval(
-                    commitments, self.my_id+1, shares, witnesses):
+            if await self.batch_verifier.verify(list(zip(
+                    commitments, repeat(self.my_id+1), shares, witnesses))):
                 logger.info(f"OK_timestamp: {time.time()}")
                 multicast((HbAVSSMessageType.OK, ""))
             else:
@@ -165,8 +170,8 @@ class HbAvssLight():
                 except Exception:
                     ok_set.add(sender)
                     continue
-                if self.poly_commit.batch_verify_eval(
-                        commitments, sender+1, shares_j, auxs_j):
+                if await self.batch_verifier.verify(list(zip(
+                        commitments, repeat(sender+1), shares_j, auxs_j))):
                     for i in range(len(commitments)):
                         recovery_shares[i].append([sender+1, shares_j[i]])
                     recovery_set.add(sender)
@@ -186,13 +191,14 @@ class HbAvssLight():
             auxlist.append(aux_poly)
         ephemeral_secret_key = self.field.random()
         ephemeral_public_key = pow(self.g, ephemeral_secret_key)
+        points = range(1, self.n+1)
+        share_table = self.poly.evaluate_batch(philist, points)
+        witness_table = self.poly_commit.create_witnesses(auxlist, points)
         z = [None]*self.n
         for i in range(self.n):
             shared_key = pow(self.public_keys[i], ephemeral_secret_key)
-            shares, witnesses = [], []
-            for j in range(len(philist)):
-                shares.append(philist[j](i+1))
-                witnesses.append(self.poly_commit.create_witness(auxlist[j], i+1))
+            shares = [phi_shares[i] for phi_shares in share_table]
+            witnesses = [aux_witnesses[i] for aux_witnesses in witness_table]
             z[i] = SymmetricCrypto.encrypt(str(shared_key).encode(), (shares, witnesses))
 
         return dumps((commitlist, ephemeral_public_key, z))
@@ -286,12 +292,19 @@ class HbAvssLight():
 
 
 class HbAvssBatch():
-    def __init__(self, public_keys, private_key, crs, n, t, my_id, send, recv):
+    def __init__(self, public_keys, private_key, crs, n, t, my_id, send, recv,
+                 executor=None):
+        """
+        executor: optional executor returned by dealer_executor for the same crs.
+        When given, the dealer deals its values and encrypts the message of each
+        recipient on it, leaving the event loop free for the other protocols of
+        the node.
+        """
         self.public_keys, self.private_key = public_keys, private_key
         self.n, self.t, self.my_id = n, t, my_id
         assert len(crs) == 3
         assert len(crs[0]) == t+1
-        self.g = crs[0][0]
+        self.executor = executor
 
         # Create a mechanism to split the `recv` channels based on `tag`
         self.subscribe_recv_task, self.subscribe_recv = subscribe_recv(recv)
@@ -302,10 +315,13 @@ class HbAvssBatch():
         self.get_send = _send
 
         self.field = ZR
-        self.poly = polynomials_over(self.field)
+        self.poly = vectorized_polynomials_over(self.field)
         self.poly_commit = PolyCommitConst(crs)
         self.poly_commit.preprocess_prover()
         self.poly_commit.preprocess_verifier()
+        self.g = self.poly_commit.gs[0]
+        # Verifies the shares of all the dealers handled concurrently together
+        self.batch_verifier = BatchVerifier(self.poly_commit)
 
         self.avid_msg_queue = asyncio.Queue()
         self.tasks = []
@@ -384,15 +400,13 @@ class HbAvssBatch():
 
         # call if decryption was successful
         if all_shares_valid:
-            if not self.poly_commit.batch_verify_eval(
-                    commitments, self.my_id+1, shares, auxes, witnesses):
+            evals = list(zip(
+                commitments, repeat(self.my_id+1), shares, auxes, witnesses))
+            if not await self.batch_verifier.verify(evals):
                 all_shares_valid = False
                 # Find which share was invalid and implicate
-                for k in range(secret_count):
-                    if not self.poly_commit.verify_eval(
-                            commitments[k], self.my_id+1, shares[k], auxes[k], witnesses[k]):  # (# noqa: E501)
-                        multicast((HbAVSSMessageType.IMPLICATE, self.private_key, k))
-                        break
+                k = min(find_invalid_groups(self.poly_commit, [[e] for e in evals]))
+                multicast((HbAVSSMessageType.IMPLICATE, self.private_key, k))
         if all_shares_valid:
             logger.info(f"OK_timestamp: {time.time()}")
             multicast((HbAVSSMessageType.OK, ""))
@@ -517,20 +531,46 @@ class HbAvssBatch():
         # for each party Pi and each k ∈ [t+1]
         #   1. w[i][k] <- CreateWitnesss(Ck,auxk,i)
         #   2. z[i][k] <- EncPKi(φ(i,k), w[i][k])
+        points = range(1, n+1)
+        phi_table = self.poly.evaluate_batch(phi, points)
+        aux_table = self.poly.evaluate_batch(aux_poly, points)
         dispersal_msg_list = [None] * n
         for i in range(n):
             shared_key = pow(self.public_keys[i], ephemeral_secret_key)
             z = [None] * secret_count
             for k in range(secret_count):
                 witness = self.poly_commit.create_witness(phi[k], aux_poly[k], i+1)
-                z[k] = (int(phi[k](i+1)),
-                        int(aux_poly[k](i+1)),
+                z[k] = (int(phi_table[k][i]),
+                        int(aux_table[k][i]),
                         witness)
             zz = SymmetricCrypto.encrypt(str(shared_key).encode(), z)
             dispersal_msg_list[i] = zz
 
         return dumps((commitments, ephemeral_public_key)), dispersal_msg_list
 
+    async def _get_dealer_msg_parallel(self, values, n):
+        """Same as _get_dealer_msg, with every t+1 values dealt and the message of
+        every recipient encrypted as separate jobs on self.executor"""
+        while len(values) % (self.t + 1) != 0:
+            values.append(0)
+        loop = asyncio.get_event_loop()
+
+        chunks = await asyncio.gather(*[
+            loop.run_in_executor(
+                self.executor, _deal_values, self.t, n, values[k:k+self.t+1])
+            for k in range(0, len(values), self.t+1)])
+        commitments = [c for chunk_commitments, _ in chunks for c in chunk_commitments]
+
+        ephemeral_secret_key = self.field.random()
+        ephemeral_public_key = pow(self.g, ephemeral_secret_key)
+        dispersal_msg_list = await asyncio.gather(*[
+            loop.run_in_executor(
+                self.executor, _encrypt_dispersal_msg, self.public_keys[i],
+                ephemeral_secret_key, [z for _, rows in chunks for z in rows[i]])
+            for i in range(n)])
+
+        return dumps((commitments, ephemeral_public_key)), list(dispersal_msg_list)
+
     async def avss(self, avss_id, values=None, dealer_id=None, client_mode=False):
         """
         A batched version of avss with share recovery
@@ -561,7 +601,11 @@ class HbAvssBatch():
         if self.my_id == dealer_id:
             # broadcast_msg: phi & public key for reliable broadcast
             # dispersal_msg_list: the list of payload z
-            broadcast_msg, dispersal_msg_list = self._get_dealer_msg(values, n)
+            if self.executor is None:
+                broadcast_msg, dispersal_msg_list = self._get_dealer_msg(values, n)
+            else:
+                broadcast_msg, dispersal_msg_list = \
+                    await self._get_dealer_msg_parallel(values, n)
 
         tag = f"{dealer_id}-{avss_id}-B-RBC"
         send, recv = self.get_send(tag), self.subscribe_recv(tag)
@@ -590,6 +634,56 @@ class HbAvssBatch():
         await self._process_avss_msg(avss_id, dealer_id, rbc_msg, avid)
 
 
+def dealer_executor(crs, max_workers):
+    """Returns a ProcessPoolExecutor for the dealer of an HbAvssBatch using crs.
+    Its workers set up their PolyCommitConst for crs once, when they start."""
+    return ProcessPoolExecutor(max_workers=max_workers,
+                               initializer=_init_dealer_worker, initargs=(crs,))
+
+
+# PolyCommitConst of a dealer worker process, set up by _init_dealer_worker
+_dealer_poly_commit = None
+
+
+def _init_dealer_worker(crs):
+    global _dealer_poly_commit
+    _dealer_poly_commit = PolyCommitConst(crs)
+    _dealer_poly_commit.preprocess_prover()
+
+
+def _deal_values(t, n, values):
+    """Samples a random degree t polynomial for each value, commits to it and
+    computes its shares, aux shares and witnesses at 1..n.
+
+    output:
+        (commitments, rows), where rows[i] lists the (share, aux share, witness)
+        of every value for the recipient i+1, the shares as ints
+    """
+    assert _dealer_poly_commit is not None, "Use an executor from dealer_executor"
+    poly = vectorized_polynomials_over(ZR)
+    phi, commitments, aux_poly = [], [], []
+    for value in values:
+        phi.append(poly.random(t, value))
+        commitment, aux = _dealer_poly_commit.commit(phi[-1])
+        commitments.append(commitment)
+        aux_poly.append(aux)
+
+    points = range(1, n+1)
+    phi_table = poly.evaluate_batch(phi, points)
+    aux_table = poly.evaluate_batch(aux_poly, points)
+    rows = [[(int(phi_table[k][i]), int(aux_table[k][i]),
+              _dealer_poly_commit.create_witness(phi[k], aux_poly[k], i+1))
+             for k in range(len(values))]
+            for i in range(n)]
+    return commitments, rows
+
+
+def _encrypt_dispersal_msg(public_key, ephemeral_secret_key, z):
+    """Encrypts the shares and witnesses z for the recipient with public_key"""
+    shared_key = pow(public_key, ephemeral_secret_key)
+    return SymmetricCrypto.encrypt(str(shared_key).encode(), z)
+
+
 def get_avss_params(n, t):
     g, h = G1.rand(seed=[0, 0, 0, 1]), G1.rand(seed=[0, 0, 0, 1])
     public_keys, private_keys = [None]*n, [None]*n
@@ -3,22 +3,36 @@ import asyncio
 
 from zmq import ROUTER, DEALER, IDENTITY
 from zmq.asyncio import Context
-from pickle import dumps, loads
 from psutil import cpu_count
+from collections import defaultdict
+from functools import partial
 
 from honeybadgermpc.mpc import Mpc
-from honeybadgermpc.config import HbmpcConfig, ConfigVars
+from honeybadgermpc.config import HbmpcConfig, ConfigVars, CoalescingConfig
+from honeybadgermpc.codec import FieldElementCodec, get_codec, codec_name, \
+    pack_frame, unpack_frame
 from honeybadgermpc.utils.misc import wrap_send, subscribe_recv
 
 
 class NodeCommunicator(object):
     LAST_MSG = None
 
-    def __init__(self, peers_config, my_id, linger_timeout):
+    def __init__(self, peers_config, my_id, linger_timeout, codec=None,
+                 coalescing=None):
         self.peers_config = peers_config
         self.my_id = my_id
 
+        # Serializes messages sent to other nodes, see honeybadgermpc.codec
+        self.codec = FieldElementCodec() if codec is None else codec
+
+        # Messages to the same node are packed together into a single frame
+        self.coalescing = CoalescingConfig.default() if coalescing is None \
+            else coalescing
+
         self.bytes_sent = 0
+        self.frames_sent = 0
+        # codec name => bytes sent in messages encoded by that codec
+        self.bytes_sent_per_codec = defaultdict(int)
         self.benchmark_logger = logging.LoggerAdapter(
             logging.getLogger("benchmark_logger"), {"node_id": my_id})
 
@@ -58,12 +72,17 @@ class NodeCommunicator(object):
         logging.debug("Router task cancelled.")
         self.zmq_context.destroy(linger=self.linger_timeout*1000)
         self.benchmark_logger.info("Total bytes sent out: %d", self.bytes_sent)
+        self.benchmark_logger.info("Total frames sent out: %d", self.frames_sent)
+        for name, bytes_sent in self.bytes_sent_per_codec.items():
+            self.benchmark_logger.info(
+                "Bytes sent out by %s codec: %d", name, bytes_sent)
 
     async def _setup(self):
         # Setup one router for a party, this acts as a
         # server for receiving messages from other parties.
         router = self.zmq_context.socket(ROUTER)
-        router.bind(f"tcp://*:{self.peers_config[self.my_id].port}")
+        for endpoint in self.peers_config[self.my_id].bind_endpoints():
+            router.bind(endpoint)
         # Start a task to receive messages on this node.
         self._router_task = asyncio.create_task(self._recv_loop(router))
 
@@ -76,32 +95,72 @@ class NodeCommunicator(object):
                 # used to appropriately route the message. This is not a good idea since
                 # a node can pretend to send messages on behalf of other nodes.
                 dealer.setsockopt(IDENTITY, str(self.my_id).encode())
-                dealer.connect(
-                    f"tcp://{self.peers_config[i].ip}:{self.peers_config[i].port}")
+                # Parties on the same host are reached over ipc:// if configured so
+                dealer.connect(self.peers_config[i].connect_endpoint())
                 # Setup a task which reads messages intended for this
                 # party from a queue and then sends them to this node.
                 self._dealer_tasks.append(
                     asyncio.create_task(
                         self._process_node_messages(
-                            i, self._sender_queues[i], dealer.send_multipart)))
+                            i, self._sender_queues[i],
+                            partial(dealer.send_multipart, copy=False))))
 
     async def _recv_loop(self, router):
         while True:
-            sender_id, raw_msg = await router.recv_multipart()
-            msg = loads(raw_msg)
-            # logging.debug("[RECV] FROM: %s, MSG: %s,", sender_id, msg)
-            self._receiver_queue.put_nowait((int(sender_id), msg))
+            # Frames are not copied out of ZMQ, messages are decoded from their buffer
+            sender_id, frame = await router.recv_multipart(copy=False)
+            sender_id = int(sender_id.bytes)
+            for raw_msg in unpack_frame(frame.buffer):
+                msg = self.codec.decode(raw_msg)
+                # logging.debug("[RECV] FROM: %s, MSG: %s,", sender_id, msg)
+                self._receiver_queue.put_nowait((sender_id, msg))
+
+    def _encode(self, msg):
+        raw_msg = self.codec.encode(msg)
+        self.bytes_sent_per_codec[codec_name(raw_msg)] += len(raw_msg)
+        return raw_msg
 
     async def _process_node_messages(self, node_id, node_msg_queue, send_to_node):
-        while True:
+        """Sends the messages queued for a node, packing consecutive messages into
+        one frame according to the coalescing flush policy
+        """
+        loop = asyncio.get_event_loop()
+        last_msg = False
+        while not last_msg:
             msg = await node_msg_queue.get()
             if msg is NodeCommunicator.LAST_MSG:
-                logging.debug("No more messages to Node: %d can be sent.", node_id)
                 break
-            raw_msg = dumps(msg)
-            self.bytes_sent += len(raw_msg)
-            # logging.debug("[SEND] TO: %d, MSG: %s", node_id, msg)
-            await send_to_node([raw_msg])
+
+            raw_msgs = [self._encode(msg)]
+            frame_size = len(raw_msgs[0])
+            deadline = loop.time() + self.coalescing.max_delay
+            while frame_size < self.coalescing.max_bytes:
+                try:
+                    msg = node_msg_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        msg = await asyncio.wait_for(node_msg_queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+
+                if msg is NodeCommunicator.LAST_MSG:
+                    last_msg = True
+                    break
+
+                raw_msg = self._encode(msg)
+                raw_msgs.append(raw_msg)
+                frame_size += len(raw_msg)
+
+            frame = pack_frame(raw_msgs)
+            self.bytes_sent += len(frame)
+            self.frames_sent += 1
+            # logging.debug("[SEND] TO: %d, MSGS: %d", node_id, len(raw_msgs))
+            await send_to_node([frame])
+
+        logging.debug("No more messages to Node: %d can be sent.", node_id)
 
 
 class ProcessProgramRunner(object):
@@ -113,7 +172,13 @@ class ProcessProgramRunner(object):
         self.mpc_config = mpc_config
         self.mpc_config[ConfigVars.Reconstruction] = HbmpcConfig.reconstruction
 
-        self.node_communicator = NodeCommunicator(peers_config, my_id, linger_timeout)
+        codec = None
+        if HbmpcConfig.codec is not None:
+            codec = get_codec(HbmpcConfig.codec)
+
+        self.node_communicator = NodeCommunicator(
+            peers_config, my_id, linger_timeout, codec=codec,
+            coalescing=HbmpcConfig.coalescing)
         self.progs = []
 
     def execute(self, sid, program, **kwargs):
@@ -0,0 +1,120 @@
+"""
+Lagrange coefficients for interpolating over fixed evaluation sets.
+
+Protocols keep interpolating over the same sets of parties, so the weights
+lambda_i(x) = prod_{k != i} (x - x_k) / (x_i - x_k) are computed once per
+(field, set of points, target point) and shared by every caller. Interpolating
+a value is then a single dot product of the weights with the y values.
+"""
+
+from collections import OrderedDict
+from functools import reduce
+from operator import mul
+
+from .field import batch_invert
+
+
+class LagrangeCache(object):
+    """Bounded LRU cache of Lagrange weight vectors and basis polynomials.
+
+    The cache is capped by the total number of field elements it holds, rather
+    than the number of entries, since a weight vector for n points is n elements
+    and a set of basis polynomials is n^2. Least recently used entries are
+    evicted first.
+    """
+    DEFAULT_MAX_SIZE = 1 << 16
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, create, size=1):
+        """Return the entry for key, calling create() to build it on a miss.
+
+        args:
+            key: hashable key of the entry
+            create: function building the entry
+            size: number of field elements held by the entry
+        """
+        try:
+            value, _ = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = create()
+            if size <= self.max_size:
+                self._entries[key] = (value, size)
+                self.size += size
+                while self.size > self.max_size:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self.size -= evicted_size
+                    self.evictions += 1
+            return value
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def coefficients(self, field, xs, x=0):
+        """Returns the Lagrange weights for interpolating at x from points xs.
+
+        args:
+            field: callable mapping ints to field elements, e.g. a GF or ZR
+            xs: evaluation points, as ints or field elements
+            x: point to interpolate at
+        output:
+            dict mapping int(x_i) to lambda_i(x) for every x_i in xs
+        """
+        points = tuple(sorted(int(x_i) for x_i in xs))
+        x = int(x)
+        return self.get((field, points, x),
+                        lambda: _lagrange_weights(field, points, x),
+                        len(points))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "size": self.size,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _lagrange_weights(field, points, x):
+    xs = [field(x_i) for x_i in points]
+    x = field(x)
+    one = field(1)
+    numerators, denominators = [], []
+    for i, x_i in enumerate(xs):
+        others = [x_k for k, x_k in enumerate(xs) if k != i]
+        numerators.append(reduce(mul, [x - x_k for x_k in others], one))
+        denominators.append(reduce(mul, [x_i - x_k for x_k in others], one))
+
+    inverses = batch_invert(denominators)
+    return {p: num * inv for p, num, inv in zip(points, numerators, inverses)}
+
+
+lagrange_cache = LagrangeCache()
+
+
+def lagrange_coefficients(field, xs, x=0):
+    """Returns the Lagrange weights for interpolating at x from points xs,
+    using the shared cache. See LagrangeCache.coefficients.
+    """
+    return lagrange_cache.coefficients(field, xs, x)
@@ -8,12 +8,13 @@ from .field import GF, GFElement
 from .polynomial import EvalPoint
 from .router import SimpleRouter
 from .program_runner import ProgramRunner
-from .robust_reconstruction import robust_reconstruct
+from .robust_reconstruction import robust_reconstruct, batch_robust_reconstruct
 from .batch_reconstruction import batch_reconstruct
 from .elliptic_curve import Subgroup
 from .preprocessing import PreProcessedElements
-from .config import ConfigVars
+from .config import ConfigVars, ReconstructionConfig
 from .exceptions import HoneyBadgerMPCError
+from .codec import PackedElements
 
 
 class Mpc(object):
@@ -56,6 +57,14 @@ class Mpc(object):
         # { shareid => Queue() }
         self._sharearray_buffers = defaultdict(asyncio.Queue)
 
+        # Single opens issued in the same event loop tick are sent and
+        # reconstructed together. [(shareid, degree, value, future)]
+        self._reconstruction_config = ReconstructionConfig.default()
+        if ConfigVars.Reconstruction in config:
+            self._reconstruction_config = config[ConfigVars.Reconstruction]
+        self._pending_opens = []
+        self._open_point = EvalPoint(self.field, n, use_omega_powers=False)
+
         # Dynamically create concrete subclasses of the classes using ourself as
         # their context property
         self.Share = type('Share', (Share,), {'context': self})
@@ -93,15 +102,106 @@ class Mpc(object):
         broadcasted local shares from other nodes, and finally reconstruct
         the secret shared value.
 
+        Unless disabled in the reconstruction config, opens issued in the
+        same event loop tick are coalesced into a single message per peer and
+        reconstructed as one batch (see _flush_pending_opens).
+
         args:
             share (Share): Secret shared value to open
 
         outputs:
             Future that resolves to the plaintext value of the share.
         """
+        if not self._reconstruction_config.batch_opens:
+            return self._open_share_unbatched(share)
 
         res = asyncio.Future()
 
+        # Share ids are still assigned in the order opens are issued, so they
+        # agree across parties even if their batches are split differently.
+        shareid = self._get_share_id()
+        degree = self.t if share.t is None else share.t
+
+        if not self._pending_opens:
+            asyncio.get_event_loop().call_soon(self._flush_pending_opens)
+        self._pending_opens.append((shareid, degree, share.v, res))
+
+        return res
+
+    def _flush_pending_opens(self):
+        """ Broadcast every open queued since the last flush in a single
+        ('B', [shareid], [share]) message per peer, then start one batch
+        reconstruction for each degree present in the batch.
+        """
+        pending, self._pending_opens = self._pending_opens, []
+
+        shareids = [shareid for (shareid, _, _, _) in pending]
+        values = [value for (_, _, value, _) in pending]
+        for dest in range(self.N):
+            values_to_share = values
+
+            # Send random data if meant to induce faults
+            if self._reconstruction_config.induce_faults:
+                logging.debug("[FAULT][RobustReconstruct] Sending random shares.")
+                values_to_share = [self.field.random() for _ in values]
+
+            # 'B' is for batched single shares
+            self.send(dest, ('B', shareids, values_to_share))
+
+        by_degree = defaultdict(list)
+        for (shareid, degree, _, res) in pending:
+            by_degree[degree].append((shareid, res))
+
+        for degree, opens in by_degree.items():
+            asyncio.create_task(self._reconstruct_pending_opens(degree, opens))
+
+    async def _reconstruct_pending_opens(self, degree, opens):
+        """ Reconstruct a batch of opens of the given degree and resolve their
+        futures. Nobody awaits this task, so any failure is passed on to the
+        futures instead of being lost with the task.
+        """
+        try:
+            await self._reconstruct_opens(degree, opens)
+        except Exception as e:
+            logging.exception(
+                f"Robust reconstruction for shares "
+                f"(ids: {[shareid for (shareid, _) in opens]}) raised!")
+            for (_, res) in opens:
+                if not res.done():
+                    res.set_exception(e)
+
+    async def _reconstruct_opens(self, degree, opens):
+        shareids = [shareid for (shareid, _) in opens]
+
+        # One future per party resolving to its shares of the whole batch
+        share_buffers = [
+            asyncio.gather(*[self._share_buffers[i][shareid] for shareid in shareids])
+            for i in range(self.N)]
+
+        polys, errors = await batch_robust_reconstruct(
+            share_buffers, self.field, self.N, self.t, self._open_point, degree,
+            len(opens), algorithm=self._reconstruction_config.decoding_algorithm)
+
+        if polys is None:
+            logging.error(
+                f"Robust reconstruction for shares (ids: {shareids}) failed!")
+            for (shareid, res) in opens:
+                res.set_exception(HoneyBadgerMPCError(
+                    f"Failed to open share with id {shareid}!"))
+            return
+
+        if errors:
+            logging.info(f"Robust reconstruction detected errors from {errors}")
+
+        for p, (_, res) in zip(polys, opens):
+            res.set_result(p(self.field(0)))
+
+    def _open_share_unbatched(self, share):
+        """ Open a single share on its own, sending one ('S', shareid, share)
+        message per peer and reconstructing it independently.
+        """
+        res = asyncio.Future()
+
         # Choose the shareid based on the order this is called
         shareid = self._get_share_id()
         t = self.t
@@ -229,21 +329,15 @@ class Mpc(object):
 
             # Sort into single or batch
             if tag == 'S':
-                assert type(share) is GFElement, "?"
-                buf = self._share_buffers[j]
-
-                # Assert there is not an R1 or R2 value either
-                assert shareid not in self._sharearray_buffers
+                self._receive_single_share(j, tag, shareid, share)
 
-                # Assert that there is not an element already
-                if buf[shareid].done():
-                    logging.info(f'redundant share: {j} {(tag, shareid)}')
-                    raise AssertionError(f"Received a redundant share: {shareid}")
-
-                buf[shareid].set_result(share)
+            elif tag == 'B':
+                assert type(share) is list and len(share) == len(shareid)
+                for (shareid_, share_) in zip(shareid, share):
+                    self._receive_single_share(j, tag, shareid_, share_)
 
             elif tag in ('R1', 'R2'):
-                assert type(share) is list
+                assert type(share) in (list, PackedElements)
 
                 # Assert there is not an 'S' value here
                 assert shareid not in self._share_buffers[j]
@@ -253,6 +347,20 @@ class Mpc(object):
 
         return True
 
+    def _receive_single_share(self, j, tag, shareid, share):
+        assert type(share) is GFElement, "?"
+        buf = self._share_buffers[j]
+
+        # Assert there is not an R1 or R2 value either
+        assert shareid not in self._sharearray_buffers
+
+        # Assert that there is not an element already
+        if buf[shareid].done():
+            logging.info(f'redundant share: {j} {(tag, shareid)}')
+            raise AssertionError(f"Received a redundant share: {shareid}")
+
+        buf[shareid].set_result(share)
+
 
 class TaskProgramRunner(ProgramRunner):
     def __init__(self, n, t, config={}):
@@ -8,6 +8,7 @@ from .ntlwrapper cimport mat_ZZ_p_mul, ZZ_p_init, SqrRootMod
 from .ntlwrapper cimport ZZFromBytes, bytesFromZZ, to_ZZ_p, to_ZZ, ZZNumBytes
 from .ntlwrapper cimport SetNTLNumThreads_c, AvailableThreads
 from .ntlwrapper cimport ZZ_pX_get_coeff, ZZ_pX_set_coeff, ZZ_pX_eval
+from .ntlwrapper cimport ZZ_pX_eval_vec, ZZ_pX_mul, ZZ_pX_DivRem, ZZ_pX_deg
 from .rsdecode cimport interpolate_c, vandermonde_inverse_c, set_vm_matrix_c, fft_c, fft_partial_c, fnt_decode_step1_c, fnt_decode_step2_c, gao_interpolate_c, gao_interpolate_fft_c
 from .ccobject cimport ccrepr, ccreadstr
 from cpython.int cimport PyInt_AS_LONG
@@ -70,6 +71,25 @@ cdef vec_ZZ_p py_list_to_vec_ZZ_p(object v):
 cdef str ZZ_to_str(ZZ x):
     return ccrepr(x)
 
+cdef ZZ_pX_c py_list_to_ZZ_pX(object v):
+    cdef ZZ_pX_c result
+    cdef int i
+
+    result.SetMaxLength(len(v))
+    for i in range(len(v)):
+        ZZ_pX_set_coeff(result, i, intToZZp(v[i]))
+    return result
+
+cdef ZZ_pX_to_py_list(ZZ_pX_c x):
+    cdef ZZ_p c
+    cdef int i
+
+    result = []
+    for i in range(ZZ_pX_deg(x) + 1):
+        ZZ_pX_get_coeff(c, x, i)
+        result.append(ZZpToInt(c))
+    return result
+
 cpdef lagrange_interpolate(x, y, modulus):
     """Interpolate polynomial P s.t. P(x[i]) = y[i]
     :param x: Evaluation points for polynomial
@@ -112,6 +132,64 @@ cpdef evaluate(polynomial, x, modulus):
     ZZ_pX_eval(y, poly, intToZZp(x))
     return int(ccrepr(y))
 
+cpdef polynomial_multiply(a, b, modulus):
+    """Multiply two polynomials with NTL (Karatsuba or FFT depending on size)
+    :param a: Coefficients of the first polynomial, lowest degree first
+    :type a: list of integers
+    :param b: Coefficients of the second polynomial, lowest degree first
+    :type b: list of integers
+    :param modulus: Field modulus
+    :type modulus: integer
+    :return: Coefficients of a * b, without trailing zeros
+    """
+    cdef ZZ_pX_c pa, pb, result
+
+    ZZ_p_init(py_obj_to_ZZ(modulus))
+    pa = py_list_to_ZZ_pX(a)
+    pb = py_list_to_ZZ_pX(b)
+    ZZ_pX_mul(result, pa, pb)
+    return ZZ_pX_to_py_list(result)
+
+cpdef polynomial_divmod(a, b, modulus):
+    """Divide polynomial a by b with NTL's fast division
+    :param a: Coefficients of the dividend, lowest degree first
+    :type a: list of integers
+    :param b: Coefficients of the divisor, lowest degree first
+    :type b: list of integers
+    :param modulus: Field modulus
+    :type modulus: integer
+    :return: Coefficients of the quotient and the remainder
+    """
+    cdef ZZ_pX_c pa, pb, q, r
+
+    ZZ_p_init(py_obj_to_ZZ(modulus))
+    pa = py_list_to_ZZ_pX(a)
+    pb = py_list_to_ZZ_pX(b)
+    if ZZ_pX_deg(pb) < 0:
+        raise ZeroDivisionError
+    ZZ_pX_DivRem(q, r, pa, pb)
+    return ZZ_pX_to_py_list(q), ZZ_pX_to_py_list(r)
+
+cpdef polynomial_multipoint_evaluate(polynomial, x, modulus):
+    """Evaluate a polynomial at many points in a single call
+    :param polynomial: Coefficients of the polynomial, lowest degree first
+    :type polynomial: list of integers
+    :param x: Evaluation points
+    :type x: list of integers
+    :param modulus: Field modulus
+    :type modulus: integer
+    :return: List of evaluations, in the order of x
+    """
+    cdef ZZ_pX_c poly
+    cdef vec_ZZ_p x_vec, result
+    cdef int i
+
+    ZZ_p_init(py_obj_to_ZZ(modulus))
+    poly = py_list_to_ZZ_pX(polynomial)
+    x_vec = py_list_to_vec_ZZ_p(list(x))
+    ZZ_pX_eval_vec(result, poly, x_vec)
+    return [ZZpToInt(result[i]) for i in range(result.length())]
+
 cpdef vandermonde_inverse(x, modulus):
     """Generate inverse of vandermonde matrix
     :param x: Evaluation points for polynomial
@@ -136,6 +214,68 @@ class InterpolationError(Exception):
     pass
 
 
+cdef class VandermondeInverse:
+    """Inverse of the vandermonde matrix for some evaluation points, kept as an
+    NTL matrix so that it can be applied to many batches of evaluations at these
+    points without being computed again
+
+    :param x: list of evaluation points
+    :type x: list of integers
+    :param modulus: field modulus
+    :type modulus: integer
+    """
+    cdef mat_ZZ_p r
+    cdef ZZ zz_modulus
+    cdef readonly int k
+
+    def __cinit__(self, x, modulus):
+        cdef vector[ZZ] x_vec;
+
+        for xi in x:
+            x_vec.push_back(py_obj_to_ZZ(xi))
+
+        self.zz_modulus = py_obj_to_ZZ(modulus)
+        self.k = len(x)
+        if not vandermonde_inverse_c(self.r, x_vec, self.zz_modulus):
+            raise InterpolationError("Interpolation failed")
+
+    def __dealloc__(self):
+        self.r.kill()
+
+    def interpolate(self, data_list):
+        """Interpolate polynomials from their evaluations at the points
+
+        :param data_list: evaluations of polynomials
+                          data_list[i][j] = evaluation of polynomial i at point x[j]
+        :type data_list: list of lists
+        :return: coefficients of the polynomials
+        """
+        ZZ_p_init(self.zz_modulus)
+
+        cdef mat_ZZ_p m
+        cdef int k = max([len(d) for d in data_list])
+        cdef int n_chunks = len(data_list)
+        cdef int i, j
+        if k > self.k:
+            raise ValueError(f"Expected at most {self.k} evaluations, got {k}")
+        m.SetDims(self.k, n_chunks)
+
+        for i in range(n_chunks):
+            l = len(data_list[i])
+            for j in range(l):
+                m[j][i] = intToZZp(data_list[i][j])
+            for j in range(l, self.k):
+                m[j][i] = intToZZp(0)
+        cdef mat_ZZ_p reconstructions
+        mat_ZZ_p_mul(reconstructions, self.r, m)
+
+        polynomials = [[ZZpToInt(reconstructions[j][i]) for j in range(self.k)]
+                       for i in range(n_chunks)]
+        reconstructions.kill()
+        m.kill()
+        return polynomials
+
+
 cpdef vandermonde_batch_interpolate(x, data_list, modulus):
     """Interpolate polynomials using vandermonde matrices
 
@@ -157,44 +297,7 @@ cpdef vandermonde_batch_interpolate(x, data_list, modulus):
     :type modulus: integer
     :return:
     """
-    cdef vector[ZZ] x_vec;
-
-    for xi in x:
-        x_vec.push_back(py_obj_to_ZZ(xi))
-
-    cdef ZZ zz_modulus = py_obj_to_ZZ(modulus)
-    cdef mat_ZZ_p r
-    d = vandermonde_inverse_c(r, x_vec, zz_modulus)
-    if d is False:
-        raise InterpolationError("Interpolation failed")
-
-    cdef mat_ZZ_p m
-    cdef int k = max([len(d) for d in data_list])
-    cdef int n_chunks = len(data_list)
-    m.SetDims(k, n_chunks)
-
-    for i in range(n_chunks):
-        l = len(data_list[i])
-        for j in range(l):
-            m[j][i] = intToZZp(data_list[i][j])
-        for j in range(l, k):
-            m[j][i] = intToZZp(0)
-    cdef mat_ZZ_p reconstructions
-    mat_ZZ_p_mul(reconstructions, r, m)
-
-    polynomials = [[None] * k for _ in range(n_chunks)]
-
-    for i in range(n_chunks):
-        for j in range(k):
-            polynomials[i][j] = 0
-
-    for i in range(n_chunks):
-        for j in range(k):
-            polynomials[i][j] = ZZpToInt(reconstructions[j][i])
-    reconstructions.kill()
-    m.kill()
-    r.kill()
-    return polynomials
+    return VandermondeInverse(x, modulus).interpolate(data_list)
 
 cpdef vandermonde_batch_evaluate(x, polynomials, modulus):
     """Evaluate polynomials at given points x using vandermonde matrices
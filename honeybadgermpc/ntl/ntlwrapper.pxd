@@ -34,6 +34,10 @@ cdef extern from "ntlwrapper_impl.h":
     void ZZ_pX_get_coeff "GetCoeff"(ZZ_p r, ZZ_pX_c x, int i)
     void ZZ_pX_set_coeff "SetCoeff"(ZZ_pX_c x, int i, ZZ_p a)
     void ZZ_pX_eval "eval" (ZZ_p b, ZZ_pX_c f, ZZ_p a)
+    void ZZ_pX_eval_vec "eval" (vec_ZZ_p b, ZZ_pX_c f, vec_ZZ_p a)
+    void ZZ_pX_mul "mul"(ZZ_pX_c x, ZZ_pX_c a, ZZ_pX_c b)
+    void ZZ_pX_DivRem "DivRem"(ZZ_pX_c q, ZZ_pX_c r, ZZ_pX_c a, ZZ_pX_c b)
+    long ZZ_pX_deg "deg"(ZZ_pX_c a)
     void SqrRootMod "SqrRootMod"(ZZ x, ZZ a, ZZ n)
     int AvailableThreads()
     ZZ ZZFromBytes(const unsigned char*, long)
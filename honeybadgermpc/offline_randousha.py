@@ -3,7 +3,7 @@ import asyncio
 import logging
 from honeybadgermpc.config import HbmpcConfig
 from honeybadgermpc.exceptions import HoneyBadgerMPCError
-from honeybadgermpc.field import GF
+from honeybadgermpc.field import GF, batch_invert
 from honeybadgermpc.elliptic_curve import Subgroup
 from honeybadgermpc.polynomial import EvalPoint, polynomials_over
 from honeybadgermpc.reed_solomon import EncoderFactory, DecoderFactory
@@ -210,7 +210,8 @@ async def generate_bits(n, t, k, my_id, _send, _recv, field):
         u2rs = await ctx.ShareArray(u2rs_2t, 2*t).open()
         u2s_t = [u2r - r for u2r, r in zip(u2rs, rs_t)]
         u2s = await ctx.ShareArray(u2s_t).open()
-        bits = [u / u2.sqrt() for u, u2 in zip(us_t, u2s)]
+        u2_sqrt_invs = batch_invert([u2.sqrt() for u2 in u2s])
+        bits = [u * u2_sqrt_inv for u, u2_sqrt_inv in zip(us_t, u2_sqrt_invs)]
         return bits
 
     # TODO: compute triples through degree reduction
@@ -1,5 +1,9 @@
-from honeybadgermpc.betterpairing import ZR, G1, G2, pair
-from honeybadgermpc.polynomial import polynomials_over
+from itertools import repeat
+
+from honeybadgermpc.batch_verification import random_batch_weights
+from honeybadgermpc.betterpairing import ZR, G1, G2
+from honeybadgermpc.fixed_base import preprocessed
+from honeybadgermpc.polynomial import vectorized_polynomials_over
 
 
 class PolyCommitConst:
@@ -12,34 +16,18 @@ class PolyCommitConst:
         self.gh = self.hs[0].pair_with(self.ghats[0])
 
     def commit(self, phi):
-        c = G1.one()
-        phi_hat = polynomials_over(ZR).random(self.t)
-        i = 0
-        for item in self.gs:
-            c *= item ** phi.coeffs[i]
-            i += 1
-        i = 0
-        for item in self.hs:
-            c *= item ** phi_hat.coeffs[i]
-            i += 1
+        phi_hat = vectorized_polynomials_over(ZR).random(self.t)
+        c = G1.multiexp([*self.gs, *self.hs], phi.coeffs + phi_hat.coeffs)
         # c should equal g **(phi(alpha)) h **(phi_hat(alpha))
         return c, phi_hat
 
     def create_witness(self, phi, phi_hat, i):
-        poly = polynomials_over(ZR)
+        poly = vectorized_polynomials_over(ZR)
+        phi, phi_hat = poly(phi), poly(phi_hat)
         div = poly([-1*i, 1])
-        psi = (phi - poly([phi(i)])) / div
-        psi_hat = (phi_hat - poly([phi_hat(i)])) / div
-        witness = G1.one()
-        j = 0
-        for item in self.gs[:-1]:
-            witness *= item ** psi.coeffs[j]
-            j += 1
-        j = 0
-        for item in self.hs[:-1]:
-            witness *= item ** psi_hat.coeffs[j]
-            j += 1
-        return witness
+        psi = ((phi - poly([phi(i)])) / div).coeffs
+        psi_hat = ((phi_hat - poly([phi_hat(i)])) / div).coeffs
+        return G1.multiexp([*self.gs[:-1], *self.hs[:-1]], psi + psi_hat)
 
     # If reusing the same commitment, the lhs of the comparison will be the same.
     # Take advantage of this to save pairings
@@ -52,29 +40,45 @@ class PolyCommitConst:
     def batch_verify_eval(self, commits, i, shares, auxes, witnesses):
         assert len(commits) == len(shares) and len(commits) == len(witnesses) \
             and len(commits) == len(auxes)
-        commitprod = G1.one()
-        witnessprod = G1.one()
-        sharesum = ZR(0)
-        auxsum = ZR(0)
-        for j in range(len(commits)):
-            commitprod *= commits[j]
-            witnessprod *= witnesses[j]
-            sharesum += shares[j]
-            auxsum += auxes[j]
-        lhs = pair(commitprod, self.ghats[0])
-        rhs = pair(witnessprod, self.ghats[1] * self.ghats[0]**(-i)) \
-            * (self.gg ** sharesum) * (self.gh ** auxsum)
-        return lhs == rhs
+        return self.batch_verify_evals(
+            list(zip(commits, repeat(i), shares, auxes, witnesses)))
+
+    def batch_verify_evals(self, evals):
+        """Verifies evaluation proofs of any commitments at any points with two
+        pairings, by checking a random linear combination of their equations.
+
+        args:
+            evals: list of (c, i, phi_at_i, phi_hat_at_i, witness) tuples
+        output:
+            True if every proof is valid, False otherwise except with
+            probability about 2**-BATCH_VERIFY_BITS
+        """
+        if len(evals) == 0:
+            return True
+        commits, points, shares, auxes, witnesses = zip(*evals)
+        rs = random_batch_weights(len(evals))
+        # e(c, ghat_1 / ghat_0**i) == e(w, ghat_1 / ghat_0**i) * gg**s * gh**a is
+        # rearranged to e(c * w**i, ghat_0) == e(w, ghat_1) * gg**s * gh**a
+        lhs = G1.multiexp(
+            [*commits, *witnesses],
+            rs + [r * int(i) for r, i in zip(rs, points)])
+        witnessprod = G1.multiexp(list(witnesses), rs)
+        sharesum = sum(r * int(share) for r, share in zip(rs, shares))
+        auxsum = sum(r * int(aux) for r, aux in zip(rs, auxes))
+        return lhs.pair_with(self.ghats[0]) == witnessprod.pair_with(self.ghats[1]) \
+            * self.gg ** ZR(sharesum) * self.gh ** ZR(auxsum)
 
+    # The fixed-base tables are shared by every instance using the same CRS. Only
+    # the points raised to a power on their own get one: commit, create_witness
+    # and batch_verify_evals use multiexp, which does not use these tables.
     def preprocess_verifier(self, level=4):
-        self.gg.preprocess(level)
-        self.gh.preprocess(level)
+        self.gg = preprocessed(self.gg, level)
+        self.gh = preprocessed(self.gh, level)
+        self.ghats = [preprocessed(self.ghats[0], level), *self.ghats[1:]]
 
     def preprocess_prover(self, level=4):
-        for item in self.gs:
-            item.preprocess(level)
-        for item in self.hs:
-            item.preprocess(level)
+        # The generator, which AVSS dealers raise to their ephemeral keys
+        self.gs = [preprocessed(self.gs[0], level), *self.gs[1:]]
 
 
 def gen_pc_const_crs(t, alpha=None, g=None, h=None, ghat=None):
@@ -1,5 +1,9 @@
-from honeybadgermpc.betterpairing import G1, ZR
-from honeybadgermpc.polynomial import polynomials_over
+from itertools import repeat
+
+from honeybadgermpc.batch_verification import random_batch_weights
+from honeybadgermpc.betterpairing import G1, ZR, bls12_381_r
+from honeybadgermpc.fixed_base import preprocessed
+from honeybadgermpc.polynomial import vectorized_polynomials_over
 
 
 class PolyCommitLin(object):
@@ -9,30 +13,76 @@ class PolyCommitLin(object):
         self.h = crs[1]
 
     def commit(self, phi):
-        degree = len(phi.coeffs)-1
-        phi_hat = polynomials_over(ZR).random(degree)
-        cs = [pow(self.g, phi.coeffs[i]) * pow(self.h, phi_hat.coeffs[i])
+        coeffs = phi.coeffs
+        degree = len(coeffs)-1
+        phi_hat = vectorized_polynomials_over(ZR).random(degree)
+        hat_coeffs = phi_hat.coeffs
+        cs = [G1.multiexp([self.g, self.h], [coeffs[i], hat_coeffs[i]])
               for i in range(degree+1)]
         return cs, phi_hat
 
     def create_witness(self, aux, i):
         return aux(i)
 
+    def create_witnesses(self, auxs, xs):
+        """Returns, for every aux polynomial, its witnesses at every point of xs"""
+        return vectorized_polynomials_over(ZR).evaluate_batch(auxs, xs)
+
     def verify_eval(self, cs, i, phi_at_i, witness):
-        lhs = G1.one()
-        for j in range(len(cs)):
-            lhs *= pow(cs[j], pow(i, j))
-        rhs = pow(self.g, phi_at_i) * pow(self.h, witness)
-        return lhs == rhs
+        return self._is_identity(
+            cs, _powers(i, len(cs)), int(phi_at_i), int(witness))
 
-    # TODO: Explore ways to do this faster
     def batch_verify_eval(self, commits, i, shares, witnesses):
         assert len(commits) == len(shares) and len(commits) == len(witnesses)
-        for j in range(len(commits)):
-            if not self.verify_eval(commits[j], i, shares[j], witnesses[j]):
-                return False
-        return True
+        return self.batch_verify_evals(
+            list(zip(commits, repeat(i), shares, witnesses)))
+
+    def batch_verify_evals(self, evals):
+        """Verifies evaluation proofs of any commitments at any points with a
+        single multi-exponentiation, by checking a random linear combination of
+        their equations.
+
+        args:
+            evals: list of (cs, i, phi_at_i, witness) tuples
+        output:
+            True if every proof is valid, False otherwise except with
+            probability about 2**-BATCH_VERIFY_BITS
+        """
+        if len(evals) == 0:
+            return True
+        # Most batches evaluate every commitment at the same point
+        powers = {}
+        bases, exponents = [], []
+        sharesum, witnesssum = 0, 0
+        for r, (cs, i, share, witness) in zip(
+                random_batch_weights(len(evals)), evals):
+            key = (int(i), len(cs))
+            if key not in powers:
+                powers[key] = _powers(i, len(cs))
+            bases += cs
+            exponents += [r * power for power in powers[key]]
+            sharesum += r * int(share)
+            witnesssum += r * int(witness)
+        return self._is_identity(bases, exponents, sharesum, witnesssum)
 
+    def _is_identity(self, cs, exponents, phi_at_i, witness):
+        """Checks prod_j cs[j] ** exponents[j] == g ** phi_at_i * h ** witness as
+        a single multi-exponentiation"""
+        return G1.multiexp(
+            [*cs, self.g, self.h],
+            [*exponents, -phi_at_i % bls12_381_r, -witness % bls12_381_r]
+        ) == G1.one()
+
+    # The fixed-base table is shared by every instance using the same CRS. Only
+    # the generator, which AVSS dealers raise to their ephemeral keys, gets one:
+    # commit and the verification go through multiexp, which does not use it.
     def preprocess(self, level=4):
-        self.g.preprocess(level)
-        self.h.preprocess(level)
+        self.g = preprocessed(self.g, level)
+
+
+def _powers(i, count):
+    """Returns [i**0, ..., i**(count-1)] modulo the group order"""
+    powers = [1] * count
+    for j in range(1, count):
+        powers[j] = powers[j-1] * int(i) % bls12_381_r
+    return powers
@@ -5,10 +5,14 @@ from itertools import zip_longest
 
 from honeybadgermpc.ntl import fft as fft_cpp
 from honeybadgermpc.ntl import fft_interpolate as fft_interpolate_cpp
+from honeybadgermpc.ntl import evaluate as evaluate_cpp
+from honeybadgermpc.ntl import lagrange_interpolate, polynomial_divmod, \
+    polynomial_multiply, polynomial_multipoint_evaluate, vandermonde_batch_evaluate
 
-from .betterpairing import ZR
+from .betterpairing import ZR, bls12_381_r
 from .elliptic_curve import Subgroup
-from .field import GF, GFElement
+from .field import GF, GFElement, batch_invert
+from .lagrange import lagrange_cache, lagrange_coefficients
 
 
 def strip_trailing_zeros(a):
@@ -28,6 +32,7 @@ def polynomials_over(field):
     field_type = GFElement if type(field) is GF else ZR
     if field in _poly_cache:
         return _poly_cache[field]
+    modulus = field.modulus if type(field) is GF else bls12_381_r
 
     class Polynomial(object):
         def __init__(self, coeffs):
@@ -55,6 +60,31 @@ def polynomials_over(field):
                 xx *= x
             return y
 
+        def int_coeffs(self):
+            return [int(c) for c in self.coeffs]
+
+        def evaluate_many(self, xs):
+            """Evaluates the polynomial at every point of xs in one native call"""
+            return self.evaluate_batch([self], xs)[0]
+
+        @classmethod
+        def evaluate_batch(cls, polys, xs):
+            """Evaluates every polynomial of polys at every point of xs with a
+            single vandermonde_batch_evaluate call.
+
+            args:
+                polys: list of polynomials over this field
+                xs: evaluation points, as ints or field elements
+            output:
+                list holding, for every polynomial, its evaluations at xs
+            """
+            if len(polys) == 0:
+                return []
+            xs = [int(x) % modulus for x in xs]
+            coeffs = [poly.int_coeffs() or [0] for poly in polys]
+            return [[field(y) for y in ys]
+                    for ys in vandermonde_batch_evaluate(xs, coeffs, modulus)]
+
         @classmethod
         def interpolate_at(cls, shares, x_recomb=field(0)):
             # shares are in the form (x, y=f(x))
@@ -62,36 +92,35 @@ def polynomials_over(field):
                 x_recomb = field(x_recomb)
             assert type(x_recomb) is field_type
             xs, ys = zip(*shares)
-            vector = []
-            for i, x_i in enumerate(xs):
-                factors = [(x_k - x_recomb) / (x_k - x_i)
-                           for k, x_k in enumerate(xs) if k != i]
-                vector.append(reduce(operator.mul, factors))
-            return sum(map(operator.mul, ys, vector))
+            weights = lagrange_coefficients(field, xs, x_recomb)
+            return sum(weights[int(x)] * y for x, y in zip(xs, ys))
+
+        @classmethod
+        def lagrange_basis(cls, xs):
+            """Returns the Lagrange basis polynomials for the points xs, i.e. the
+            polynomials p_i with p_i(xs[i]) == 1 and p_i(xs[k]) == 0 for k != i.
+            These are cached in the shared, bounded lagrange_cache.
+            """
+            xs = tuple(field(x) if type(x) is int else x for x in xs)
+
+            def create():
+                x = cls([field(0), field(1)])  # This is the polynomial f(x) = x
+                one = cls([field(1)])  # This is the polynomial f(x) = 1
+                dens = [reduce(operator.mul, [xi - xj for xj in xs if xj != xi],
+                               field(1))
+                        for xi in xs]
+                return [reduce(operator.mul, [x - cls([xj]) for xj in xs if xj != xi],
+                               one) * cls([den_inv])
+                        for xi, den_inv in zip(xs, batch_invert(dens))]
 
-        _lagrange_cache = {}  # Cache lagrange polynomials
+            key = ("basis", field, tuple(int(x) for x in xs))
+            return lagrange_cache.get(key, create, len(xs) ** 2)
 
         @classmethod
         def interpolate(cls, shares):
-            x = cls([field(0), field(1)])  # This is the polynomial f(x) = x
-            one = cls([field(1)])  # This is the polynomial f(x) = 1
             xs, ys = zip(*shares)
-
-            def lagrange(xi):
-                # Let's cache lagrange values
-                if (xs, xi) in cls._lagrange_cache:
-                    return cls._lagrange_cache[(xs, xi)]
-
-                def mul(a, b): return a*b
-                num = reduce(mul, [x - cls([xj])
-                                   for xj in xs if xj != xi], one)
-                den = reduce(mul, [xi - xj for xj in xs if xj != xi], field(1))
-                p = num * cls([1 / den])
-                cls._lagrange_cache[(xs, xi)] = p
-                return p
             f = cls([0])
-            for xi, yi in zip(xs, ys):
-                pi = lagrange(xi)
+            for yi, pi in zip(ys, cls.lagrange_basis(xs)):
                 f += cls([yi]) * pi
             return f
 
@@ -234,6 +263,95 @@ def polynomials_over(field):
     return Polynomial
 
 
+_vectorized_poly_cache = {}
+
+
+def vectorized_polynomials_over(field):
+    """Returns a Polynomial class over field with the same interface as
+    polynomials_over(field), but which stores coefficients as a list of ints and
+    does its arithmetic with NTL: multiplication and division take O(n log n),
+    interpolation is done natively and evaluate_many evaluates at many points
+    in a single call.
+    """
+    assert type(field) is GF or field == ZR
+    if field in _vectorized_poly_cache:
+        return _vectorized_poly_cache[field]
+
+    modulus = field.modulus if type(field) is GF else bls12_381_r
+    base = polynomials_over(field)
+
+    def to_values(coeffs):
+        if isinstance(coeffs, VectorizedPolynomial):
+            return list(coeffs.values)
+        values = [int(c) % modulus for c in coeffs]
+        while values and values[-1] == 0:
+            values.pop()
+        return values
+
+    class VectorizedPolynomial(base):
+        def __init__(self, coeffs):
+            self.values = to_values(coeffs)
+            self.field = field
+
+        @property
+        def coeffs(self):
+            return [field(v) for v in self.values]
+
+        @coeffs.setter
+        def coeffs(self, coeffs):
+            self.values = to_values(coeffs)
+
+        def is_zero(self):
+            return self.values == []
+
+        def int_coeffs(self):
+            return self.values
+
+        def __call__(self, x):
+            return field(evaluate_cpp(self.values, int(x) % modulus, modulus))
+
+        def evaluate_many(self, xs):
+            """Evaluates the polynomial at every point of xs in one native call"""
+            ys = polynomial_multipoint_evaluate(
+                self.values, [int(x) % modulus for x in xs], modulus)
+            return [field(y) for y in ys]
+
+        @classmethod
+        def interpolate(cls, shares):
+            xs, ys = zip(*shares)
+            return cls(lagrange_interpolate(
+                [int(x) % modulus for x in xs], [int(y) % modulus for y in ys],
+                modulus))
+
+        def __abs__(self): return len(self.values)
+
+        def __len__(self): return len(self.values)
+
+        def __neg__(self): return VectorizedPolynomial([-v for v in self.values])
+
+        def __add__(self, other):
+            return VectorizedPolynomial(
+                [a + b for a, b in zip_longest(
+                    self.values, to_values(other), fillvalue=0)])
+
+        def __mul__(self, other):
+            return VectorizedPolynomial(
+                polynomial_multiply(self.values, to_values(other), modulus))
+
+        def leading_coefficient(self): return field(self.values[-1])
+
+        def __divmod__(self, divisor):
+            quotient, remainder = polynomial_divmod(
+                self.values, to_values(divisor), modulus)
+            return VectorizedPolynomial(quotient), VectorizedPolynomial(remainder)
+
+        def __mod__(self, divisor):
+            return divmod(self, divisor)[1]
+
+    _vectorized_poly_cache[field] = VectorizedPolynomial
+    return VectorizedPolynomial
+
+
 def get_omega(field, n, seed=None):
     """
     Given a field, this method returns an n^th root of unity.
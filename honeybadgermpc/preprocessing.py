@@ -1,8 +1,12 @@
 import logging
 import asyncio
+import mmap
 import os
+import struct
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from uuid import uuid4
-from random import randint
+from random import Random, SystemRandom
 from os import makedirs
 from .field import GF
 from .polynomial import polynomials_over
@@ -24,6 +28,241 @@ class PreProcessingConstants(object):
     READY_FILE_NAME = f"{SHARED_DATA_DIR}READY"
     SHARE_BITS_FILE_NAME_PREFIX = f"{SHARED_DATA_DIR}share_bits"
 
+    # Binary share file format: a fixed size header followed by `count`
+    # little-endian field elements of ELEMENT_SIZE bytes each.
+    SHARE_FILE_MAGIC = b"HBMPCSH1"
+    ELEMENT_SIZE = 32
+    # magic, modulus, degree, id, count
+    SHARE_FILE_HEADER = struct.Struct(f"<8s{ELEMENT_SIZE}sIIQ")
+    # Suffix of the consumption journal kept next to each share file
+    CURSOR_FILE_SUFFIX = ".cursor"
+
+
+class ShareFile(object):
+    """ Read-only view over a binary share file, backed by mmap.
+
+    Values are decoded from the mapped file one at a time when accessed, so
+    opening a file costs the same regardless of how many shares it holds.
+    Supports len(), indexing, slicing and iteration; every value is returned
+    as an int.
+    """
+
+    def __init__(self, file_name):
+        header = PreProcessingConstants.SHARE_FILE_HEADER
+        with open(file_name, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(PreProcessingConstants.SHARE_FILE_MAGIC)] != \
+                PreProcessingConstants.SHARE_FILE_MAGIC:
+            self._mmap.close()
+            raise ValueError(
+                f"{file_name} is not a binary share file, "
+                "convert it first using convert_text_share_file")
+
+        _, modulus, self.degree, self.myid, self.count = header.unpack_from(
+            self._mmap, 0)
+        self.modulus = int.from_bytes(modulus, "little")
+        self._offset = header.size
+        assert len(self._mmap) == \
+            self._offset + self.count * PreProcessingConstants.ELEMENT_SIZE
+
+    def _value_at(self, index):
+        size = PreProcessingConstants.ELEMENT_SIZE
+        start = self._offset + index * size
+        return int.from_bytes(self._mmap[start:start+size], "little")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._value_at(i) for i in range(*index.indices(self.count))]
+
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"share index {index} out of range")
+        return self._value_at(index)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self._value_at(i)
+
+    def close(self):
+        self._mmap.close()
+
+
+class ShareCursor(object):
+    """ Durable, crash-safe position of the next unused value in a share file.
+
+    The position is kept in an append-only journal of 8 byte offsets next to
+    the share file, and each record is fsync'd before the values it covers are
+    handed out. To avoid an fsync per value, the journal records a high-water
+    mark that is advanced BLOCK_SIZE values at a time; values are then handed
+    out from memory until the mark is reached. After a crash or restart
+    consumption resumes at the last recorded mark, so a value is never used
+    twice, at the cost of skipping at most one block.
+
+    There is one cursor per share file and process, use for_share_file to get
+    it.
+    """
+    BLOCK_SIZE = 1024
+    # Rewrite the journal once it holds this many records
+    MAX_JOURNAL_RECORDS = 4096
+    _RECORD = struct.Struct("<Q")
+    _cursors = {}
+
+    def __init__(self, journal_file_name):
+        self._journal_file_name = journal_file_name
+        created = not os.path.exists(journal_file_name)
+        self._fd = os.open(journal_file_name, os.O_RDWR | os.O_CREAT, 0o644)
+        if created:
+            self._fsync_dir()
+        self._load_journal()
+
+    def _load_journal(self):
+        # Ignore a partially written last record
+        journal = os.pread(self._fd, os.fstat(self._fd).st_size, 0)
+        self._num_records = len(journal) // self._RECORD.size
+        self._mark = 0
+        if self._num_records > 0:
+            self._mark, = self._RECORD.unpack_from(
+                journal, (self._num_records - 1) * self._RECORD.size)
+        self.position = self._mark
+
+    @classmethod
+    def for_share_file(cls, file_name):
+        journal_file_name = os.path.realpath(
+            f"{file_name}{PreProcessingConstants.CURSOR_FILE_SUFFIX}")
+        if journal_file_name not in cls._cursors:
+            cls._cursors[journal_file_name] = cls(journal_file_name)
+        return cls._cursors[journal_file_name]
+
+    @classmethod
+    def reset(cls, file_name):
+        """ Forget how much of a share file has been consumed. """
+        journal_file_name = os.path.realpath(
+            f"{file_name}{PreProcessingConstants.CURSOR_FILE_SUFFIX}")
+        cursor = cls._cursors.get(journal_file_name)
+        if cursor is not None:
+            cursor._rewrite_journal(0)
+            cursor.position = 0
+        elif os.path.exists(journal_file_name):
+            os.remove(journal_file_name)
+
+    def reload(self):
+        """ Read the journal again, e.g. after the share file was regenerated
+        and its journal replaced.
+        """
+        os.close(self._fd)
+        self._fd = os.open(self._journal_file_name, os.O_RDWR | os.O_CREAT, 0o644)
+        self._load_journal()
+
+    def _fsync_dir(self):
+        dir_fd = os.open(os.path.dirname(self._journal_file_name), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def _rewrite_journal(self, mark):
+        # Replace the journal as a whole so a crash leaves either the old or
+        # the new journal behind
+        tmp_file_name = f"{self._journal_file_name}.{uuid4().hex}.tmp"
+        fd = os.open(tmp_file_name, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.write(fd, self._RECORD.pack(mark))
+        os.fsync(fd)
+        os.replace(tmp_file_name, self._journal_file_name)
+        self._fsync_dir()
+
+        os.close(self._fd)
+        self._fd = fd
+        self._num_records = 1
+        self._mark = mark
+
+    def _append_journal(self, mark):
+        if self._num_records >= self.MAX_JOURNAL_RECORDS:
+            self._rewrite_journal(mark)
+            return
+
+        os.pwrite(self._fd, self._RECORD.pack(mark),
+                  self._num_records * self._RECORD.size)
+        os.fsync(self._fd)
+        self._num_records += 1
+        self._mark = mark
+
+    def reserve(self, k, limit):
+        """ Reserve the next k values, without going past limit.
+
+        output:
+            Returns the index of the first reserved value
+        """
+        start = self.position
+        end = start + k
+        assert end <= limit
+
+        if end > self._mark:
+            self._append_journal(min(max(end, start + self.BLOCK_SIZE), limit))
+
+        self.position = end
+        return start
+
+    def close(self):
+        os.close(self._fd)
+
+
+def _share_file_header(modulus, degree, myid, count):
+    return PreProcessingConstants.SHARE_FILE_HEADER.pack(
+        PreProcessingConstants.SHARE_FILE_MAGIC,
+        modulus.to_bytes(PreProcessingConstants.ELEMENT_SIZE, "little"),
+        degree, myid, count)
+
+
+def write_share_file(f, modulus, degree, myid, values):
+    """ Write values to f using the binary share file format.
+
+    args:
+        f (file): file opened in binary mode
+        modulus (int): modulus of the field the values belong to
+        degree (int): degree of polynomial used to generate shares
+        myid (int): id the shares belong to
+        values (list): list of ints representing share values
+    """
+    size = PreProcessingConstants.ELEMENT_SIZE
+    f.write(_share_file_header(modulus, degree, myid, len(values)))
+    f.write(b"".join(v.to_bytes(size, "little") for v in values))
+
+
+def convert_text_share_file(file_name, out_file_name=None):
+    """ Convert a share file in the old text format (modulus, degree and id
+    followed by one decimal value per line) to the binary format.
+
+    args:
+        file_name (str): text share file to convert
+        out_file_name (str): where to write the binary file, defaults to
+            overwriting file_name in place
+
+    output:
+        Returns the number of values converted
+    """
+    out_file_name = file_name if out_file_name is None else out_file_name
+    tmp_file_name = f"{out_file_name}.{uuid4().hex}.tmp"
+
+    with open(file_name, "rb") as f:
+        if f.read(len(PreProcessingConstants.SHARE_FILE_MAGIC)) == \
+                PreProcessingConstants.SHARE_FILE_MAGIC:
+            raise ValueError(f"{file_name} is already a binary share file")
+
+    with open(file_name, "r") as f:
+        modulus, degree, myid = int(next(f)), int(next(f)), int(next(f))
+        values = [int(line) for line in f if line.strip()]
+
+    with open(tmp_file_name, "wb") as f:
+        write_share_file(f, modulus, degree, myid, values)
+    os.replace(tmp_file_name, out_file_name)
+
+    return len(values)
+
 
 async def wait_for_preprocessing():
     while not os.path.exists(f"{PreProcessingConstants.SHARED_DATA_DIR}READY"):
@@ -45,9 +284,18 @@ def preprocessing_done():
 
 
 class PreProcessedElements(object):
-    def __init__(self):
+    def __init__(self, num_processes=1, chunk_size=4096):
+        """
+        args:
+            num_processes (int): number of processes used to generate fake
+                preprocessing
+            chunk_size (int): number of items generated per task when
+                generating fake preprocessing
+        """
         self.field = GF(Subgroup.BLS12_381)
         self.poly = polynomials_over(self.field)
+        self.num_processes = num_processes
+        self.chunk_size = chunk_size
         self._bit_length = self.field.modulus.bit_length()
         self._triples = {}
         self._cubes = {}
@@ -59,56 +307,34 @@ class PreProcessedElements(object):
         self._double_shares = {}
 
     def _read_share_values_from_file(self, file_name):
-        with open(file_name, "r") as f:
-            lines = iter(f)
-
-            # first line: field modulus
-            modulus = int(next(lines))
-            assert self.field.modulus == modulus
-
-            # skip 2nd and 3rd line - share degree and id
-            next(lines), next(lines)
-
-            # remaining lines: shared values
-            return [int(line) for line in lines]
-
-    def _read_share_bit_values_from_file(self, file_name):
-        """ Given a file written using _write_share_bits_to_file, read the
-        file and return a list of tuples of shares with a list of their bit-sharings.
-
-        args:
-            file_name (str): filename to read from
-
-        output:
-            Returns a list of tuples, where the first element of each tuple is
-            the value of a share, and the second element is a list of values of
-            the shares that compose the bitwise sharing of the share.
-            Note: bits are given LSB first
-        """
-        values = self._read_share_values_from_file(file_name)
-        assert len(values) % (self._bit_length + 1) == 0
-
-        stride = self._bit_length + 1
-        share_bits = [(values[i * stride], values[i * stride + 1: (i+1) * stride])
-                      for i in range(len(values) // stride)]
-
-        return share_bits
+        values = ShareFile(file_name)
+        assert self.field.modulus == values.modulus
+        return values
 
     def _write_shares_to_file(self, f, degree, myid, shares):
         """ Given a list of field elements representing shares,
         write their values to file f.
 
         args:
-            f (file): file to write shares to
+            f (file): file opened in binary mode to write shares to
             degree (int): degree of polynomial used to generate shares
             myid (int): id the shares belong to
             shares (list): list of GFElements representing share values
         """
-        content = f"{self.field.modulus}\n{degree}\n{myid}\n"
-        for share in shares:
-            content += f"{share.value}\n"
+        write_share_file(
+            f, self.field.modulus, degree, myid, [share.value for share in shares])
 
-        f.write(content)
+    def _write_share_file_atomically(self, file_name, degree, myid, shares):
+        """ Write the shares to a temporary file and move it in place, so that
+        readers which still have the old file mapped are not affected. The
+        consumption cursor of the file is reset.
+        """
+        tmp_file_name = f"{file_name}.{uuid4().hex}.tmp"
+        with open(tmp_file_name, "wb") as f:
+            self._write_shares_to_file(f, degree, myid, shares)
+        os.replace(tmp_file_name, file_name)
+        # Fresh preprocessing, start consuming it from the beginning
+        ShareCursor.reset(file_name)
 
     def _create_sharedata_dir_if_not_exists(self):
         makedirs(PreProcessingConstants.SHARED_DATA_DIR, exist_ok=True)
@@ -117,69 +343,150 @@ class PreProcessedElements(object):
     # MPC program access to shares
     ##############################
 
-    def get_triple(self, ctx):
+    def _file_path(self, file_name_prefix, ctx, t=None):
+        t = ctx.t if t is None else t
+        return f"{file_name_prefix}_{ctx.N}_{t}-{ctx.myid}.share"
+
+    def _reserve_values(self, cache, key, file_path, k, kind):
+        """ Reserve the next k unused values of a share file.
+
+        The reservation is recorded in the durable cursor of the file before
+        the values are returned, so they are never handed out again, even
+        after a restart.
+
+        args:
+            cache (dict): per-kind cache of opened share files and cursors
+            key (tuple): cache key, usually (myid, N, t)
+            file_path (str): share file to read the values from
+            k (int): number of values to reserve
+            kind (str): name of the preprocessing kind, used in errors
+
+        output:
+            Returns a list of k ints
+        """
+        # A regenerated file replaces the old one, so its values must be read
+        # again and consumption starts over at the new journal
+        stat = os.stat(file_path)
+        version = (file_path, stat.st_ino, stat.st_mtime_ns)
+        if key in cache and cache[key][2] != version:
+            old_values, cursor, _ = cache.pop(key)
+            old_values.close()
+            cursor.reload()
+
+        if key not in cache:
+            cache[key] = (self._read_share_values_from_file(file_path),
+                          ShareCursor.for_share_file(file_path), version)
+
+        values, cursor, _ = cache[key]
+        if cursor.position + k > len(values):
+            raise StopIteration(f"preprocess underrun: {kind}")
+
+        start = cursor.reserve(k, len(values))
+        return values[start:start+k]
+
+    def reserve_triples(self, ctx, k):
+        """ Reserve k consecutive triples, returned as a list of (a, b, ab)
+        tuples of shares.
+        """
         key = (ctx.myid, ctx.N, ctx.t)
-        if key not in self._triples:
-            file_suffix = f"_{ctx.N}_{ctx.t}-{ctx.myid}.share"
-            file_path = f"{PreProcessingConstants.TRIPLES_FILE_NAME_PREFIX}{file_suffix}"
-            self._triples[key] = iter(self._read_share_values_from_file(file_path))
-        try:
-            a = ctx.Share(next(self._triples[key]))
-            b = ctx.Share(next(self._triples[key]))
-            ab = ctx.Share(next(self._triples[key]))
-            return a, b, ab
-        except StopIteration:
-            print('STOP ITERATION TRIPLES')
-            raise StopIteration(f"preprocess underrun: TRIPLES")
+        file_path = self._file_path(PreProcessingConstants.TRIPLES_FILE_NAME_PREFIX, ctx)
+        values = self._reserve_values(self._triples, key, file_path, 3*k, "TRIPLES")
+        return [(ctx.Share(a), ctx.Share(b), ctx.Share(ab))
+                for a, b, ab in zip(values[::3], values[1::3], values[2::3])]
+
+    def reserve_rands(self, ctx, k, t=None):
+        t = t if t is not None else ctx.t
+        key = (ctx.myid, ctx.N, t)
+        file_path = self._file_path(
+            PreProcessingConstants.RANDS_FILE_NAME_PREFIX, ctx, t)
+        values = self._reserve_values(self._rands, key, file_path, k, "RANDS")
+        return [ctx.Share(v, t) for v in values]
+
+    def reserve_bits(self, ctx, k):
+        key = (ctx.myid, ctx.N, ctx.t)
+        file_path = self._file_path(PreProcessingConstants.BITS_FILE_NAME_PREFIX, ctx)
+        values = self._reserve_values(self._bits, key, file_path, k, "BITS")
+        return [ctx.Share(v) for v in values]
+
+    def get_triples(self, ctx, k):
+        """ Returns k triples as three ShareArrays a, b and ab, where
+        ab[i] = a[i] * b[i].
+        """
+        key = (ctx.myid, ctx.N, ctx.t)
+        file_path = self._file_path(PreProcessingConstants.TRIPLES_FILE_NAME_PREFIX, ctx)
+        values = self._reserve_values(self._triples, key, file_path, 3*k, "TRIPLES")
+        return (ctx.ShareArray(values[::3]), ctx.ShareArray(values[1::3]),
+                ctx.ShareArray(values[2::3]))
+
+    def get_cubes(self, ctx, k):
+        """ Returns k cubes as three ShareArrays a, a^2 and a^3.
+        """
+        key = (ctx.myid, ctx.N, ctx.t)
+        file_path = self._file_path(PreProcessingConstants.CUBES_FILE_NAME_PREFIX, ctx)
+        values = self._reserve_values(self._cubes, key, file_path, 3*k, "CUBES")
+        return (ctx.ShareArray(values[::3]), ctx.ShareArray(values[1::3]),
+                ctx.ShareArray(values[2::3]))
+
+    def get_rands(self, ctx, k, t=None):
+        t = t if t is not None else ctx.t
+        key = (ctx.myid, ctx.N, t)
+        file_path = self._file_path(
+            PreProcessingConstants.RANDS_FILE_NAME_PREFIX, ctx, t)
+        values = self._reserve_values(self._rands, key, file_path, k, "RANDS")
+        return ctx.ShareArray(values, t)
+
+    def get_bits(self, ctx, k):
+        key = (ctx.myid, ctx.N, ctx.t)
+        file_path = self._file_path(PreProcessingConstants.BITS_FILE_NAME_PREFIX, ctx)
+        values = self._reserve_values(self._bits, key, file_path, k, "BITS")
+        return ctx.ShareArray(values)
+
+    def get_one_minus_one_rands(self, ctx, k):
+        key = (ctx.myid, ctx.N, ctx.t)
+        file_path = self._file_path(
+            PreProcessingConstants.ONE_MINUS_ONE_FILE_NAME_PREFIX, ctx)
+        values = self._reserve_values(
+            self._one_minus_one_rands, key, file_path, k, "ONE_MINUS_ONE")
+        return ctx.ShareArray(values)
+
+    def get_double_shares(self, ctx, k):
+        """ Returns k double sharings as two ShareArrays of degree t and 2t.
+        """
+        key = (ctx.myid, ctx.N, ctx.t)
+        file_path = self._file_path(
+            PreProcessingConstants.DOUBLE_SHARES_FILE_NAME_PREFIX, ctx)
+        values = self._reserve_values(
+            self._double_shares, key, file_path, 2*k, "DOUBLE_SHARES")
+        return ctx.ShareArray(values[::2]), ctx.ShareArray(values[1::2], 2*ctx.t)
+
+    def get_triple(self, ctx):
+        return self.reserve_triples(ctx, 1)[0]
 
     def get_cube(self, ctx):
         key = (ctx.myid, ctx.N, ctx.t)
-        if key not in self._cubes:
-            file_suffix = f"_{ctx.N}_{ctx.t}-{ctx.myid}.share"
-            file_path = f"{PreProcessingConstants.CUBES_FILE_NAME_PREFIX}{file_suffix}"
-            self._cubes[key] = iter(self._read_share_values_from_file(file_path))
-        a1 = ctx.Share(next(self._cubes[key]))
-        a2 = ctx.Share(next(self._cubes[key]))
-        a3 = ctx.Share(next(self._cubes[key]))
-        return a1, a2, a3
+        file_path = self._file_path(PreProcessingConstants.CUBES_FILE_NAME_PREFIX, ctx)
+        a1, a2, a3 = self._reserve_values(self._cubes, key, file_path, 3, "CUBES")
+        return ctx.Share(a1), ctx.Share(a2), ctx.Share(a3)
 
     def get_zero(self, ctx):
         key = (ctx.myid, ctx.N, ctx.t)
-        if key not in self._zeros:
-            file_suffix = f"_{ctx.N}_{ctx.t}-{ctx.myid}.share"
-            file_path = f"{PreProcessingConstants.ZEROS_FILE_NAME_PREFIX}{file_suffix}"
-            self._zeros[key] = iter(self._read_share_values_from_file(file_path))
-        return ctx.Share(next(self._zeros[key]))
+        file_path = self._file_path(PreProcessingConstants.ZEROS_FILE_NAME_PREFIX, ctx)
+        zero, = self._reserve_values(self._zeros, key, file_path, 1, "ZEROS")
+        return ctx.Share(zero)
 
     def get_rand(self, ctx, t=None):
-        t = t if t is not None else ctx.t
-        key = (ctx.myid, ctx.N, t)
-        if key not in self._rands:
-            file_suffix = f"_{ctx.N}_{t}-{ctx.myid}.share"
-            file_path = f"{PreProcessingConstants.RANDS_FILE_NAME_PREFIX}{file_suffix}"
-            self._rands[key] = iter(self._read_share_values_from_file(file_path))
-        return ctx.Share(next(self._rands[key]), t)
+        return self.reserve_rands(ctx, 1, t)[0]
 
     def get_bit(self, ctx):
-        key = (ctx.myid, ctx.N, ctx.t)
-        if key not in self._bits:
-            file_suffix = f"_{ctx.N}_{ctx.t}-{ctx.myid}.share"
-            file_path = f"{PreProcessingConstants.BITS_FILE_NAME_PREFIX}{file_suffix}"
-            self._bits[key] = iter(self._read_share_values_from_file(file_path))
-        return ctx.Share(next(self._bits[key]))
+        return self.reserve_bits(ctx, 1)[0]
 
     def get_one_minus_one_rand(self, ctx):
-        file_suffix = f"_{ctx.N}_{ctx.t}-{ctx.myid}.share"
-        fpath = f"{PreProcessingConstants.ONE_MINUS_ONE_FILE_NAME_PREFIX}{file_suffix}"
         key = (ctx.myid, ctx.N, ctx.t)
-        if key not in self._one_minus_one_rands:
-            self._one_minus_one_rands[key] = iter(
-                self._read_share_values_from_file(fpath))
-        try:
-            return ctx.Share(next(self._one_minus_one_rands[key]))
-        except StopIteration:
-            print('STOP ITERATION ONE_MINUS_ONE')
-            raise StopIteration(f"preprocess underrun: ONE_MINUS_ONE")
+        file_path = self._file_path(
+            PreProcessingConstants.ONE_MINUS_ONE_FILE_NAME_PREFIX, ctx)
+        value, = self._reserve_values(
+            self._one_minus_one_rands, key, file_path, 1, "ONE_MINUS_ONE")
+        return ctx.Share(value)
 
     def get_powers(self, ctx, pid):
         file_suffix = f"_{pid}_{ctx.N}_{ctx.t}-{ctx.myid}.share"
@@ -196,24 +503,24 @@ class PreProcessedElements(object):
 
     def get_double_share(self, ctx):
         key = (ctx.myid, ctx.N, ctx.t)
-        if key not in self._double_shares:
-            suffix = f"_{ctx.N}_{ctx.t}-{ctx.myid}.share"
-            path = f"{PreProcessingConstants.DOUBLE_SHARES_FILE_NAME_PREFIX}{suffix}"
-            self._double_shares[key] = iter(self._read_share_values_from_file(path))
-        r_t = ctx.Share(next(self._double_shares[key]))
-        r_2t = ctx.Share(next(self._double_shares[key]), 2*ctx.t)
-        return r_t, r_2t
+        file_path = self._file_path(
+            PreProcessingConstants.DOUBLE_SHARES_FILE_NAME_PREFIX, ctx)
+        r_t, r_2t = self._reserve_values(
+            self._double_shares, key, file_path, 2, "DOUBLE_SHARES")
+        return ctx.Share(r_t), ctx.Share(r_2t, 2*ctx.t)
 
     def get_share_bits(self, ctx):
+        """ Returns a random share alongside the shares of its bits.
+        Note: bits are given LSB first
+        """
         key = (ctx.myid, ctx.N, ctx.t)
-        if key not in self._share_bits:
-            suffix = f"_{ctx.N}_{ctx.t}-{ctx.myid}.share"
-            path = f"{PreProcessingConstants.SHARE_BITS_FILE_NAME_PREFIX}{suffix}"
-            self._share_bits[key] = iter(self._read_share_bit_values_from_file(path))
+        file_path = self._file_path(
+            PreProcessingConstants.SHARE_BITS_FILE_NAME_PREFIX, ctx)
+        values = self._reserve_values(
+            self._share_bits, key, file_path, self._bit_length + 1, "SHARE_BITS")
 
-        share_val, bit_vals = next(self._share_bits[key])
-        share = ctx.Share(share_val)
-        bits = [ctx.Share(val) for val in bit_vals]
+        share = ctx.Share(values[0])
+        bits = [ctx.Share(val) for val in values[1:]]
 
         return share, bits
 
@@ -222,9 +529,8 @@ class PreProcessedElements(object):
     #########################
 
     def write_shares(self, ctx, file_name_prefix, degree, shares):
-        with open('%s_%d_%d-%d.share' % (file_name_prefix,
-                                         ctx.N, ctx.t, ctx.myid), 'w') as f:
-            self._write_shares_to_file(f, degree, ctx.myid, shares)
+        file_name = '%s_%d_%d-%d.share' % (file_name_prefix, ctx.N, ctx.t, ctx.myid)
+        self._write_share_file_atomically(file_name, degree, ctx.myid, shares)
 
     def write_triples(self, ctx, triples):
         trips = []
@@ -245,92 +551,106 @@ class PreProcessedElements(object):
     useful for local experiments for just the online phase.
     """
 
-    def _write_polys(self, file_name_prefix, n, t, polys):
-        polys = [[coeff.value for coeff in poly.coeffs] for poly in polys]
-        all_shares = vandermonde_batch_evaluate(
-            list(range(1, n+1)), polys, self.field.modulus)
-        for i in range(n):
-            shares = [self.field(s[i]) for s in all_shares]
-            # with open(f'{file_name_prefix}_{n}_{t}_{i}.share', 'w') as f:
-            with open('%s_%d_%d-%d.share' % (file_name_prefix, n, t, i), 'w') as f:
-                self._write_shares_to_file(f, t, i, shares)
+    def _generate_fake(self, file_name_prefix, kind, k, n, t, extra=None):
+        """ Generate k items of fake preprocessing of the given kind for n
+        parties, and write each party's shares to its own file.
 
-    def generate_triples(self, k, n, t):
+        The k items are split in chunks of chunk_size items. Chunks are
+        generated by _generate_fake_chunk, on a pool of num_processes
+        processes when there is more than one, and each chunk is appended to
+        the party files as soon as it is available, so memory use is bounded
+        by a few chunks rather than by k.
+
+        args:
+            file_name_prefix (str): prefix of the files to write
+            kind (str): key of _FAKE_SECRET_GENERATORS to generate
+            k (int): number of items to generate
+            n (int): number of parties to generate shares for
+            t (int): degree of polynomial to use when generating shares
+            extra: kind specific argument passed on to the secret generator
+        """
         self._create_sharedata_dir_if_not_exists()
-        polys = []
-        for _ in range(k):
-            a = self.field.random()
-            b = self.field.random()
-            c = a*b
-            polys.append(self.poly.random(t, a))
-            polys.append(self.poly.random(t, b))
-            polys.append(self.poly.random(t, c))
-        self._write_polys(PreProcessingConstants.TRIPLES_FILE_NAME_PREFIX, n, t, polys)
+        modulus = self.field.modulus
+        _, values_per_item = _FAKE_SECRET_GENERATORS[kind]
+        seeds = SystemRandom()
+        chunks = [(kind, start, min(self.chunk_size, k - start), n, t, modulus,
+                   seeds.getrandbits(128), extra)
+                  for start in range(0, k, self.chunk_size)]
+
+        file_names = ['%s_%d_%d-%d.share' % (file_name_prefix, n, t, i)
+                      for i in range(n)]
+        tmp_file_names = [f"{file_name}.{uuid4().hex}.tmp" for file_name in file_names]
+        files = [open(tmp_file_name, "wb") for tmp_file_name in tmp_file_names]
+        try:
+            for i, f in enumerate(files):
+                f.write(_share_file_header(modulus, t, i, k * values_per_item))
+
+            for party_shares in self._map_chunks(chunks):
+                for f, shares in zip(files, party_shares):
+                    f.write(shares)
+        finally:
+            for f in files:
+                f.close()
+
+        for tmp_file_name, file_name in zip(tmp_file_names, file_names):
+            os.replace(tmp_file_name, file_name)
+            ShareCursor.reset(file_name)
+
+    def _map_chunks(self, chunks):
+        """ Yields the result of _generate_fake_chunk for every chunk, in order.
+        At most two chunks per process are in flight at any time.
+        """
+        if self.num_processes <= 1 or len(chunks) <= 1:
+            yield from map(_generate_fake_chunk, chunks)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.num_processes) as executor:
+            pending = deque()
+            for chunk in chunks:
+                if len(pending) >= 2 * self.num_processes:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(_generate_fake_chunk, chunk))
+            while pending:
+                yield pending.popleft().result()
+
+    def generate_triples(self, k, n, t):
+        self._generate_fake(
+            PreProcessingConstants.TRIPLES_FILE_NAME_PREFIX, "triples", k, n, t)
 
     def generate_cubes(self, k, n, t):
-        self._create_sharedata_dir_if_not_exists()
-        polys = []
-        for _ in range(k):
-            a1 = self.field.random()
-            a2 = a1*a1
-            a3 = a1*a2
-            polys.append(self.poly.random(t, a1))
-            polys.append(self.poly.random(t, a2))
-            polys.append(self.poly.random(t, a3))
-        self._write_polys(PreProcessingConstants.CUBES_FILE_NAME_PREFIX, n, t, polys)
+        self._generate_fake(
+            PreProcessingConstants.CUBES_FILE_NAME_PREFIX, "cubes", k, n, t)
 
     def generate_zeros(self, k, n, t):
-        self._create_sharedata_dir_if_not_exists()
-        polys = [self.poly.random(t, 0) for _ in range(k)]
-        self._write_polys(PreProcessingConstants.ZEROS_FILE_NAME_PREFIX, n, t, polys)
+        self._generate_fake(
+            PreProcessingConstants.ZEROS_FILE_NAME_PREFIX, "zeros", k, n, t)
 
     def generate_rands(self, k, n, t):
-        self._create_sharedata_dir_if_not_exists()
-        polys = [self.poly.random(t) for _ in range(k)]
-        self._write_polys(PreProcessingConstants.RANDS_FILE_NAME_PREFIX, n, t, polys)
+        self._generate_fake(
+            PreProcessingConstants.RANDS_FILE_NAME_PREFIX, "rands", k, n, t)
 
     def generate_bits(self, k, n, t):
-        self._create_sharedata_dir_if_not_exists()
-        polys = [self.poly.random(t, randint(0, 1)) for _ in range(k)]
-        self._write_polys(PreProcessingConstants.BITS_FILE_NAME_PREFIX, n, t, polys)
+        self._generate_fake(
+            PreProcessingConstants.BITS_FILE_NAME_PREFIX, "bits", k, n, t)
 
     def generate_one_minus_one_rands(self, k, n, t):
-        self._create_sharedata_dir_if_not_exists()
-        polys = [self.poly.random(t, randint(0, 1)*2 - 1) for _ in range(k)]
-        self._write_polys(
-            PreProcessingConstants.ONE_MINUS_ONE_FILE_NAME_PREFIX, n, t, polys)
+        self._generate_fake(PreProcessingConstants.ONE_MINUS_ONE_FILE_NAME_PREFIX,
+                            "one_minus_one", k, n, t)
 
     def generate_powers(self, k, n, t, z):
-        self._create_sharedata_dir_if_not_exists()
         b = self.field.random().value
-
-        # Since we need all powers, multiplication
-        # is faster than using the pow() function.
-        powers = [None] * k
-        powers[0] = b
-        for i in range(1, k):
-            powers[i] = powers[i-1] * b
         for i in range(z):
-            polys = [self.poly.random(t, power) for power in powers]
-            self._write_polys(
-                f"{PreProcessingConstants.POWERS_FILE_NAME_PREFIX}_{i}", n, t, polys)
+            self._generate_fake(f"{PreProcessingConstants.POWERS_FILE_NAME_PREFIX}_{i}",
+                                "powers", k, n, t, b)
 
     def generate_double_shares(self, k, n, t):
-        self._create_sharedata_dir_if_not_exists()
-        polys = []
-        for _ in range(k):
-            r = self.field.random()
-            polys.append(self.poly.random(t, r))
-            polys.append(self.poly.random(2*t, r))
-        self._write_polys(
-            PreProcessingConstants.DOUBLE_SHARES_FILE_NAME_PREFIX, n, t, polys)
+        self._generate_fake(PreProcessingConstants.DOUBLE_SHARES_FILE_NAME_PREFIX,
+                            "double_shares", k, n, t)
 
     def generate_share(self, x, n, t):
-        self._create_sharedata_dir_if_not_exists()
         sid = uuid4().hex
-        polys = [self.poly.random(t, x)]
-        self._write_polys(
-            f"{PreProcessingConstants.SHARES_FILE_NAME_PREFIX}_{sid}", n, t, polys)
+        self._generate_fake(f"{PreProcessingConstants.SHARES_FILE_NAME_PREFIX}_{sid}",
+                            "share", 1, n, t, int(x))
         return sid
 
     def generate_share_bits(self, k, n, t):
@@ -341,16 +661,175 @@ class PreProcessedElements(object):
             n (int): number of parties to generate shares for
             t (int): degree of polynomial to use when generating shares
         """
-        self._create_sharedata_dir_if_not_exists()
-        polys = []
-        for _ in range(k):
-            r = self.field.random()
-            r_bits = [self.field(b) for b in map(
-                int, reversed(f'{{0:0{self._bit_length}b}}'.format(r.value)))]
-
-            polys.append(self.poly.random(t, r))
-            for b in r_bits:
-                polys.append(self.poly.random(t, b))
-
-        self._write_polys(
-            PreProcessingConstants.SHARE_BITS_FILE_NAME_PREFIX, n, t, polys)
+        self._generate_fake(PreProcessingConstants.SHARE_BITS_FILE_NAME_PREFIX,
+                            "share_bits", k, n, t)
+
+
+def _random_elements(rnd, modulus, count):
+    """ Sample count field elements at once. Every element is drawn with 64
+    more bits than the modulus, which makes the bias of the reduction
+    negligible.
+    """
+    if count == 0:
+        return []
+
+    width = (modulus.bit_length() + 7) // 8 + 8
+    data = rnd.getrandbits(8 * width * count).to_bytes(width * count, "little")
+    return [int.from_bytes(data[i:i+width], "little") % modulus
+            for i in range(0, width * count, width)]
+
+
+def _fake_triples(rnd, modulus, t, start, count, extra):
+    ab = _random_elements(rnd, modulus, 2 * count)
+    secrets = []
+    for a, b in zip(ab[::2], ab[1::2]):
+        secrets += (a, b, a * b % modulus)
+    return secrets, [t] * len(secrets)
+
+
+def _fake_cubes(rnd, modulus, t, start, count, extra):
+    secrets = []
+    for a in _random_elements(rnd, modulus, count):
+        a2 = a * a % modulus
+        secrets += (a, a2, a2 * a % modulus)
+    return secrets, [t] * len(secrets)
+
+
+def _fake_zeros(rnd, modulus, t, start, count, extra):
+    return [0] * count, [t] * count
+
+
+def _fake_rands(rnd, modulus, t, start, count, extra):
+    return _random_elements(rnd, modulus, count), [t] * count
+
+
+def _fake_bits(rnd, modulus, t, start, count, extra):
+    return [rnd.getrandbits(1) for _ in range(count)], [t] * count
+
+
+def _fake_one_minus_one(rnd, modulus, t, start, count, extra):
+    return [rnd.getrandbits(1) * 2 - 1 for _ in range(count)], [t] * count
+
+
+def _fake_powers(rnd, modulus, t, start, count, extra):
+    # extra is the base b, item i is b^(i+1)
+    power = pow(extra, start + 1, modulus)
+    secrets = [None] * count
+    for i in range(count):
+        secrets[i] = power
+        power = power * extra % modulus
+    return secrets, [t] * count
+
+
+def _fake_double_shares(rnd, modulus, t, start, count, extra):
+    secrets = []
+    for r in _random_elements(rnd, modulus, count):
+        secrets += (r, r)
+    return secrets, [t, 2*t] * count
+
+
+def _fake_share(rnd, modulus, t, start, count, extra):
+    return [extra] * count, [t] * count
+
+
+def _fake_share_bits(rnd, modulus, t, start, count, extra):
+    bit_length = modulus.bit_length()
+    secrets = []
+    for r in _random_elements(rnd, modulus, count):
+        secrets.append(r)
+        # LSB first
+        secrets += ((r >> i) & 1 for i in range(bit_length))
+    return secrets, [t] * len(secrets)
+
+
+# kind => (secret generator, number of shared values per item)
+_FAKE_SECRET_GENERATORS = {
+    "triples": (_fake_triples, 3),
+    "cubes": (_fake_cubes, 3),
+    "zeros": (_fake_zeros, 1),
+    "rands": (_fake_rands, 1),
+    "bits": (_fake_bits, 1),
+    "one_minus_one": (_fake_one_minus_one, 1),
+    "powers": (_fake_powers, 1),
+    "double_shares": (_fake_double_shares, 2),
+    "share": (_fake_share, 1),
+    "share_bits": (_fake_share_bits, Subgroup.BLS12_381.bit_length() + 1),
+}
+
+
+def _generate_fake_chunk(chunk):
+    """ Generate one chunk of fake preprocessing. Runs in worker processes, so
+    it only takes and returns plain values.
+
+    args:
+        chunk (tuple): (kind, start, count, n, t, modulus, seed, extra)
+
+    output:
+        Returns a list of n byte strings, the packed shares of each party
+    """
+    kind, start, count, n, t, modulus, seed, extra = chunk
+    rnd = Random(seed)
+    generator, _ = _FAKE_SECRET_GENERATORS[kind]
+    secrets, degrees = generator(rnd, modulus, t, start, count, extra)
+
+    coeffs = iter(_random_elements(rnd, modulus, sum(degrees)))
+    polys = [[secret % modulus] + [next(coeffs) for _ in range(degree)]
+             for secret, degree in zip(secrets, degrees)]
+    # all_shares[i][j] is the share of party j for the i'th polynomial
+    all_shares = vandermonde_batch_evaluate(list(range(1, n+1)), polys, modulus)
+
+    size = PreProcessingConstants.ELEMENT_SIZE
+    return [b"".join(shares[j].to_bytes(size, "little") for shares in all_shares)
+            for j in range(n)]
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+    # Go through the package module, so the worker processes of the generator
+    # can find _generate_fake_chunk.
+    import honeybadgermpc.preprocessing as preprocessing
+
+    fake_kinds = ["triples", "cubes", "zeros", "rands", "bits", "one_minus_one_rands",
+                  "powers", "double_shares", "share_bits"]
+
+    parser = ArgumentParser(description="Stages preprocessing for local experiments.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    generate_parser = subparsers.add_parser(
+        "generate",
+        help=f"Generates fake preprocessing in {PreProcessingConstants.SHARED_DATA_DIR}")
+    generate_parser.add_argument("kinds", nargs="+", choices=fake_kinds)
+    generate_parser.add_argument(
+        "-n", type=int, required=True, help="Number of parties.")
+    generate_parser.add_argument(
+        "-t", type=int, required=True, help="Degree of the sharings.")
+    generate_parser.add_argument(
+        "-k", type=int, required=True, help="Number of items of every kind.")
+    generate_parser.add_argument(
+        "-z", type=int, default=1, help="Number of power files, used for `powers`.")
+    generate_parser.add_argument(
+        "-p", "--processes", type=int, default=os.cpu_count(),
+        help="Number of worker processes. (default: number of cpus)")
+    generate_parser.add_argument(
+        "--chunk-size", type=int, default=4096, help="Number of items per task.")
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="Converts text share files to the binary format in place.")
+    convert_parser.add_argument("files", nargs="+")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "generate":
+        pp_elements = preprocessing.PreProcessedElements(args.processes, args.chunk_size)
+        for kind in args.kinds:
+            logging.info(f"Generating {args.k} {kind} for n={args.n}, t={args.t}")
+            if kind == "powers":
+                pp_elements.generate_powers(args.k, args.n, args.t, args.z)
+            else:
+                getattr(pp_elements, f"generate_{kind}")(args.k, args.n, args.t)
+    elif args.command == "convert":
+        for file_name in args.files:
+            count = preprocessing.convert_text_share_file(file_name)
+            logging.info(f"Converted {count} values in {file_name}")
+    else:
+        parser.print_help()
@@ -47,20 +47,13 @@ async def mimc_mpc_batch(context, xs, k):
 
     # def cubing_share_array(): [x1,..., xK] -> [x1^3,..., xK^3]
     async def cubing_share_array(xs):
-        rs, rs_sq, rs_cube = [], [], []
+        rs, rs_sq, rs_cube = pp_elements.get_cubes(context, len(xs))
         x3s = []
 
-        for x in xs:
-            r1, r2, r3 = pp_elements.get_cube(context)
-            y = await (x - r1).open()
-            rs.append(r1)
-            rs_sq.append(r2)
-            rs_cube.append(r3)
-
-        ys = await (context.ShareArray(xs) - context.ShareArray(rs)).open()
-        for i, y in enumerate(ys):
+        ys = await (context.ShareArray(xs) - rs).open()
+        for y, r1, r2, r3 in zip(ys, rs._shares, rs_sq._shares, rs_cube._shares):
             # [x^3] = 3y[r^2] + 3y^2[r] + y^3 + [r^3]
-            x3s.append(3*y*rs_sq[i] + 3*(y**2)*rs[i] + y**3 + rs_cube[i])
+            x3s.append(3*y*r2 + 3*(y**2)*r1 + y**3 + r3)
 
         return x3s
 
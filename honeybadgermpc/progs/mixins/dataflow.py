@@ -7,6 +7,16 @@ from honeybadgermpc.utils.typecheck import TypeCheck
 from typing import Callable
 
 
+def _resolve_with(res, opening):
+    """Resolve res with the value of the finished future opening, or with its
+    exception, so that a failed open does not leave res pending forever
+    """
+    if opening.exception() is not None:
+        res.set_exception(opening.exception())
+    else:
+        res.set_result(opening.result())
+
+
 class GFElementFuture(ABC, asyncio.Future):
     @property
     @classmethod
@@ -69,7 +79,7 @@ class Share(ABC):
             def cb1(v):
                 # Future that will resolve to the opened share
                 opening = self.context.open_share(self.context.Share(v.result()))
-                opening.add_done_callback(lambda f: res.set_result(f.result()))
+                opening.add_done_callback(lambda f: _resolve_with(res, f))
 
             self.v.add_done_callback(cb1)
         else:
@@ -77,7 +87,7 @@ class Share(ABC):
             opening = self.context.open_share(self)
 
             # Make res resolve to the opened value
-            opening.add_done_callback(lambda f: res.set_result(f.result()))
+            opening.add_done_callback(lambda f: _resolve_with(res, f))
         return res
 
     # Linear combinations of shares can be computed directly
@@ -196,6 +206,15 @@ class ShareArray(ABC):
     def __len__(self):
         return len(self._shares)
 
+    def _vector(self):
+        """Returns the local share values as a GFVector, or None if some of them
+        are still futures
+        """
+        values = [s.v for s in self._shares]
+        if all(type(v) is GFElement for v in values):
+            return self.context.field.vector(values)
+        return None
+
     @TypeCheck(arithmetic=True)
     def __add__(self, other: (ShareArray, list)):
         if isinstance(other, list):
@@ -204,6 +223,10 @@ class ShareArray(ABC):
         assert self.t == other.t
         assert len(self) == len(other)
 
+        a, b = self._vector(), other._vector()
+        if a is not None and b is not None:
+            return self.context.ShareArray(a + b, self.t)
+
         result = [a+b for (a, b) in zip(self._shares, other._shares)]
         return self.context.ShareArray(result, self.t)
 
@@ -215,6 +238,10 @@ class ShareArray(ABC):
         assert self.t == other.t
         assert len(self) == len(other)
 
+        a, b = self._vector(), other._vector()
+        if a is not None and b is not None:
+            return self.context.ShareArray(a - b, self.t)
+
         result = [a-b for (a, b) in zip(self._shares, other._shares)]
         return self.context.ShareArray(result, self.t)
 
@@ -32,16 +32,12 @@ class BeaverMultiplyArrays(AsyncMixin):
     async def _prog(context: Mpc, j: ShareArray, k: ShareArray):
         assert len(j) == len(k)
 
-        a, b, ab = [], [], []
-        for _ in range(len(j)):
-            p, q, pq = MixinBase.pp_elements.get_triple(context)
-            a.append(p)
-            b.append(q)
-            ab.append(pq)
-
-        u, v = context.ShareArray(a), context.ShareArray(b)
+        u, v, w = MixinBase.pp_elements.get_triples(context, len(j))
         f, g = await gather(*[(j - u).open(), (k - v).open()])
-        xy = [d*e + d*q + e*p + pq for (p, q, pq, d, e) in zip(a, b, ab, f, g)]
+
+        d, e = context.field.vector(f), context.field.vector(g)
+        p, q, pq = (context.field.vector([s.v for s in x._shares]) for x in (u, v, w))
+        xy = d*e + d*q + e*p + pq
 
         return context.ShareArray(xy)
 
@@ -79,14 +75,7 @@ class DoubleSharingMultiplyArrays(AsyncMixin):
     async def reduce_degree_share_array(context: Mpc, x_2t: ShareArray):
         assert x_2t.t == context.t*2
 
-        r_t, r_2t = [], []
-        for _ in range(len(x_2t)):
-            r_t_, r_2t_ = MixinBase.pp_elements.get_double_share(context)
-            r_t.append(r_t_)
-            r_2t.append(r_2t_)
-
-        q_t = context.ShareArray(r_t)
-        q_2t = context.ShareArray(r_2t, 2*context.t)
+        q_t, q_2t = MixinBase.pp_elements.get_double_shares(context, len(x_2t))
         diff = await (x_2t - q_2t).open()
         return q_t + diff
 
@@ -124,11 +113,10 @@ class InvertShareArray(AsyncMixin):
     @staticmethod
     @TypeCheck()
     async def _prog(context: Mpc, xs: ShareArray):
-        rs = context.ShareArray([MixinBase.pp_elements.get_rand(context)
-                                 for _ in range(len(xs))])
+        rs = MixinBase.pp_elements.get_rands(context, len(xs))
 
         sigs = await (await (xs*rs)).open()
-        sig_invs = context.ShareArray([1/sig for sig in sigs])
+        sig_invs = context.ShareArray(context.field.vector(sigs).inverse())
 
         return await (rs * sig_invs)
 
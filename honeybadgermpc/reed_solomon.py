@@ -1,5 +1,4 @@
-from honeybadgermpc.ntl import vandermonde_batch_evaluate, \
-    vandermonde_batch_interpolate
+from honeybadgermpc.ntl import vandermonde_batch_evaluate, VandermondeInverse
 from honeybadgermpc.ntl import gao_interpolate
 from honeybadgermpc.ntl import fft, fft_interpolate, fft_batch_interpolate, \
     fft_batch_evaluate, SetNumThreads, AvailableNTLThreads
@@ -8,6 +7,7 @@ from honeybadgermpc.exceptions import HoneyBadgerMPCError
 import logging
 import psutil
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 
 
 class Encoder(ABC):
@@ -114,13 +114,18 @@ class VandermondeDecoder(Decoder):
         self.modulus = point.field.modulus
         self.point = point
 
+    def _inverse(self, z):
+        # Inverting the matrix dominates decoding, so it is done once per subset
+        return coder_cache.get(
+            ("vandermonde_inverse", tuple(z)) + _point_key(self.point),
+            lambda: VandermondeInverse([self.point(zi).value for zi in z],
+                                       self.modulus))
+
     def decode_one(self, z, encoded):
-        x = [self.point(zi).value for zi in z]
-        return vandermonde_batch_interpolate(x, [encoded], self.modulus)[0]
+        return self._inverse(z).interpolate([encoded])[0]
 
     def decode_batch(self, z, encoded):
-        x = [self.point(zi).value for zi in z]
-        return vandermonde_batch_interpolate(x, encoded, self.modulus)
+        return self._inverse(z).interpolate(encoded)
 
 
 class FFTDecoder(Decoder):
@@ -146,11 +151,12 @@ class GaoRobustDecoder(RobustDecoder):
         self.point = point
         self.modulus = point.field.modulus
         self.use_omega_powers = point.use_omega_powers
+        self._x = [point(i).value for i in range(point.n)]
 
     # TODO: refactor this using `OptimalEncoder`
     #       see: https://github.com/initc3/HoneyBadgerMPC/pull/268
     def robust_decode(self, z, encoded):
-        x = [self.point(zi).value for zi in z]
+        x = [self._x[zi] for zi in z]
 
         args = [x, encoded, self.d + 1, self.modulus]
         if self.use_omega_powers:
@@ -168,8 +174,8 @@ class GaoRobustDecoder(RobustDecoder):
                 err_eval = fft(error_poly, self.point.omega.value,
                                self.modulus, self.point.order)[:self.point.n]
             else:
-                x = [self.point(i).value for i in range(self.point.n)]
-                err_eval = vandermonde_batch_evaluate(x, [error_poly], self.modulus)[0]
+                err_eval = vandermonde_batch_evaluate(
+                    self._x, [error_poly], self.modulus)[0]
 
             errors = [i for i in range(self.point.n) if err_eval[i] == 0]
 
@@ -467,6 +473,55 @@ class OptimalDecoder(Decoder):
         return DecoderSelector.select(self.point, len(data)).decode_batch(z, data)
 
 
+class CoderCache(object):
+    """Bounded LRU cache for encoders and decoders
+
+    Reconstruction keeps asking for coders over the same evaluation points, so
+    these are built once and shared.
+    Cached objects must not hold per-call state.
+    """
+    DEFAULT_MAX_SIZE = 1024
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, create):
+        """Return the entry for key, calling create() to build it on a miss"""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = self._entries[key] = create()
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return value
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def clear(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+coder_cache = CoderCache()
+
+
+def _point_key(point):
+    return (point.field.modulus, point.n, point.use_omega_powers)
+
+
 class Algorithm:
     VANDERMONDE = 'vandermonde'
     FFT = 'fft'
@@ -477,6 +532,11 @@ class Algorithm:
 class EncoderFactory:
     @staticmethod
     def get(point, algorithm=None):
+        return coder_cache.get(("encoder", algorithm) + _point_key(point),
+                               lambda: EncoderFactory.create(point, algorithm))
+
+    @staticmethod
+    def create(point, algorithm=None):
         if algorithm == Algorithm.VANDERMONDE:
             return VandermondeEncoder(point)
         elif algorithm == Algorithm.FFT:
@@ -497,6 +557,11 @@ class EncoderFactory:
 class DecoderFactory:
     @staticmethod
     def get(point, algorithm=None):
+        return coder_cache.get(("decoder", algorithm) + _point_key(point),
+                               lambda: DecoderFactory.create(point, algorithm))
+
+    @staticmethod
+    def create(point, algorithm=None):
         if algorithm == Algorithm.VANDERMONDE:
             return VandermondeDecoder(point)
         elif algorithm == Algorithm.FFT:
@@ -517,6 +582,12 @@ class DecoderFactory:
 class RobustDecoderFactory:
     @staticmethod
     def get(t, point, algorithm=Algorithm.GAO):
+        return coder_cache.get(
+            ("robust_decoder", algorithm, t) + _point_key(point),
+            lambda: RobustDecoderFactory.create(t, point, algorithm))
+
+    @staticmethod
+    def create(t, point, algorithm=Algorithm.GAO):
         if algorithm == Algorithm.GAO:
             return GaoRobustDecoder(t, point)
         elif algorithm == Algorithm.WELCH_BERLEKAMP:
@@ -71,7 +71,7 @@ def make_wb_encoder_decoder(n, k, p, point=None):
         assert len(message) == t + 1
 
         the_poly = poly(message)
-        return [the_poly(point(i)) for i in range(n)]
+        return the_poly.evaluate_many([point(i) for i in range(n)])
 
     def solve_system(encoded_message, max_e, debug=False):
         """
@@ -21,3 +21,39 @@ async def robust_reconstruct(field_futures, field, n, t, point, degree):
             polys, errors = incremental_decoder.get_results()
             return polynomials_over(field)(polys[0]), errors
     return None, None
+
+
+async def batch_robust_reconstruct(field_futures, field, n, t, point, degree,
+                                   batch_size, algorithm=Algorithm.GAO):
+    """ Robustly reconstruct a batch of values shared with the same degree
+
+    args:
+        field_futures: one awaitable per party, each resolving to that party's
+            list of shares of the batch (in the same order for every party)
+        field: field the shares live in
+        n: number of parties
+        t: number of faults tolerated
+        point: EvalPoint at which parties hold their shares
+        degree: degree of the sharing polynomials
+        batch_size: number of values in the batch
+        algorithm: robust decoding algorithm to fall back to on errors
+
+    output:
+        Tuple of the list of reconstructed polynomials and the set of parties
+        detected as faulty, or (None, None) if reconstruction failed
+    """
+    use_omega_powers = point.use_omega_powers
+    enc = EncoderFactory.get(point, Algorithm.FFT if use_omega_powers
+                             else Algorithm.VANDERMONDE)
+    dec = DecoderFactory.get(point, Algorithm.FFT if use_omega_powers
+                             else Algorithm.VANDERMONDE)
+    robust_dec = RobustDecoderFactory.get(t, point, algorithm=algorithm)
+
+    incremental_decoder = IncrementalDecoder(enc, dec, robust_dec, degree, batch_size, t)
+
+    async for (idx, d) in fetch_one(field_futures):
+        incremental_decoder.add(idx, [x.value for x in d])
+        if incremental_decoder.done():
+            polys, errors = incremental_decoder.get_results()
+            return list(map(polynomials_over(field), polys)), errors
+    return None, None
@@ -30,6 +30,7 @@ pub mod bls12_381;
 use bls12_381::{G1, G2, Fr, Fq, Fq2, Fq6, Fq12, FqRepr, FrRepr};
 mod wnaf;
 pub use self::wnaf::Wnaf;
+use self::wnaf::multiexp;
 
 use ff::{Field,  PrimeField, PrimeFieldDecodingError, PrimeFieldRepr, ScalarEngine, SqrtField};
 use std::error::Error;
@@ -312,6 +313,25 @@ impl PyG1 {
         Ok(())
     }
 
+    /// Sets self to the sum of bases[i] * scalars[i], computed with a single
+    /// multi-exponentiation
+    fn multiexp(&mut self, bases: &PyList, scalars: &PyList) -> PyResult<()> {
+        let bases: Vec<G1> = bases.iter().map(|item| {
+            let base: &PyG1 = item.try_into().unwrap();
+            base.g1
+        }).collect();
+        let scalars: Vec<FrRepr> = scalars.iter().map(|item| {
+            let scalar: &PyFr = item.try_into().unwrap();
+            scalar.fr.into_repr()
+        }).collect();
+        self.g1 = multiexp(&bases, &scalars);
+        if self.pplevel != 0 {
+            self.pp = Vec::new();
+            self.pplevel = 0;
+        }
+        Ok(())
+    }
+
     pub fn projective(&self) -> PyResult<String> {
         Ok(format!("({}, {}, {})",self.g1.x, self.g1.y, self.g1.z))
     }
@@ -533,6 +553,25 @@ impl PyG2 {
         }
         Ok(())
     }
+
+    /// Sets self to the sum of bases[i] * scalars[i], computed with a single
+    /// multi-exponentiation
+    fn multiexp(&mut self, bases: &PyList, scalars: &PyList) -> PyResult<()> {
+        let bases: Vec<G2> = bases.iter().map(|item| {
+            let base: &PyG2 = item.try_into().unwrap();
+            base.g2
+        }).collect();
+        let scalars: Vec<FrRepr> = scalars.iter().map(|item| {
+            let scalar: &PyFr = item.try_into().unwrap();
+            scalar.fr.into_repr()
+        }).collect();
+        self.g2 = multiexp(&bases, &scalars);
+        if self.pplevel != 0 {
+            self.pp = Vec::new();
+            self.pplevel = 0;
+        }
+        Ok(())
+    }
     pub fn projective(&self) -> PyResult<String> {
         Ok(format!("({}, {}, {})",self.g2.x, self.g2.y, self.g2.z))
     }
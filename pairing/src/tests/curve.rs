@@ -63,9 +63,38 @@ pub fn curve_tests<G: CurveProjective>() {
     random_negation_tests::<G>();
     random_transformation_tests::<G>();
     random_wnaf_tests::<G>();
+    random_multiexp_tests::<G>();
     random_encoding_tests::<G::Affine>();
 }
 
+fn random_multiexp_tests<G: CurveProjective>() {
+    use ff::PrimeField;
+    use wnaf::multiexp;
+
+    let mut rng = XorShiftRng::from_seed([0x5dbe6259, 0x8d313d76, 0x3237db17, 0xe5bc0654]);
+
+    // Both sides of the switch from interleaved w-NAF to Pippenger's method
+    for &count in [0, 1, 2, 5, 31, 32, 33, 100].iter() {
+        let bases: Vec<G> = (0..count).map(|_| G::rand(&mut rng)).collect();
+        let mut scalars: Vec<_> = (0..count)
+            .map(|_| G::Scalar::rand(&mut rng).into_repr())
+            .collect();
+        if count > 1 {
+            scalars[0] = G::Scalar::zero().into_repr();
+            scalars[1] = G::Scalar::one().into_repr();
+        }
+
+        let mut expected = G::zero();
+        for (base, scalar) in bases.iter().zip(scalars.iter()) {
+            let mut term = *base;
+            term.mul_assign(*scalar);
+            expected.add_assign(&term);
+        }
+
+        assert_eq!(multiexp(&bases, &scalars), expected);
+    }
+}
+
 fn random_wnaf_tests<G: CurveProjective>() {
     use ff::PrimeField;
     use wnaf::*;
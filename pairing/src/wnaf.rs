@@ -70,6 +70,113 @@ pub(crate) fn wnaf_exp<G: CurveProjective>(table: &[G], wnaf: &[i64]) -> G {
     result
 }
 
+/// Computes the sum of `bases[i] * scalars[i]`.
+///
+/// Small inputs interleave the w-NAF forms of all scalars (Straus' method), so the
+/// doublings are shared by every base. Larger inputs use Pippenger's bucket method.
+pub(crate) fn multiexp<G: CurveProjective>(
+    bases: &[G],
+    scalars: &[<G::Scalar as PrimeField>::Repr],
+) -> G {
+    assert_eq!(bases.len(), scalars.len());
+
+    if bases.len() < 32 {
+        wnaf_multiexp(bases, scalars)
+    } else {
+        pippenger_multiexp(bases, scalars)
+    }
+}
+
+fn wnaf_multiexp<G: CurveProjective>(
+    bases: &[G],
+    scalars: &[<G::Scalar as PrimeField>::Repr],
+) -> G {
+    let mut tables = Vec::with_capacity(bases.len());
+    let mut wnafs = Vec::with_capacity(bases.len());
+    for (base, scalar) in bases.iter().zip(scalars.iter()) {
+        let window = G::recommended_wnaf_for_scalar(*scalar);
+        let mut table = vec![];
+        wnaf_table(&mut table, *base, window);
+        let mut wnaf = vec![];
+        wnaf_form(&mut wnaf, *scalar, window);
+        tables.push(table);
+        wnafs.push(wnaf);
+    }
+
+    let max_len = wnafs.iter().map(|wnaf| wnaf.len()).max().unwrap_or(0);
+    let mut result = G::zero();
+    for i in (0..max_len).rev() {
+        result.double();
+
+        for (table, wnaf) in tables.iter().zip(wnafs.iter()) {
+            if i >= wnaf.len() {
+                continue;
+            }
+
+            let n = wnaf[i];
+            if n > 0 {
+                result.add_assign(&table[(n / 2) as usize]);
+            } else if n < 0 {
+                result.sub_assign(&table[((-n) / 2) as usize]);
+            }
+        }
+    }
+
+    result
+}
+
+fn pippenger_multiexp<G: CurveProjective>(
+    bases: &[G],
+    scalars: &[<G::Scalar as PrimeField>::Repr],
+) -> G {
+    // Window size of roughly ln(n) bits
+    let c = ((bases.len() as f64).ln().ceil() as usize).max(2);
+    let num_bits = <G::Scalar as PrimeField>::NUM_BITS as usize;
+
+    let mut result = G::zero();
+    let mut window_start = ((num_bits + c - 1) / c) * c;
+    while window_start > 0 {
+        window_start -= c;
+        for _ in 0..c {
+            result.double();
+        }
+
+        let mut buckets = vec![G::zero(); (1 << c) - 1];
+        for (base, scalar) in bases.iter().zip(scalars.iter()) {
+            let digit = window_digit(scalar, window_start, c);
+            if digit != 0 {
+                buckets[digit - 1].add_assign(base);
+            }
+        }
+
+        // sum_j j * buckets[j - 1], as a sum of running sums
+        let mut running_sum = G::zero();
+        for bucket in buckets.iter().rev() {
+            running_sum.add_assign(bucket);
+            result.add_assign(&running_sum);
+        }
+    }
+
+    result
+}
+
+/// Returns the `c` bits of `scalar` starting at bit `start`.
+fn window_digit<S: PrimeFieldRepr>(scalar: &S, start: usize, c: usize) -> usize {
+    let limbs = scalar.as_ref();
+    let limb = start / 64;
+    let offset = start % 64;
+    if limb >= limbs.len() {
+        return 0;
+    }
+
+    let mut bits = limbs[limb] >> offset;
+    if offset + c > 64 && limb + 1 < limbs.len() {
+        bits |= limbs[limb + 1] << (64 - offset);
+    }
+
+    (bits & ((1 << c) - 1)) as usize
+}
+
 /// A "w-ary non-adjacent form" exponentiation context.
 #[derive(Debug)]
 pub struct Wnaf<W, B, S> {
@@ -1,7 +1,7 @@
 from honeybadgermpc.config import HbmpcConfig
 from honeybadgermpc.ipc import ProcessProgramRunner
 from honeybadgermpc.poly_commit_const import gen_pc_const_crs
-from .hbavss import get_avss_params, HbAvssBatch
+from .hbavss import get_avss_params, HbAvssBatch, dealer_executor
 from honeybadgermpc.betterpairing import ZR
 import asyncio
 import time
@@ -13,7 +13,7 @@ logger.setLevel(logging.ERROR)
 logger.setLevel(logging.NOTSET)
 
 
-async def _run(peers, n, t, my_id, batch_size):
+async def _run(peers, n, t, my_id, batch_size, dealer_processes=1):
     g, h, pks, sks = get_avss_params(n + 1, t)
     async with ProcessProgramRunner(peers, n+1, t, my_id) as runner:
         send, recv = runner.get_send_recv('HBAVSS_BATCH')
@@ -28,7 +28,13 @@ async def _run(peers, n, t, my_id, batch_size):
         else:
             logger.info("Starting RECIPIENT: %d", my_id)
 
-        with HbAvssBatch(pks, sks[my_id], crs, n, t, my_id, send, recv) as hbavss:
+        # The dealer may spread its computation over several processes
+        executor = None
+        if my_id == dealer_id and dealer_processes > 1:
+            executor = dealer_executor(crs, dealer_processes)
+
+        with HbAvssBatch(pks, sks[my_id], crs, n, t, my_id, send, recv,
+                         executor=executor) as hbavss:
             begin_time = time.time()
             if my_id != dealer_id:
                 hbavss_task = asyncio.create_task(hbavss.avss(
@@ -42,6 +48,8 @@ async def _run(peers, n, t, my_id, batch_size):
                     0, dealer_id=dealer_id, values=values, client_mode=True)
                 end_time = time.time()
                 logger.info(f"Dealer time: {(end_time - begin_time)}")
+        if executor is not None:
+            executor.shutdown()
 
 
 if __name__ == '__main__':
@@ -51,6 +59,7 @@ if __name__ == '__main__':
     try:
         loop.run_until_complete(
             _run(HbmpcConfig.peers, HbmpcConfig.N,
-                 HbmpcConfig.t, HbmpcConfig.my_id, HbmpcConfig.extras['k']))
+                 HbmpcConfig.t, HbmpcConfig.my_id, HbmpcConfig.extras['k'],
+                 HbmpcConfig.extras.get('dealer_processes', 1)))
     finally:
         loop.close()
@@ -3,6 +3,7 @@ set -e  # fail if any command fails
 
 # This script runs an MPC program in N processes.
 # Usage: scripts/launch-tmuxlocal.sh honeybadgermpc/ipc.py conf/mpc/local
+# Use conf/mpc_ipc/local to connect the processes over ipc:// instead of TCP
 
 if [ $# -lt 2 ] ; then
     echo "usage: $0 <module.py> <conf>"
@@ -1,7 +1,7 @@
 import pickle
 import random
 from base64 import encodebytes
-from pytest import mark
+from pytest import mark, raises
 from honeybadgermpc.broadcast.crypto.boldyreva import dealer
 
 
@@ -63,6 +63,20 @@ def test_boldyreva():
         assert PK.verify_signature(sig, h)
 
 
+def test_batch_verification():
+    pk, sks = dealer(players=4, k=2)
+    hs = [pk.hash_message(str(i)) for i in range(3)]
+    shares = [(sk.sign(h), sk.i, h) for sk in sks for h in hs]
+    assert pk.verify_shares(shares)
+    with raises(AssertionError):
+        pk.verify_shares(shares[:1] + [(shares[1][0], 2, shares[1][2])])
+
+    sigs = [pk.combine_shares({0: sks[0].sign(h), 3: sks[3].sign(h)}) for h in hs]
+    assert pk.verify_signatures(list(zip(sigs, hs)))
+    with raises(AssertionError):
+        pk.verify_signatures(list(zip(sigs, reversed(hs))))
+
+
 @mark.parametrize('n', (0, 1, 2))
 def test_deserialize_arg(n, g, mocker):
     from honeybadgermpc.broadcast.crypto import boldyreva
@@ -8,18 +8,21 @@ async def test_butterfly_network(test_preprocessing):
     from honeybadgermpc.progs.mixins.share_arithmetic import BeaverMultiplyArrays
     from honeybadgermpc.progs.mixins.constants import MixinConstants
 
-    n, t, k, delta = 3, 1, 32, -9999
+    n, t, k = 3, 1, 32
     test_preprocessing.generate("rands", n, t)
     test_preprocessing.generate("oneminusone", n, t)
     test_preprocessing.generate("triples", n, t)
 
     async def verify_output(ctx, **kwargs):
-        k, delta = kwargs['k'], kwargs['delta']
+        k = kwargs['k']
         inputs = [test_preprocessing.elements.get_rand(ctx) for _ in range(k)]
         sorted_input = sorted(await ctx.ShareArray(inputs).open(), key=lambda x: x.value)
 
-        share_arr = await butterfly.butterfly_network_helper(ctx, k=k, delta=delta)
-        outputs = await share_arr.open()
+        # Preprocessed values are consumed only once, so shuffle the inputs
+        # opened above instead of letting butterfly_network_helper draw new ones
+        shuffled = await butterfly.iterated_butterfly_network(
+            ctx, [x.v for x in inputs], k)
+        outputs = await ctx.ShareArray(list(map(ctx.Share, shuffled))).open()
 
         assert len(sorted_input) == len(outputs)
         sorted_output = sorted(outputs, key=lambda x: x.value)
@@ -28,10 +31,48 @@ async def test_butterfly_network(test_preprocessing):
 
     program_runner = TaskProgramRunner(
         n, t, {MixinConstants.MultiplyShareArray: BeaverMultiplyArrays()})
-    program_runner.add(verify_output,  k=k, delta=delta)
+    program_runner.add(verify_output, k=k)
     await program_runner.join()
 
 
+@mark.asyncio
+async def test_butterfly_network_helper(test_preprocessing, galois_field, polynomial):
+    import apps.asynchromix.butterfly_network as butterfly
+    from honeybadgermpc.mpc import TaskProgramRunner
+    from honeybadgermpc.preprocessing import PreProcessingConstants, ShareFile
+    from honeybadgermpc.progs.mixins.share_arithmetic import BeaverMultiplyArrays
+    from honeybadgermpc.progs.mixins.constants import MixinConstants
+
+    n, t, k = 3, 1, 32
+    test_preprocessing.generate("rands", n, t)
+    test_preprocessing.generate("oneminusone", n, t)
+    test_preprocessing.generate("triples", n, t)
+
+    # The secrets shared in the rands files, in the order they are handed out
+    files = [ShareFile(f"{PreProcessingConstants.RANDS_FILE_NAME_PREFIX}_{n}_{t}-{i}"
+                       ".share") for i in range(n)]
+    secrets = [polynomial.interpolate_at(list(zip(range(1, t+2), shares)), 0).value
+               for shares in zip(*files[:t+1])]
+    [f.close() for f in files]
+
+    async def verify_output(ctx, **kwargs):
+        k = kwargs['k']
+        outputs = await (await butterfly.butterfly_network_helper(ctx, k=k)).open()
+        next_rand = await test_preprocessing.elements.get_rand(ctx).open()
+        return [x.value for x in outputs], next_rand.value
+
+    program_runner = TaskProgramRunner(
+        n, t, {MixinConstants.MultiplyShareArray: BeaverMultiplyArrays()})
+    program_runner.add(verify_output, k=k)
+    results = await program_runner.join()
+    assert len(set(map(str, results))) == 1
+    outputs, next_rand = results[0]
+
+    # The helper shuffled the next k unused rands, and consumed them
+    start = secrets.index(next_rand) - k
+    assert sorted(outputs) == sorted(secrets[start:start + k])
+
+
 @mark.asyncio
 async def test_phase1(test_preprocessing, galois_field):
     from honeybadgermpc.mpc import TaskProgramRunner
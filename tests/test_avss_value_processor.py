@@ -423,3 +423,101 @@ async def test_add_to_output_queue(n, t, b, input_next_ids, output_next_ids,
     assert len(output_queue_vals) == avss_proc.output_queue.qsize()
     for val in output_queue_vals:
         assert val == avss_proc.output_queue.get_nowait()
+
+
+@mark.asyncio
+async def test_acs_pipeline(monkeypatch):
+    from honeybadgermpc import avss_value_processor
+
+    n, t = 4, 1
+    acs_inputs, acs_results, acs_coin_bits = {}, {}, {}
+
+    async def run_common_subset(sid, pk, sk, n, t, my_id, send, recv, value,
+                                coin_bits=None):
+        # Every party reports the same counts as this node
+        acs_inputs[sid] = value
+        acs_coin_bits[sid] = coin_bits
+        acs_results[sid] = asyncio.Future()
+        await acs_results[sid]
+        return (value,)*n
+
+    monkeypatch.setattr(avss_value_processor, "run_common_subset", run_common_subset)
+
+    def send(dest, message):
+        pass
+
+    async def recv():
+        await asyncio.Future()
+
+    input_q = asyncio.Queue()
+    with AvssValueProcessor(None, None, n, t, 0, send, recv, input_q.get,
+                            max_acs_in_flight=2,
+                            get_coin_bits=iter(range(10)).__next__) as proc:
+        for i in range(3):
+            input_q.put_nowait((i, 0, f"{i}0"))
+            await asyncio.sleep(0.01)
+
+        # Two instances were started without waiting for each other
+        assert sorted(acs_inputs) == ["AVSS-ACS-0", "AVSS-ACS-1"]
+        assert acs_inputs["AVSS-ACS-0"] == dumps([1, 0, 0, 0])
+        assert acs_inputs["AVSS-ACS-1"] == dumps([1, 1, 0, 0])
+        # The coin bits are taken in the order in which the instances are started
+        assert acs_coin_bits == {"AVSS-ACS-0": 0, "AVSS-ACS-1": 1}
+
+        # Outputs are processed in the order in which the instances were started
+        acs_results["AVSS-ACS-1"].set_result(None)
+        await asyncio.sleep(0.01)
+        assert [len(outputs) for outputs in proc.outputs_per_dealer] == [0]*n
+        acs_results["AVSS-ACS-0"].set_result(None)
+        await asyncio.sleep(0.01)
+        assert [len(outputs) for outputs in proc.outputs_per_dealer] == [1, 1, 0, 0]
+
+        # The next instance agrees on all the values received in the meantime
+        assert acs_inputs["AVSS-ACS-2"] == dumps([1, 1, 1, 0])
+        acs_results["AVSS-ACS-2"].set_result(None)
+        await asyncio.sleep(0.01)
+        assert [len(outputs) for outputs in proc.outputs_per_dealer] == [1, 1, 1, 0]
+
+        # Nothing new to agree on, until t+1 other parties start an instance
+        assert "AVSS-ACS-3" not in acs_inputs
+        proc._note_acs_started(1, "AVSS-ACS-3")
+        await asyncio.sleep(0.01)
+        assert "AVSS-ACS-3" not in acs_inputs
+        proc._note_acs_started(2, "AVSS-ACS-3")
+        await asyncio.sleep(0.01)
+        assert acs_inputs["AVSS-ACS-3"] == dumps([1, 1, 1, 0])
+
+
+@mark.asyncio
+async def test_acs_byzantine_tag(monkeypatch):
+    from honeybadgermpc import avss_value_processor
+
+    n, t = 4, 1
+    acs_inputs = {}
+
+    async def run_common_subset(sid, pk, sk, n, t, my_id, send, recv, value,
+                                coin_bits=None):
+        acs_inputs[sid] = value
+        return (value,)*n
+
+    monkeypatch.setattr(avss_value_processor, "run_common_subset", run_common_subset)
+
+    def send(dest, message):
+        pass
+
+    messages = asyncio.Queue()
+    input_q = asyncio.Queue()
+    with AvssValueProcessor(None, None, n, t, 0, send, messages.get, input_q.get,
+                            max_acs_in_flight=2) as proc:
+        # A single party claims to have started a billion instances
+        messages.put_nowait((3, ("AVSS-ACS-1000000000", None)))
+        await asyncio.sleep(0.01)
+        assert proc.acs_requested == 0
+        assert acs_inputs == {}
+
+        # Honest parties go on starting instances one after the other
+        for j in (1, 2):
+            messages.put_nowait((j, ("AVSS-ACS-0", None)))
+        await asyncio.sleep(0.01)
+        assert proc.acs_requested == 1
+        assert sorted(acs_inputs) == ["AVSS-ACS-0"]
@@ -0,0 +1,39 @@
+import asyncio
+from pytest import mark
+from honeybadgermpc.batch_verification import BatchVerifier, find_invalid_groups
+
+
+class FakePolyCommit(object):
+    """Accepts a batch of evaluation proofs, here booleans, if all of them are True"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def batch_verify_evals(self, evals):
+        self.calls += 1
+        return all(evals)
+
+
+def test_find_invalid_groups():
+    poly_commit = FakePolyCommit()
+    groups = [[True, True] for _ in range(16)]
+    assert find_invalid_groups(poly_commit, groups) == set()
+    assert poly_commit.calls == 1
+
+    groups[3][1] = False
+    groups[12][0] = False
+    assert find_invalid_groups(poly_commit, groups) == {3, 12}
+    assert find_invalid_groups(poly_commit, []) == set()
+
+
+@mark.asyncio
+async def test_batch_verifier():
+    poly_commit = FakePolyCommit()
+    verifier = BatchVerifier(poly_commit)
+    groups = [[True], [True, False], [True, True], [False]]
+    results = await asyncio.gather(*[verifier.verify(group) for group in groups])
+    assert results == [True, False, True, False]
+
+    poly_commit.calls = 0
+    assert await verifier.verify([True])
+    assert poly_commit.calls == 1
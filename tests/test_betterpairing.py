@@ -1,3 +1,6 @@
+from pytest import mark
+
+
 def test_zr_math():
     from honeybadgermpc.betterpairing import ZR
     assert ZR("2")**3 == 8
@@ -54,3 +57,26 @@ def test_serialization():
     bb = G1()
     bb.__setstate__(b.__getstate__())
     assert bb == b
+
+
+@mark.parametrize('native', (True, False))
+def test_multiexp(native, monkeypatch):
+    from honeybadgermpc import betterpairing
+    from honeybadgermpc.betterpairing import ZR, G1, G2
+
+    if native:
+        # The pairing crate of this tree provides multiexp
+        assert betterpairing._HAS_NATIVE_MULTIEXP
+    else:
+        monkeypatch.setattr(betterpairing, "_HAS_NATIVE_MULTIEXP", False)
+
+    # Small inputs use interleaved w-NAF, larger ones Pippenger's method
+    for count in (1, 5, 40):
+        scalars = [ZR.random() for _ in range(count - 1)] + [7]
+        for group in (G1, G2):
+            bases = [group.rand() for _ in range(count)]
+            expected = group.one()
+            for base, scalar in zip(bases, scalars):
+                expected *= base ** scalar
+            assert group.multiexp(bases, scalars) == expected
+    assert G1.multiexp([], []) == G1.one()
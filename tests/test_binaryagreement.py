@@ -3,9 +3,7 @@ from asyncio import Queue, Event
 from asyncio import get_event_loop, create_task, gather
 from pytest import mark, raises
 
-from honeybadgermpc.broadcast.commoncoin import shared_coin
 from honeybadgermpc.broadcast.binaryagreement import binaryagreement
-from honeybadgermpc.broadcast.crypto.boldyreva import dealer
 from collections import defaultdict
 
 
@@ -168,6 +166,9 @@ async def test_binaryagreement_dummy_with_byz_message_type(byznode):
 
 # Test binary agreement with boldyreva coin
 async def _make_coins(test_router, sid, n, f, seed):
+    from honeybadgermpc.broadcast.commoncoin import shared_coin
+    from honeybadgermpc.broadcast.crypto.boldyreva import dealer
+
     # Generate keys
     pk, sks = dealer(n, f+1)
     _, recvs, sends = test_router(n, seed=seed)
@@ -176,9 +177,35 @@ async def _make_coins(test_router, sid, n, f, seed):
     return zip(*result)
 
 
+# Test binary agreement with a coin opening preprocessed bits
+def _share_random_bits(n, f, seed, rounds):
+    """Returns the polynomials sharing rounds random bits, and the shares of each
+    party"""
+    from honeybadgermpc.elliptic_curve import Subgroup
+    from honeybadgermpc.field import GF
+    from honeybadgermpc.polynomial import polynomials_over
+
+    rnd = random.Random(seed)
+    poly = polynomials_over(GF(Subgroup.BLS12_381))
+    phis = [poly.random(f, rnd.randint(0, 1)) for _ in range(rounds)]
+    return phis, [[phi(i+1) for phi in phis] for i in range(n)]
+
+
+async def _make_preprocessed_coins(test_router, sid, n, f, seed, rounds=32):
+    from honeybadgermpc.broadcast.preprocessedcoin import preprocessed_coin
+
+    _, bits = _share_random_bits(n, f, seed, rounds)
+    sends, recvs, _ = test_router(n, seed=seed)
+    result = await gather(*[
+        preprocessed_coin(sid, i, n, f, bits[i], sends[i], recvs[i])
+        for i in range(n)])
+    return zip(*result)
+
+
+@mark.parametrize('make_coins', (_make_coins, _make_preprocessed_coins))
 @mark.parametrize('seed', (1, 2, 3, 4, 5))
 @mark.asyncio
-async def test_binaryagreement(seed, test_router):
+async def test_binaryagreement(seed, make_coins, test_router):
     n, f = 4, 1
     # Generate keys
     sid = 'sidA'
@@ -188,7 +215,7 @@ async def test_binaryagreement(seed, test_router):
 
     # Instantiate the common coin
     coins_seed = rnd.random()
-    coins, recv_tasks = await _make_coins(
+    coins, recv_tasks = await make_coins(
         test_router, sid+'COIN', n, f, coins_seed)
 
     # Router
@@ -287,3 +314,28 @@ def test_set_next_round_estimate_raises(values, s, already_decided):
             already_decided=already_decided,
             decide=None,
         )
+
+
+@mark.asyncio
+async def test_preprocessed_coin(test_router):
+    from honeybadgermpc.exceptions import CoinUnavailableError
+
+    from honeybadgermpc.broadcast.preprocessedcoin import preprocessed_coin
+
+    n, f, rounds = 4, 1, 3
+    phis, bits = _share_random_bits(n, f, 0, rounds)
+    expected = [phi(0).value for phi in phis]
+    assert set(expected) <= {0, 1}
+
+    sends, recvs, _ = test_router(n, seed=0)
+    coins, recv_tasks = zip(*await gather(*[
+        preprocessed_coin('sidA', i, n, f, bits[i], sends[i], recvs[i])
+        for i in range(n)]))
+
+    for r in range(rounds):
+        assert await gather(*[coin(r) for coin in coins]) == [expected[r]] * n
+    # Asking again gives the same coin without opening it again
+    assert await coins[0](0) == expected[0]
+    with raises(CoinUnavailableError):
+        await coins[0](rounds)
+    [task.cancel() for task in recv_tasks]
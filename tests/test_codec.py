@@ -0,0 +1,104 @@
+from pytest import mark, raises
+from honeybadgermpc.codec import (
+    PickleCodec, FieldElementCodec, get_codec, codec_name, CODECS)
+
+
+@mark.parametrize("msg", [
+    ("sid", ("R1", 3, [0, 1, 2**256 - 1])),
+    ("sid", ("R2", -1, [5])),
+])
+def test_field_element_codec_int_lists(msg):
+    codec = FieldElementCodec()
+    raw_msg = codec.encode(msg)
+    assert codec_name(raw_msg) == FieldElementCodec.name
+    assert codec.decode(raw_msg) == msg
+
+
+def test_field_element_codec_is_smaller_than_pickle(galois_field):
+    msg = ("sid", ("R1", 0, [galois_field.random().value for _ in range(100)]))
+    raw_msg = FieldElementCodec().encode(msg)
+    assert len(raw_msg) < len(PickleCodec().encode(msg))
+
+
+def test_field_element_codec_field_elements(galois_field):
+    codec = FieldElementCodec()
+    values = [galois_field.random() for _ in range(10)]
+    raw_msg = codec.encode(("sid", ("B", list(range(10)), values)))
+    assert codec_name(raw_msg) == FieldElementCodec.name
+
+    tag, (subtag, shareids, decoded) = codec.decode(raw_msg)
+    assert (tag, subtag, shareids) == ("sid", "B", list(range(10)))
+    assert decoded == values
+    assert all(v.field is galois_field for v in decoded)
+
+
+@mark.parametrize("msg", [
+    ("sid", ("S", 1, 5)),
+    ("sid", ("R1", 1, [])),
+    ("sid", ("R1", 1, [-1])),
+    ("sid", ("R1", 1, [2**256])),
+    ("sid", ("R1", "x", [1])),
+    ("sid", ("R1", 2**64, [1])),
+    ("sid", ("R1", 1, [1, None])),
+    (1, 2),
+    "hello",
+])
+def test_field_element_codec_falls_back_to_pickle(msg):
+    codec = FieldElementCodec()
+    raw_msg = codec.encode(msg)
+    assert codec_name(raw_msg) == PickleCodec.name
+    assert codec.decode(raw_msg) == msg
+
+
+@mark.parametrize("msg", [
+    ("sid", ("R1", 3, [0, 1, 2**256 - 1])),
+    ("sid", ("S", 1, 5)),
+])
+def test_codecs_decode_each_others_messages(msg):
+    codecs = [PickleCodec(), FieldElementCodec()]
+    for encoder in codecs:
+        raw_msg = encoder.encode(msg)
+        for decoder in codecs:
+            assert decoder.decode(raw_msg) == msg
+
+
+def test_decode_unknown_codec():
+    with raises(ValueError):
+        PickleCodec().decode(bytes([len(CODECS)]) + PickleCodec().encode(1))
+
+
+def test_get_codec():
+    assert isinstance(get_codec("pickle"), PickleCodec)
+    assert isinstance(get_codec("field_elements"), FieldElementCodec)
+
+
+def test_pack_frame():
+    from honeybadgermpc.codec import pack_frame, unpack_frame
+
+    raw_msgs = [b"", b"a", b"bc" * 100]
+    assert [bytes(m) for m in unpack_frame(pack_frame(raw_msgs))] == raw_msgs
+    assert list(unpack_frame(pack_frame([]))) == []
+
+
+def test_packed_elements_are_sent_without_conversion(galois_field):
+    from honeybadgermpc.codec import PackedElements
+
+    values = [galois_field.random().value for _ in range(10)]
+    packed = PackedElements.from_ints(values)
+    assert len(packed) == 10
+    assert list(packed) == values == packed
+    assert packed[3] == values[3] and packed[-1] == values[-1]
+    assert packed[2:5] == values[2:5]
+
+    codec = FieldElementCodec()
+    raw_msg = codec.encode(("sid", ("R1", 7, packed)))
+    assert codec_name(raw_msg) == FieldElementCodec.name
+    assert packed.buffer in raw_msg
+
+    tag, (subtag, shareid, decoded) = codec.decode(raw_msg)
+    assert (tag, subtag, shareid) == ("sid", "R1", 7)
+    assert type(decoded) is PackedElements and type(decoded.buffer) is memoryview
+    assert decoded == values
+
+    # Pickling is still supported, e.g. through the fallback codec
+    assert PickleCodec().decode(PickleCodec().encode(decoded)) == values
@@ -1,7 +1,8 @@
 import random
 import asyncio
 from pytest import mark
-from honeybadgermpc.broadcast.commoncoin import shared_coin
+from honeybadgermpc.broadcast.commoncoin import (
+    shared_coin, CoinSignatureVerifier, find_invalid_shares)
 from honeybadgermpc.broadcast.crypto.boldyreva import dealer
 
 
@@ -101,3 +102,54 @@ async def test_when_redundant_signature_share_is_received():
         assert len(set(await asyncio.gather(*[c(i) for c in coins]))) == 1
     for task in recv_tasks:
         task.cancel()
+
+
+@mark.asyncio
+async def test_when_signature_shares_are_invalid(test_router):
+    n, f = 4, 1
+    pk, sks = dealer(n, f+1)
+    sid = 'sidA'
+    _, recvs, sends = test_router(n)
+    verifier = CoinSignatureVerifier(pk)
+    # Node 3 signs with the key of node 0, so all of its shares are invalid
+    keys = sks[:3] + [sks[0]]
+    result = await asyncio.gather(*[
+        shared_coin(sid, i, n, f, pk, keys[i], sends[i], recvs[i], verifier)
+        for i in range(n)])
+    coins, recv_tasks = zip(*result)
+
+    for i in range(10):
+        assert len(set(await asyncio.gather(*[c(i) for c in coins]))) == 1
+    for task in recv_tasks:
+        task.cancel()
+
+
+def test_coin_signature_verifier():
+    pk, sks = dealer(4, 2)
+    hs = [pk.hash_message(str(('sidA', r))) for r in range(3)]
+    sigs = [pk.combine_shares({0: sks[0].sign(h), 1: sks[1].sign(h)}) for h in hs]
+    assert pk.verify_signatures(list(zip(sigs, hs)))
+
+    async def verify_all(sigs):
+        verifier = CoinSignatureVerifier(pk)
+        return await asyncio.gather(
+            *[verifier.verify(sig, h) for sig, h in zip(sigs, hs)])
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(verify_all(sigs)) == [True]*3
+        bad_sigs = [sigs[0], sigs[0], sigs[2]]
+        assert loop.run_until_complete(verify_all(bad_sigs)) == [True, False, True]
+    finally:
+        loop.close()
+
+
+@mark.parametrize('bad', ([], [0], [5], [1, 2, 6], list(range(7))))
+def test_find_invalid_shares(bad):
+    pk, sks = dealer(4, 2)
+    hs = [pk.hash_message(str(('sidA', r))) for r in range(7)]
+    shares = [(sks[r % 4].sign(h), r % 4, h) for r, h in enumerate(hs)]
+    for k in bad:
+        sig, i, h = shares[k]
+        shares[k] = (sig, (i + 1) % 4, h)
+    assert find_invalid_shares(pk, shares) == bad
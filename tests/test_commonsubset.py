@@ -103,3 +103,29 @@ async def test_commonsubset(test_router):
         for task in recv_task_list:
             task.cancel()
     assert len(set(outs)) == 1
+
+
+@mark.parametrize('with_keys', (True, False))
+@mark.asyncio
+async def test_run_common_subset_with_coin_bits(test_router, with_keys):
+    from honeybadgermpc.broadcast.commonsubset import run_common_subset
+    from honeybadgermpc.elliptic_curve import Subgroup
+    from honeybadgermpc.field import GF
+    from honeybadgermpc.polynomial import polynomials_over
+
+    n, f = 4, 1
+    rnd = random.Random(0)
+    # Without keys, every coin has enough bits for the agreements to terminate
+    rounds = 1 if with_keys else 32
+    pk, sks = dealer(n, f+1, seed=0) if with_keys else (None, [None] * n)
+
+    poly = polynomials_over(GF(Subgroup.BLS12_381))
+    phis = [[poly.random(f, rnd.randint(0, 1)) for _ in range(rounds)]
+            for _ in range(n)]
+    sends, recvs, _ = test_router(n, seed=0)
+    outs = await asyncio.gather(*[run_common_subset(
+        'sidA', pk, sks[i], n, f, i, sends[i], recvs[i], f'<[ACS Input {i}]>',
+        coin_bits=[[phi(i+1) for phi in coin_phis] for coin_phis in phis])
+        for i in range(n)])
+    assert len(set(outs)) == 1
+    assert sum(out is not None for out in outs[0]) >= n - f
@@ -53,3 +53,55 @@ def test_singleton_pattern():
     assert gf_2.modulus == 19
     assert gf_1 is GF(19)
     assert GF(19).modulus == 19
+
+
+def test_element_has_no_dict(galois_field):
+    import pickle
+
+    x = galois_field(5)
+    assert not hasattr(x, "__dict__")
+    y = pickle.loads(pickle.dumps(x))
+    assert y == x and y.field is galois_field
+
+
+def test_gf_vector(galois_field):
+    from honeybadgermpc.field import GFVector
+
+    p = galois_field.modulus
+    xs = [galois_field.random() for _ in range(20)]
+    ys = [galois_field.random() for _ in range(20)]
+    a, b = galois_field.vector(xs), galois_field.vector(ys)
+    assert isinstance(a, GFVector) and len(a) == 20
+    assert list(a) == xs and a[3] == xs[3] and list(a[2:5]) == xs[2:5]
+
+    assert list(a + b) == [x + y for x, y in zip(xs, ys)]
+    assert list(a - b) == [x - y for x, y in zip(xs, ys)]
+    assert list(a * b) == [x * y for x, y in zip(xs, ys)]
+    assert list(-a) == [-x for x in xs]
+    assert list(a + 3) == list(3 + a) == [x + 3 for x in xs]
+    assert list(1 - a) == [1 - x for x in xs]
+    assert list(a * xs[0]) == list(a.scale(xs[0])) == [x * xs[0] for x in xs]
+    assert list(a.inverse()) == list(~a) == [1 / x for x in xs]
+    assert a.dot(b) == sum((x * y for x, y in zip(xs, ys)), galois_field(0))
+    assert galois_field.vector([p + 1, -1]).values == [1, p - 1]
+
+    with raises(ZeroDivisionError):
+        galois_field.vector([1, 0]).inverse()
+    with raises(ValueError):
+        a + galois_field.vector(ys[:5])
+    with raises(FieldsNotIdentical):
+        a + GF(17).vector([1] * 20)
+
+
+def test_batch_invert(galois_field):
+    from honeybadgermpc.field import batch_invert
+
+    xs = [galois_field.random() for _ in range(50)]
+    assert batch_invert(xs) == [1 / x for x in xs]
+    assert batch_invert(xs[:1]) == [1 / xs[0]]
+    assert batch_invert([]) == []
+
+    with raises(ZeroDivisionError):
+        batch_invert([xs[0], galois_field(0), xs[1]])
+    with raises(FieldsNotIdentical):
+        batch_invert([GF(17)(3), GF(7)(2)])
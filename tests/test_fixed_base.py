@@ -0,0 +1,20 @@
+from pickle import dumps, loads
+
+
+def test_preprocessed_tables_are_shared():
+    from honeybadgermpc.betterpairing import ZR, G1, G2
+    from honeybadgermpc.fixed_base import preprocessed, clear_tables
+
+    g1, g2 = G1.rand(), G2.rand()
+    x = ZR.random()
+
+    pre_g1 = preprocessed(g1, 3)
+    assert preprocessed(loads(dumps(g1)), 3) is pre_g1
+    assert preprocessed(g1, 4) is not pre_g1
+    assert pre_g1 ** x == g1 ** x
+    pre_g2 = preprocessed(g2)
+    assert pre_g2 ** x == g2 ** x
+
+    clear_tables()
+    assert preprocessed(g1, 3) is not pre_g1
+    assert preprocessed(g1, 3) ** x == g1 ** x
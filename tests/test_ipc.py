@@ -0,0 +1,84 @@
+from pytest import mark
+from honeybadgermpc.ipc import NodeCommunicator
+from honeybadgermpc.config import CoalescingConfig, NodeDetails
+from honeybadgermpc.codec import unpack_frame
+import asyncio
+
+
+async def _send_messages(coalescing, msgs):
+    peers = [NodeDetails("localhost", 7000 + i) for i in range(2)]
+    node_communicator = NodeCommunicator(peers, 0, 0, coalescing=coalescing)
+
+    frames = []
+
+    async def _send_to_node(parts):
+        frames.extend(parts)
+
+    queue = asyncio.Queue()
+    for msg in msgs:
+        queue.put_nowait(msg)
+    queue.put_nowait(NodeCommunicator.LAST_MSG)
+
+    await node_communicator._process_node_messages(1, queue, _send_to_node)
+    node_communicator.zmq_context.destroy()
+
+    received = [node_communicator.codec.decode(raw_msg)
+                for frame in frames for raw_msg in unpack_frame(frame)]
+    assert received == msgs
+    assert node_communicator.frames_sent == len(frames)
+    assert node_communicator.bytes_sent == sum(map(len, frames))
+    return frames
+
+
+@mark.asyncio
+async def test_queued_messages_are_coalesced():
+    msgs = [("sid", ("R1", i, [i, i + 1])) for i in range(10)] + [("sid", "other")]
+    frames = await _send_messages(CoalescingConfig.default(), msgs)
+    assert len(frames) == 1
+
+
+@mark.asyncio
+async def test_coalescing_respects_max_bytes():
+    msgs = [("sid", ("R1", i, [i, i + 1])) for i in range(10)]
+    frames = await _send_messages(CoalescingConfig(max_bytes=1, max_delay=0), msgs)
+    assert len(frames) == len(msgs)
+
+
+@mark.asyncio
+async def test_coalescing_waits_for_max_delay():
+    peers = [NodeDetails("localhost", 7000 + i) for i in range(2)]
+    node_communicator = NodeCommunicator(
+        peers, 0, 0, coalescing=CoalescingConfig(max_bytes=1024, max_delay=0.05))
+
+    frames = []
+
+    async def _send_to_node(parts):
+        frames.extend(parts)
+
+    queue = asyncio.Queue()
+    task = asyncio.create_task(
+        node_communicator._process_node_messages(1, queue, _send_to_node))
+    for i in range(3):
+        queue.put_nowait(("sid", ("R1", i, [i])))
+        await asyncio.sleep(0.001)
+    queue.put_nowait(NodeCommunicator.LAST_MSG)
+    await task
+    node_communicator.zmq_context.destroy()
+
+    assert len(frames) == 1
+    assert len(list(unpack_frame(frames[0]))) == 3
+
+
+def test_node_details_from_config():
+    tcp_node = NodeDetails.from_config("10.0.0.1:7000")
+    assert (tcp_node.ip, tcp_node.port, tcp_node.transport) == \
+        ("10.0.0.1", 7000, NodeDetails.TCP)
+    assert tcp_node.connect_endpoint() == "tcp://10.0.0.1:7000"
+    assert tcp_node.bind_endpoints() == ["tcp://*:7000"]
+
+    ipc_node = NodeDetails.from_config("ipc://localhost:7001")
+    assert (ipc_node.ip, ipc_node.port, ipc_node.transport) == \
+        ("localhost", 7001, NodeDetails.IPC)
+    assert ipc_node.connect_endpoint().startswith("ipc://")
+    assert ipc_node.connect_endpoint().endswith("hbmpc-7001.ipc")
+    assert ipc_node.bind_endpoints() == ["tcp://*:7001", ipc_node.connect_endpoint()]
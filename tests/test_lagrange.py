@@ -0,0 +1,45 @@
+from random import randint
+
+
+def test_lagrange_coefficients(galois_field, polynomial):
+    from honeybadgermpc.lagrange import LagrangeCache
+
+    cache = LagrangeCache()
+    poly = polynomial.random(3)
+    xs = [5, 1, 7, 3]
+    x = randint(0, 100)
+
+    weights = cache.coefficients(galois_field, xs, x)
+    assert sorted(weights) == sorted(xs)
+    assert sum(weights[x_i] * poly(x_i) for x_i in xs) == poly(x)
+
+    # The same set of points in any order, as ints or field elements, hits
+    assert cache.coefficients(
+        galois_field, [galois_field(x_i) for x_i in reversed(xs)], x) is weights
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_lagrange_cache_is_bounded(galois_field):
+    from honeybadgermpc.lagrange import LagrangeCache
+
+    cache = LagrangeCache(max_size=8)
+    for x in range(4):
+        cache.coefficients(galois_field, [1, 2, 3], x)
+
+    # Each entry holds 3 weights, so only the last two fit
+    assert len(cache) == 2
+    assert cache.size == 6
+    assert cache.evictions == 2
+
+    cache.coefficients(galois_field, [1, 2, 3], 3)
+    assert cache.hits == 1
+    cache.coefficients(galois_field, [1, 2, 3], 0)
+    assert cache.misses == 5
+
+    # Entries larger than the cache are returned but not stored
+    cache.coefficients(galois_field, range(1, 10), 0)
+    assert cache.size <= cache.max_size
+
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["hits"] == 0
@@ -28,6 +28,43 @@ async def test_open_shares(test_preprocessing):
     assert all(secret == 0 for secrets in results for secret in secrets)
 
 
+@mark.asyncio
+@mark.parametrize("batch_opens", [True, False])
+async def test_open_concurrent_shares(test_preprocessing, batch_opens):
+    from honeybadgermpc.config import ConfigVars, ReconstructionConfig
+
+    n, t = 4, 1
+    number_of_secrets = 100
+    test_preprocessing.generate("rands", n, t)
+
+    async def _prog(context):
+        sent = []
+        send = context.send
+
+        def _send(dest, o):
+            sent.append(o)
+            send(dest, o)
+
+        context.send = _send
+        shares = [test_preprocessing.elements.get_rand(context)
+                  for _ in range(number_of_secrets)]
+        secrets = await asyncio.gather(*[
+            *[share.open() for share in shares], (2 * shares[0]).open()])
+        assert secrets[-1] == 2 * secrets[0]
+
+        expected_messages = 1 if batch_opens else number_of_secrets + 1
+        assert len(sent) == n * expected_messages
+        return secrets
+
+    config = ReconstructionConfig.default()
+    config.batch_opens = batch_opens
+    program_runner = TaskProgramRunner(n, t, {ConfigVars.Reconstruction: config})
+    program_runner.add(_prog)
+    results = await program_runner.join()
+    assert len(results) == n
+    assert all(secrets == results[0] for secrets in results)
+
+
 @mark.asyncio
 async def test_open_future_shares(test_preprocessing):
     n, t = 3, 1
@@ -55,3 +92,69 @@ async def test_open_future_shares(test_preprocessing):
         MixinConstants.MultiplyShare: BeaverMultiply()})
     program_runner.add(_prog)
     await program_runner.join()
+
+
+@mark.asyncio
+async def test_batched_open_induces_faults_per_peer(test_preprocessing, monkeypatch):
+    from pytest import raises
+    from honeybadgermpc.config import ConfigVars, ReconstructionConfig
+    from honeybadgermpc.exceptions import HoneyBadgerMPCError
+
+    n, t = 4, 1
+    test_preprocessing.generate("rands", n, t)
+
+    async def _failed_reconstruct(*args, **kwargs):
+        return None, None
+
+    # Only the shares sent matter here, decoding them all fails anyway
+    monkeypatch.setattr(
+        "honeybadgermpc.mpc.batch_robust_reconstruct", _failed_reconstruct)
+
+    async def _prog(context):
+        sent = []
+        send = context.send
+
+        def _send(dest, o):
+            sent.append(o)
+            send(dest, o)
+
+        context.send = _send
+        share = test_preprocessing.elements.get_rand(context)
+        with raises(HoneyBadgerMPCError):
+            await share.open()
+
+        # Every peer gets its own random value
+        values = [values[0] for (_, _, values) in sent]
+        assert len(set(values)) == n
+        assert share.v not in values
+
+    config = ReconstructionConfig.default()
+    config.induce_faults = True
+    program_runner = TaskProgramRunner(n, t, {ConfigVars.Reconstruction: config})
+    program_runner.add(_prog)
+    await program_runner.join()
+
+
+@mark.asyncio
+async def test_batched_open_reconstruction_error(test_preprocessing, monkeypatch):
+    from pytest import raises
+
+    n, t = 4, 1
+    test_preprocessing.generate("rands", n, t)
+
+    async def _failing_reconstruct(*args, **kwargs):
+        raise ValueError("reconstruction failed")
+
+    monkeypatch.setattr(
+        "honeybadgermpc.mpc.batch_robust_reconstruct", _failing_reconstruct)
+
+    async def _prog(context):
+        shares = [test_preprocessing.elements.get_rand(context) for _ in range(2)]
+        # The error reaches every open of the batch instead of hanging them
+        for share_open in [share.open() for share in shares]:
+            with raises(ValueError, match="reconstruction failed"):
+                await share_open
+
+    program_runner = TaskProgramRunner(n, t)
+    program_runner.add(_prog)
+    await program_runner.join()
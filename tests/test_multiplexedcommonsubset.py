@@ -0,0 +1,40 @@
+import asyncio
+from pytest import mark
+from honeybadgermpc.broadcast.crypto.boldyreva import dealer
+from honeybadgermpc.broadcast.multiplexedcommonsubset import (
+    run_multiplexed_common_subset)
+
+
+@mark.parametrize("n, f", ((4, 1), (7, 2)))
+@mark.asyncio
+async def test_multiplexed_common_subset(test_router, n, f):
+    pk, sks = dealer(n, f+1)
+    sends, recvs, _ = test_router(n)
+
+    outs = await asyncio.gather(*[
+        run_multiplexed_common_subset(
+            'sidA', pk, sks[i], n, f, i, sends[i], recvs[i], f'<[ACS Input {i}]>')
+        for i in range(n)])
+
+    assert len(set(outs)) == 1
+    assert sum(out is not None for out in outs[0]) >= n - f
+    for i, out in enumerate(outs[0]):
+        assert out is None or out == f'<[ACS Input {i}]>'.encode()
+
+
+@mark.asyncio
+async def test_multiplexed_common_subset_with_faults(test_router):
+    n, f = 4, 1
+    pk, sks = dealer(n, f+1)
+    sends, recvs, _ = test_router(n)
+
+    # Node 3 signs its coin shares with the key of node 0, and node 2 crashed
+    keys = sks[:3] + [sks[0]]
+    outs = await asyncio.gather(*[
+        run_multiplexed_common_subset(
+            'sidA', pk, keys[i], n, f, i, sends[i], recvs[i], f'<[ACS Input {i}]>')
+        for i in (0, 1, 3)])
+
+    assert len(set(outs)) == 1
+    assert outs[0][2] is None
+    assert sum(out is not None for out in outs[0]) == n - f
@@ -33,3 +33,22 @@ def test_pc_const_preprocess():
     pc.preprocess_verifier()
     assert(pc.verify_eval(c, 3, phi(3), phi_hat(3), witness))
     assert(not pc.verify_eval(c, 4, phi(3), phi_hat(3), witness))
+
+
+def test_pc_const_batch_verify_evals():
+    t = 2
+    crs = gen_pc_const_crs(t)
+    pc = PolyCommitConst(crs)
+    pc.preprocess_verifier()
+    evals = []
+    for i in range(1, 5):
+        phi = polynomials_over(ZR).random(t)
+        c, phi_hat = pc.commit(phi)
+        witness = pc.create_witness(phi, phi_hat, i)
+        evals.append((c, i, phi(i), phi_hat(i), witness))
+    assert pc.batch_verify_evals(evals)
+    assert pc.batch_verify_evals([])
+    c, i, share, aux, witness = evals[2]
+    evals[2] = (c, i, share + 1, aux, witness)
+    assert not pc.batch_verify_evals(evals)
+    assert pc.batch_verify_evals(evals[:2] + evals[3:])
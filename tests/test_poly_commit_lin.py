@@ -12,3 +12,29 @@ def test_poly_commit():
     i = randint(0, degree-1)
     witness = poly_commit.create_witness(aux, i)
     assert poly_commit.verify_eval(cs, i, phi(i), witness)
+
+
+def test_batch_verify_evals():
+    poly_commit = PolyCommitLin([G1.rand(), G1.rand()])
+    evals = []
+    for i in range(1, 5):
+        phi = polynomials_over(ZR).random(3)
+        cs, aux = poly_commit.commit(phi)
+        evals.append((cs, i, phi(i), poly_commit.create_witness(aux, i)))
+    assert poly_commit.batch_verify_evals(evals)
+    cs, i, share, witness = evals[1]
+    evals[1] = (cs, i + 1, share, witness)
+    assert not poly_commit.batch_verify_evals(evals)
+    assert poly_commit.batch_verify_evals(evals[:1] + evals[2:])
+
+
+def test_batch_verify_eval_same_index():
+    poly_commit = PolyCommitLin([G1.rand(), G1.rand()])
+    phis = [polynomials_over(ZR).random(4) for _ in range(6)]
+    commits, auxs = zip(*[poly_commit.commit(phi) for phi in phis])
+    shares = [phi(2) for phi in phis]
+    witnesses = [poly_commit.create_witness(aux, 2) for aux in auxs]
+    assert poly_commit.batch_verify_eval(commits, 2, shares, witnesses)
+    assert not poly_commit.verify_eval(commits[0], 2, shares[0] + 1, witnesses[0])
+    shares[4] += 1
+    assert not poly_commit.batch_verify_eval(commits, 2, shares, witnesses)
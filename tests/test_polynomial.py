@@ -140,3 +140,46 @@ def test_rust_poly_interpolate_at_random(rust_field, rust_polynomial):
     values = [(i, random_poly(i)) for i in range(t+1)]
     k = rust_field.random()
     assert rust_polynomial.interpolate_at(values, k) == random_poly(k)
+
+
+def test_poly_interpolate(galois_field, polynomial):
+    poly = polynomial.random(4)
+    shares = [(x, poly(x)) for x in range(1, 6)]
+    assert polynomial.interpolate(shares).coeffs == poly.coeffs
+    # The Lagrange basis is cached
+    assert polynomial.lagrange_basis(range(1, 6)) is \
+        polynomial.lagrange_basis(range(1, 6))
+
+
+def test_vectorized_polynomial(galois_field, polynomial):
+    from honeybadgermpc.polynomial import vectorized_polynomials_over
+
+    vpoly = vectorized_polynomials_over(galois_field)
+    a, b = polynomial.random(20), polynomial.random(7)
+    va, vb = vpoly(a.coeffs), vpoly(b.coeffs)
+
+    assert (va * vb).coeffs == (a * b).coeffs
+    assert (va + vb).coeffs == (a + b).coeffs
+    assert (va - b).coeffs == (a - b).coeffs
+    quotient, remainder = divmod(va, vb)
+    assert (quotient * vb + remainder).coeffs == a.coeffs
+    assert remainder.degree() < vb.degree()
+    assert (va / vb).coeffs == quotient.coeffs
+
+    xs = list(range(1, 11))
+    assert va.evaluate_many(xs) == [a(x) for x in xs]
+    assert va(galois_field(5)) == a(5)
+
+    shares = [(x, a(x)) for x in range(1, 22)]
+    assert vpoly.interpolate(shares).coeffs == a.coeffs
+    assert vpoly.interpolate_at(shares, 0) == a(0)
+    assert vpoly([0, 0]).is_zero()
+
+
+def test_evaluate_many(galois_field, polynomial):
+    polys = [polynomial.random(randint(0, 10)) for _ in range(5)] + [polynomial([])]
+    xs = [galois_field(x) for x in range(1, 8)]
+    assert polys[0].evaluate_many(xs) == [polys[0](x) for x in xs]
+    assert polynomial.evaluate_batch(polys, range(1, 8)) == \
+        [[poly(x) for x in xs] for poly in polys]
+    assert polynomial.evaluate_batch([], xs) == []
@@ -0,0 +1,61 @@
+from asyncio import gather
+
+from pytest import mark, raises
+
+from honeybadgermpc.broadcast.preprocessedcoin import (
+    preprocessed_coin, reserve_coin_bits)
+from honeybadgermpc.exceptions import CoinUnavailableError
+from honeybadgermpc.mpc import TaskProgramRunner
+
+
+async def _make_coins(test_router, n, f, bits, fallback=None):
+    sends, recvs, _ = test_router(n, seed=0)
+    return zip(*await gather(*[
+        preprocessed_coin('sidA', i, n, f, bits[i], sends[i], recvs[i], fallback)
+        for i in range(n)]))
+
+
+@mark.asyncio
+async def test_reserve_coin_bits(test_preprocessing, test_router):
+    n, t, rounds = 4, 1, 3
+    test_preprocessing.generate("bits", n, t)
+
+    async def _prog(ctx):
+        coin_bits = reserve_coin_bits(test_preprocessing.elements, ctx, n, rounds)
+        assert len(coin_bits) == n
+        assert all(len(bits) == rounds for bits in coin_bits)
+        opened = await ctx.ShareArray(sum(coin_bits, [])).open()
+        return coin_bits, [value.value for value in opened]
+
+    program_runner = TaskProgramRunner(n, t)
+    program_runner.add(_prog)
+    coin_bits, opened = zip(*await program_runner.join())
+    assert set(opened[0]) <= {0, 1}
+
+    # The j-th coin of every party opens the j-th bits reserved by the parties
+    for j in range(n):
+        coins, recv_tasks = await _make_coins(
+            test_router, n, t, [bits[j] for bits in coin_bits])
+        for r in range(rounds):
+            assert await gather(*[coin(r) for coin in coins]) == \
+                [opened[0][j * rounds + r]] * n
+        [task.cancel() for task in recv_tasks]
+
+
+@mark.asyncio
+async def test_preprocessed_coin_fallback(test_router):
+    n, f = 4, 1
+    fallback_rounds = []
+
+    async def fallback(round):
+        fallback_rounds.append(round)
+        return 1
+
+    coins, recv_tasks = await _make_coins(test_router, n, f, [[]] * n, fallback)
+    assert await gather(*[coin(2) for coin in coins]) == [1] * n
+    assert fallback_rounds == [2] * n
+
+    coins, more_recv_tasks = await _make_coins(test_router, n, f, [[]] * n)
+    with raises(CoinUnavailableError):
+        await coins[0](0)
+    [task.cancel() for task in recv_tasks + more_recv_tasks]
@@ -1,4 +1,4 @@
-from pytest import mark
+from pytest import mark, raises
 from honeybadgermpc.mpc import TaskProgramRunner
 import asyncio
 
@@ -156,3 +156,180 @@ async def test_get_share_bits(test_preprocessing):
     program_runner = TaskProgramRunner(n, t)
     program_runner.add(_prog)
     await program_runner.join()
+
+
+def test_convert_text_share_file(tmp_path, galois_field):
+    from honeybadgermpc.preprocessing import (
+        ShareFile, PreProcessingConstants, convert_text_share_file)
+
+    values = [galois_field.random().value for _ in range(10)]
+    file_name = str(tmp_path / "rands_4_1-2.share")
+    with open(file_name, "w") as f:
+        print(galois_field.modulus, 1, 2, *values, sep="\n", file=f)
+
+    assert convert_text_share_file(file_name) == len(values)
+
+    share_file = ShareFile(file_name)
+    assert share_file.modulus == galois_field.modulus
+    assert (share_file.degree, share_file.myid) == (1, 2)
+    assert len(share_file) == len(values)
+    assert list(share_file) == values
+    assert share_file[3] == values[3]
+    assert share_file[-1] == values[-1]
+    assert share_file[2:5] == values[2:5]
+
+    header_size = PreProcessingConstants.SHARE_FILE_HEADER.size
+    element_size = PreProcessingConstants.ELEMENT_SIZE
+    assert (tmp_path / "rands_4_1-2.share").stat().st_size == \
+        header_size + len(values) * element_size
+
+
+_RESERVE_RANDS = """
+import asyncio, json, sys
+from honeybadgermpc.mpc import TaskProgramRunner
+from honeybadgermpc.preprocessing import PreProcessedElements
+
+async def prog(ctx):
+    shares = PreProcessedElements().reserve_rands(ctx, int(sys.argv[1]))
+    return [share.v.value for share in shares]
+
+runner = TaskProgramRunner(6, 1)
+runner.add(prog)
+print(json.dumps(asyncio.get_event_loop().run_until_complete(runner.join())[0]))
+"""
+
+
+def test_reservations_survive_restarts():
+    import json
+    import subprocess
+    import sys
+    from honeybadgermpc.preprocessing import (
+        PreProcessedElements, PreProcessingConstants, ShareCursor, ShareFile)
+
+    def reserve_rands_in_new_process(k):
+        """Reserves k rands in a new node process, returns the shares of node 0"""
+        result = subprocess.run([sys.executable, "-c", _RESERVE_RANDS, str(k)],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        assert result.returncode == 0, result.stderr.decode()
+        return json.loads(result.stdout.decode().splitlines()[-1])
+
+    n, t, k = 6, 1, 2 * ShareCursor.BLOCK_SIZE + 10
+    PreProcessedElements().generate_rands(k, n, t)
+    shares = ShareFile(
+        f"{PreProcessingConstants.RANDS_FILE_NAME_PREFIX}_{n}_{t}-0.share")
+
+    assert reserve_rands_in_new_process(3) == shares[0:3]
+    # A restarted node skips whatever was reserved in the journal, but no more
+    block = ShareCursor.BLOCK_SIZE
+    assert reserve_rands_in_new_process(block) == shares[block:2 * block]
+    # The journal never goes past the end of the file, which the restarted node
+    # has then consumed
+    assert reserve_rands_in_new_process(3) == shares[2 * block:2 * block + 3]
+    with raises(AssertionError, match="preprocess underrun"):
+        reserve_rands_in_new_process(1)
+    shares.close()
+
+
+@mark.asyncio
+async def test_reserve_after_regenerating():
+    from honeybadgermpc.preprocessing import (
+        PreProcessedElements, PreProcessingConstants, ShareFile)
+
+    # Own files, the shared ones are generated once per session
+    n, t = 5, 1
+    elements = PreProcessedElements()
+
+    async def _prog(ctx):
+        return [share.v.value for share in elements.reserve_rands(ctx, 2)]
+
+    async def reserve_rands():
+        program_runner = TaskProgramRunner(n, t)
+        program_runner.add(_prog)
+        return (await program_runner.join())[0]
+
+    elements.generate_rands(10, n, t)
+    old_shares = await reserve_rands()
+    elements.generate_rands(10, n, t)
+    shares = ShareFile(
+        f"{PreProcessingConstants.RANDS_FILE_NAME_PREFIX}_{n}_{t}-0.share")
+
+    # The new file is consumed from its start, not from the stale cached file
+    assert await reserve_rands() == shares[0:2] != old_shares
+    shares.close()
+
+
+@mark.asyncio
+async def test_reserve_triples(test_preprocessing):
+    n, t = 4, 1
+    test_preprocessing.generate("triples", n, t)
+
+    async def _prog(ctx):
+        triples = test_preprocessing.elements.reserve_triples(ctx, 3)
+        assert len(triples) == 3
+        for a_sh, b_sh, ab_sh in triples:
+            a, b, ab = await a_sh.open(), await b_sh.open(), await ab_sh.open()
+            assert a*b == ab
+
+    program_runner = TaskProgramRunner(n, t)
+    program_runner.add(_prog)
+    await program_runner.join()
+
+
+@mark.asyncio
+async def test_get_triples(test_preprocessing):
+    n, t = 4, 1
+    num_triples = 10
+    test_preprocessing.generate("triples", n, t)
+
+    async def _prog(ctx):
+        a_sh, b_sh, ab_sh = test_preprocessing.elements.get_triples(ctx, num_triples)
+        assert len(a_sh) == len(b_sh) == len(ab_sh) == num_triples
+        a, b, ab = await a_sh.open(), await b_sh.open(), await ab_sh.open()
+        for a_, b_, ab_ in zip(a, b, ab):
+            assert a_*b_ == ab_
+
+    program_runner = TaskProgramRunner(n, t)
+    program_runner.add(_prog)
+    await program_runner.join()
+
+
+@mark.asyncio
+async def test_get_rands_and_bits(test_preprocessing):
+    n, t = 4, 1
+    k = 20
+    test_preprocessing.generate("rands", n, t)
+    test_preprocessing.generate("bits", n, t)
+
+    async def _prog(ctx):
+        rands = test_preprocessing.elements.get_rands(ctx, k)
+        assert len(rands) == k and rands.t == ctx.t
+        assert len(set(await rands.open())) == k
+
+        bits = await test_preprocessing.elements.get_bits(ctx, k).open()
+        assert len(bits) == k
+        for b in bits:
+            assert b == 0 or b == 1
+
+    program_runner = TaskProgramRunner(n, t)
+    program_runner.add(_prog)
+    await program_runner.join()
+
+
+@mark.asyncio
+async def test_generate_triples_with_process_pool():
+    from honeybadgermpc.preprocessing import PreProcessedElements
+
+    n, t = 4, 1
+    k = 10
+    pp_elements = PreProcessedElements(num_processes=2, chunk_size=3)
+    pp_elements.generate_triples(k, n, t)
+
+    async def _prog(ctx):
+        a_sh, b_sh, ab_sh = pp_elements.get_triples(ctx, k)
+        a, b, ab = await a_sh.open(), await b_sh.open(), await ab_sh.open()
+        for a_, b_, ab_ in zip(a, b, ab):
+            assert a_*b_ == ab_
+
+    program_runner = TaskProgramRunner(n, t)
+    program_runner.add(_prog)
+    await program_runner.join()
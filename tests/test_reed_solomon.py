@@ -252,3 +252,38 @@ def test_decoder_selection(mocked_cpu_count, galois_field):
                 else:
                     assert isinstance(DecoderSelector.select(point, batch_size),
                                       FFTDecoder)
+
+
+def test_coder_cache(galois_field):
+    from honeybadgermpc.reed_solomon import coder_cache, RobustDecoderFactory
+
+    coder_cache.clear()
+    point = EvalPoint(galois_field, 4)
+    enc = EncoderFactory.get(point)
+    dec = DecoderFactory.get(point)
+    assert coder_cache.stats() == {"hits": 0, "misses": 2, "size": 2}
+
+    assert EncoderFactory.get(EvalPoint(galois_field, 4)) is enc
+    assert DecoderFactory.get(EvalPoint(galois_field, 4)) is dec
+    assert EncoderFactory.get(EvalPoint(galois_field, 5)) is not enc
+    assert RobustDecoderFactory.get(1, point) is RobustDecoderFactory.get(1, point)
+    assert (coder_cache.hits, coder_cache.misses) == (3, 4)
+
+    encoded = enc.encode([[1, 2], [2, 3]])
+    for z in [[0, 2], [3, 1], [0, 2]]:
+        data = [[e[i] for i in z] for e in encoded]
+        assert dec.decode(z, data) == [[1, 2], [2, 3]]
+    assert (coder_cache.hits, coder_cache.misses) == (4, 6)
+
+
+def test_coder_cache_evicts_least_recently_used():
+    from honeybadgermpc.reed_solomon import CoderCache
+
+    cache = CoderCache(max_size=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: 3)
+    cache.get("c", lambda: 4)
+    assert len(cache) == 2
+    assert cache.get("a", lambda: 5) == 1
+    assert cache.get("b", lambda: 6) == 6
@@ -0,0 +1,74 @@
+from asyncio import create_task, gather
+from os import urandom
+from random import Random
+
+from pytest import mark
+
+from honeybadgermpc.broadcast.reliablebroadcast import (
+    encode, decode, decode_verified, merkle_tree, get_merkle_branch, merkle_verify,
+    IncrementalMerkleVerifier, reliablebroadcast)
+
+
+@mark.parametrize('n,f', ((1, 0), (4, 1), (7, 2), (10, 3)))
+def test_decode_verified(n, f):
+    k = n - 2*f
+    m = urandom(1000)
+    stripes = encode(k, n, m)
+    mt = merkle_tree(stripes)
+    received = [None] * n
+    for i in Random(n).sample(range(n), k):
+        received[i] = stripes[i]
+
+    assert decode(k, n, received) == m
+    assert decode_verified(k, n, received, mt[1]) == m
+
+    # The leader committed to stripes which are not a codeword
+    if k < n:
+        missing = received.index(None)
+        bad_stripes = list(stripes)
+        bad_stripes[missing] = urandom(len(stripes[missing]))
+        assert decode_verified(k, n, received, merkle_tree(bad_stripes)[1]) is None
+
+
+def test_incremental_merkle_verifier():
+    n = 7
+    stripes = encode(3, n, b"hello world")
+    mt = merkle_tree(stripes)
+    verifier = IncrementalMerkleVerifier(n, mt[1])
+
+    for i in (5, 0, 3):
+        branch = get_merkle_branch(i, mt)
+        assert merkle_verify(n, stripes[i], mt[1], branch, i)
+        assert not verifier.verify(stripes[i] + b"x", branch, i)
+        assert not verifier.verify(stripes[i], branch, (i + 1) % n)
+        assert verifier.verify(stripes[i], branch, i)
+
+    # The branches also prove the leaves of the siblings, here 1, 2 and 4
+    leaf_hashes = verifier.leaf_hashes()
+    assert leaf_hashes == mt[len(mt) // 2:len(mt) // 2 + 6] + [None]
+
+    received = [stripes[i] if i in (5, 0, 3) else None for i in range(n)]
+    assert decode_verified(3, n, received, mt[1], leaf_hashes) == b"hello world"
+
+
+@mark.asyncio
+async def test_reliablebroadcast_invalid_echo(test_router):
+    n, f, leader, byznode = 4, 1, 0, 3
+    sends, recvs, _ = test_router(n, seed=0)
+    m = urandom(4096)
+
+    def byz_send(j, o):
+        if o[1] == 'ECHO':
+            sid, tag, roothash, branch, stripe = o
+            o = (sid, tag, roothash, branch, urandom(len(stripe)))
+        sends[byznode](j, o)
+
+    tasks = []
+    for i in range(n):
+        send = byz_send if i == byznode else sends[i]
+        tasks.append(create_task(reliablebroadcast(
+            'sid', i, n, f, leader, m if i == leader else None, recvs[i], send)))
+
+    outputs = await gather(*[tasks[i] for i in range(n) if i != byznode])
+    assert outputs == [m] * (n - 1)
+    tasks[byznode].cancel()